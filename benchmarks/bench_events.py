@@ -0,0 +1,106 @@
+"""Measure per-event CPU cost and bytes on the wire of the status event stream.
+
+Feeds a recorded-style SSE stream (position ticks with a track change
+every 30 events) through the integration's SSE parser, JSON decoder and
+PipePlayUpdateCoordinator event handling, with full-status and delta
+events and with the stdlib and fast JSON decoders::
+
+    python -m benchmarks.bench_events --events 20000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay import coordinator as pipeplay_coordinator
+from custom_components.pipeplay.coordinator import PipePlayUpdateCoordinator
+from custom_components.pipeplay.sse import SSEParser
+
+TRACK_LENGTH = 30
+
+STATUS: Dict[str, Any] = {
+    "service": "pipeplay",
+    "state": "playing",
+    "volume_level": 0.35,
+    "is_muted": False,
+    "media_content_id": "http://192.168.1.10:8123/api/media_source/local/music/track-0.flac",
+    "media_content_type": "music",
+    "media_title": "Track 0",
+    "media_artist": "Some Artist",
+    "media_album": "Some Album",
+    "media_duration": 240,
+    "media_position": 0,
+}
+
+
+def _build_stream(events: int, delta: bool) -> List[bytes]:
+    """Return one SSE chunk per event, as the stand-in would send them."""
+    status = dict(STATUS)
+    chunks = []
+    for event_id in range(1, events + 1):
+        if event_id % TRACK_LENGTH == 0:
+            track = event_id // TRACK_LENGTH
+            changes = {
+                "media_content_id": f"http://192.168.1.10:8123/api/media_source/local/music/track-{track}.flac",
+                "media_title": f"Track {track}",
+                "media_duration": 180 + track % 120,
+                "media_position": 0,
+            }
+        else:
+            changes = {"media_position": status["media_position"] + 1}
+        status.update(changes)
+
+        if delta:
+            chunks.append(f"id: {event_id}\nevent: delta\ndata: {json.dumps(changes)}\n\n".encode())
+        else:
+            chunks.append(f"id: {event_id}\ndata: {json.dumps(status)}\n\n".encode())
+    return chunks
+
+
+def _run(coordinator: PipePlayUpdateCoordinator, chunks: List[bytes], delta: bool, loads: Callable) -> float:
+    """Process the stream and return CPU seconds spent."""
+    coordinator.data = {None: dict(STATUS)}
+    parser = SSEParser()
+    handle = coordinator._async_handle_event  # pylint: disable=protected-access
+
+    start = time.process_time()
+    for chunk in chunks:
+        for event in parser.feed(chunk):
+            handle(loads(event.data), delta)
+    return time.process_time() - start
+
+
+async def _main(events: int, repeat: int) -> None:
+    fast_loads = pipeplay_coordinator.json_loads
+    decoders = [("stdlib", lambda data: json.loads(data.decode()))]
+    if fast_loads is not json.loads:
+        decoders.append((fast_loads.__module__ or "fast", fast_loads))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # Nothing listens on the discard port; the stream task just backs off
+        coordinator = PipePlayUpdateCoordinator(hass, "127.0.0.1", 9, coalesce_window=0)
+        try:
+            print(f"{'events':<7} {'decoder':<8} {'bytes/event':>12} {'us/event':>10}")
+            for delta in (False, True):
+                chunks = _build_stream(events, delta)
+                size = sum(len(chunk) for chunk in chunks) / events
+                for name, loads in decoders:
+                    cpu = min(_run(coordinator, chunks, delta, loads) for _ in range(repeat))
+                    label = "delta" if delta else "full"
+                    print(f"{label:<7} {name:<8} {size:>12.1f} {cpu / events * 1e6:>10.2f}")
+        finally:
+            await coordinator.async_shutdown()
+            await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5, help="report the fastest of this many runs")
+    args = parser.parse_args()
+    asyncio.run(_main(args.events, args.repeat))
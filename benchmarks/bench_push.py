@@ -0,0 +1,113 @@
+"""Compare time to first audio of pushed local media and of the URL path.
+
+The URL path sends ``play_media`` with a signed media URL, and the
+stand-in then downloads it from a local server standing in for Home
+Assistant's media view. Push mode streams the file with
+PipePlayMediaStreamer instead::
+
+    python -m benchmarks.bench_push --runs 50 --size 8 --media-latency 20
+
+``--media-latency`` delays every media request of the URL path, to model
+the TLS and authentication round trip to Home Assistant's external URL.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay.const import TRANSPORT_SSE
+from custom_components.pipeplay.coordinator import PipePlayUpdateCoordinator
+from custom_components.pipeplay.push import PipePlayMediaStreamer
+
+from .standin import PipePlayStandin
+
+MEDIA_ID = "media-source://media_source/local/track.flac"
+SIGNATURE = "bench-signature"
+
+
+async def _start_media_server(media_dir: str, latency: float) -> web.AppRunner:
+    """Serve the media directory like Home Assistant's signed media view."""
+
+    async def _handle_media(request: web.Request) -> web.StreamResponse:
+        if latency:
+            await asyncio.sleep(latency)
+        if request.query.get("authSig") != SIGNATURE:
+            raise web.HTTPUnauthorized()
+        return web.FileResponse(os.path.join(media_dir, request.match_info["name"]))
+
+    app = web.Application()
+    app.router.add_get("/media/local/{name}", _handle_media)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000,
+    }
+
+
+async def _main(runs: int, size_mb: int, media_latency: float) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        media_dir = os.path.join(config_dir, "media")
+        os.makedirs(media_dir)
+        with open(os.path.join(media_dir, "track.flac"), "wb") as file:
+            file.write(os.urandom(size_mb * 1024 * 1024))
+
+        hass = HomeAssistant(config_dir)
+        hass.config.media_dirs = {"local": media_dir}
+        standin = PipePlayStandin(websocket=False, fetch_media=True)
+        await standin.start()
+        media_server = await _start_media_server(media_dir, media_latency)
+        media_port = media_server.addresses[0][1]
+        url = f"http://127.0.0.1:{media_port}/media/local/track.flac?authSig={SIGNATURE}"
+
+        coordinator = PipePlayUpdateCoordinator(hass, "127.0.0.1", standin.port, transport=TRANSPORT_SSE)
+        streamer = PipePlayMediaStreamer(hass)
+        media = await streamer.async_local_media(MEDIA_ID)
+        try:
+            url_samples = []
+            push_samples = []
+            for _ in range(runs):
+                started = time.monotonic()
+                await coordinator.async_send_command("play_media", {"media_type": "music", "media_id": url})
+                await standin.first_audio.wait()
+                url_samples.append(standin.first_audio_at - started)
+
+                started = time.monotonic()
+                await streamer.async_start(coordinator, "bench", media, "music", MEDIA_ID)
+                await standin.first_audio.wait()
+                push_samples.append(standin.first_audio_at - started)
+                await streamer.async_stop("bench")
+
+            print(f"time to first audio, {size_mb} MiB file, {runs} runs")
+            print(f"{'path':<6} {'p50 ms':>8} {'p95 ms':>8}")
+            for name, samples in (("url", url_samples), ("push", push_samples)):
+                result = _summary(samples)
+                print(f"{name:<6} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+            print(f"push buffers: {streamer.as_dict()['buffers']} x {streamer.chunk_size // 1024} KiB")
+        finally:
+            await streamer.async_stop("bench")
+            await coordinator.async_shutdown()
+            await standin.stop()
+            await media_server.cleanup()
+            await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--size", type=int, default=8, help="media file size in MiB")
+    parser.add_argument("--media-latency", type=float, default=0.0, help="ms added to each media request")
+    args = parser.parse_args()
+    asyncio.run(_main(args.runs, args.size, args.media_latency / 1000))
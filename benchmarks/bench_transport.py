@@ -0,0 +1,92 @@
+"""Compare command latency and throughput of the SSE + POST and WebSocket transports.
+
+Drives PipePlayUpdateCoordinator.async_send_command against the local
+stand-in server, once with the WebSocket API and once with SSE + POST::
+
+    python -m benchmarks.bench_transport --commands 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay.const import TRANSPORT_AUTO, TRANSPORT_SSE, TRANSPORT_WEBSOCKET
+from custom_components.pipeplay.coordinator import PipePlayUpdateCoordinator
+
+from .standin import PipePlayStandin
+
+
+async def _wait_for_transport(coordinator: PipePlayUpdateCoordinator, transport: str) -> None:
+    """Wait until the coordinator's event stream is up on the expected transport."""
+    async with asyncio.timeout(10):
+        while coordinator.polling_mode != "push" or coordinator.transport != transport:
+            await asyncio.sleep(0.01)
+
+
+async def _bench(hass: HomeAssistant, transport: str, commands: int, concurrency: int) -> Dict[str, float]:
+    standin = PipePlayStandin(websocket=transport == TRANSPORT_WEBSOCKET)
+    await standin.start()
+
+    coordinator = PipePlayUpdateCoordinator(
+        hass,
+        "127.0.0.1",
+        standin.port,
+        transport=TRANSPORT_AUTO if transport == TRANSPORT_WEBSOCKET else TRANSPORT_SSE,
+    )
+    try:
+        await _wait_for_transport(coordinator, transport)
+
+        # Sequential round trips: latency per command
+        latencies: List[float] = []
+        for i in range(commands):
+            start = time.perf_counter()
+            assert await coordinator.async_send_command("volume", {"level": i / commands})
+            latencies.append(time.perf_counter() - start)
+
+        # Concurrent senders: throughput
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _send(i: int) -> None:
+            async with semaphore:
+                await coordinator.async_send_command("volume", {"level": i / commands})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_send(i) for i in range(commands)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await coordinator.async_shutdown()
+        await standin.stop()
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "throughput_per_s": commands / elapsed,
+    }
+
+
+async def _main(commands: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            print(f"{'transport':<10} {'p50 ms':>8} {'p95 ms':>8} {'cmd/s':>10}")
+            for transport in (TRANSPORT_SSE, TRANSPORT_WEBSOCKET):
+                result = await _bench(hass, transport, commands, concurrency)
+                print(
+                    f"{transport:<10} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}"
+                    f" {result['throughput_per_s']:>10.0f}"
+                )
+        finally:
+            await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_main(args.commands, args.concurrency))
@@ -0,0 +1,457 @@
+"""Local stand-in for the PipePlay HTTP API.
+
+Implements enough of PipePlay to exercise the integration without real
+audio hardware: status, SSE events, commands over HTTP POST, the
+WebSocket API, authentication, pushed media streams, volume fades and
+crossfades. With ``fetch_media`` it also downloads the URL of
+``play_media`` like PipePlay does. Every request can be delayed by
+``latency`` and answered with a 503 at ``failure_rate``; while playing,
+position events are sent ``event_rate`` times a second. Run it directly
+to point a development Home Assistant instance at it::
+
+    python -m benchmarks.standin --port 8080 --latency 20 --event-rate 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from aiohttp import ClientSession, WSMsgType, web
+
+from custom_components.pipeplay.fade import CURVES
+
+EVENTS_HEADER = "X-PipePlay-Events"
+
+# Commands the stand-in understands; others are refused like PipePlay does
+COMMANDS = {
+    "play", "pause", "stop", "turn_on", "turn_off",
+    "volume", "volume_up", "volume_down", "fade_volume", "mute", "seek",
+    "play_media", "crossfade", "announce", "queue_next", "queue_clear",
+}
+
+
+class PipePlayStandin:
+    """In-memory PipePlay player served over aiohttp."""
+
+    def __init__(
+        self,
+        websocket: bool = True,
+        events: bool = True,
+        command_latency: float = 0.0,
+        announce_first_audio: float = 0.05,
+        announce_duration: float = 1.0,
+        fetch_media: bool = False,
+        fade_step: float = 0.25,
+        keepalive: float = 15.0,
+        latency: float = 0.0,
+        event_rate: float = 0.0,
+        failure_rate: float = 0.0,
+        api_key: Optional[str] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the stand-in."""
+        self.websocket = websocket
+        # Without events, clients can only poll
+        self.events = events
+        self.command_latency = command_latency
+        # Delay before every HTTP answer, and share of requests that fail
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        # Position events per second while playing; 0 sends events on changes only
+        self.event_rate = event_rate
+        self._ticker: Optional[asyncio.Task] = None
+        # Bearer token required by every request except auth info and health
+        self.api_key = api_key
+        # Announcements: delay until their first audio, and their length
+        self.announce_first_audio = announce_first_audio
+        self.announce_duration = announce_duration
+        self.fetch_media = fetch_media
+        # Seconds between volume events while a fade runs
+        self.fade_step = fade_step
+        self._fade_task: Optional[asyncio.Task] = None
+        # Seconds of silence after which SSE streams get a keepalive comment; 0 never sends one
+        self.keepalive = keepalive
+        # Set when the first audio bytes of the latest media arrived
+        self.first_audio = asyncio.Event()
+        self.first_audio_at: Optional[float] = None
+        self._fetch_task: Optional[asyncio.Task] = None
+        # Pushed streams by id: bytes received, size and the offset wanted after a seek
+        self.streams: Dict[str, Dict[str, Any]] = {}
+        self.status: Dict[str, Any] = {
+            "service": "pipeplay",
+            "state": "idle",
+            "volume_level": 0.5,
+            "is_muted": False,
+            "media_content_type": None,
+            "media_title": None,
+            "media_artist": None,
+            "media_album": None,
+            "media_duration": 0,
+            "media_position": 0,
+            "announcing": False,
+        }
+        self.commands: List[Dict[str, Any]] = []
+        # Media handed over with queue_next, started when the current one ends
+        self.queued: Optional[Dict[str, Any]] = None
+        self.requests: Dict[str, int] = {"status": 0, "events": 0, "command": 0, "ws": 0, "failed": 0, "health": 0}
+        # Streams map to True when the client negotiated delta events
+        self._sse_queues: Dict[asyncio.Queue, bool] = {}
+        self._event_id = 0
+        self._history: deque = deque(maxlen=100)
+        self._published: Dict[str, Any] = dict(self.status)
+        self._websockets: Dict[web.WebSocketResponse, bool] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+    def make_app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/health", self._handle_health)
+        app.router.add_get("/api/auth/info", self._handle_auth_info)
+        app.router.add_get("/api/status", self._handle_status)
+        if self.events:
+            app.router.add_get("/api/events", self._handle_events)
+        app.router.add_post("/api/command", self._handle_command)
+        app.router.add_put("/api/stream/{stream_id}", self._handle_stream)
+        if self.websocket:
+            app.router.add_get("/api/ws", self._handle_websocket)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start serving; port 0 picks a free port."""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        if self.event_rate:
+            self._ticker = asyncio.ensure_future(self._tick())
+
+    async def stop(self) -> None:
+        """Close all streams and stop serving."""
+        for task in (self._ticker, self._fade_task, self._fetch_task):
+            if task is not None:
+                task.cancel()
+        for queue in list(self._sse_queues):
+            queue.put_nowait(None)
+        for ws in list(self._websockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def update(self, **changes: Any) -> None:
+        """Change the player status and publish it to every stream."""
+        self.status.update(changes)
+        self.publish()
+
+    def publish(self) -> None:
+        """Send the current status to every connected client.
+
+        Clients that asked for delta events only get the fields that
+        changed since the previous event.
+        """
+        self._event_id += 1
+        changes = {key: value for key, value in self.status.items() if self._published.get(key) != value}
+        self._published = dict(self.status)
+        # Server time lets the integration measure event lag
+        stamp = {"time": time.time()}
+        changes.update(stamp)
+        status = {**self.status, **stamp}
+
+        full = f"id: {self._event_id}\ndata: {json.dumps(status)}\n\n".encode()
+        delta = f"id: {self._event_id}\nevent: delta\ndata: {json.dumps(changes)}\n\n".encode()
+        self._history.append((self._event_id, full, delta))
+        for queue, wants_delta in self._sse_queues.items():
+            queue.put_nowait(delta if wants_delta else full)
+
+        full = json.dumps({"type": "status", "data": status})
+        delta = json.dumps({"type": "delta", "data": changes})
+        for ws, wants_delta in self._websockets.items():
+            asyncio.ensure_future(ws.send_str(delta if wants_delta else full))
+
+    def send_raw(self, data: Any) -> None:
+        """Send ``data`` as a status event as is, e.g. a malformed one."""
+        for queue in self._sse_queues:
+            queue.put_nowait(f"data: {json.dumps(data)}\n\n".encode())
+        for ws in self._websockets:
+            asyncio.ensure_future(ws.send_str(json.dumps({"type": "status", "data": data})))
+
+    async def _apply_command(self, command: Dict[str, Any]) -> bool:
+        """Apply a command to the in-memory player; False if it is unknown."""
+        if self.command_latency:
+            await asyncio.sleep(self.command_latency)
+
+        name = command.get("command")
+        if name not in COMMANDS:
+            return False
+        self.commands.append(command)
+
+        if name == "play":
+            self.update(state="playing")
+        elif name == "pause":
+            self.update(state="paused")
+        elif name == "stop":
+            self.update(state="idle", media_position=0)
+        elif name == "volume":
+            self._cancel_fade()
+            self.update(volume_level=command["level"])
+        elif name == "fade_volume":
+            self._cancel_fade()
+            self._fade_task = asyncio.ensure_future(
+                self._fade(command["level"], command["duration"], command.get("curve", "linear"))
+            )
+        elif name == "mute":
+            self.update(is_muted=command["muted"])
+        elif name == "seek":
+            duration = self.status.get("media_duration") or 0
+            for stream in self.streams.values():
+                if duration:
+                    stream["seek"] = int(stream["size"] * min(command["position"] / duration, 1.0))
+            self.update(media_position=command["position"])
+        elif name in ("play_media", "crossfade"):
+            self._new_media()
+            if self.fetch_media:
+                self._fetch_task = asyncio.ensure_future(self._fetch(command["media_id"]))
+            self.update(
+                state="playing",
+                media_position=0,
+                media_content_type=command.get("media_type"),
+                media_content_id=command.get("media_id"),
+            )
+        elif name == "announce":
+            asyncio.ensure_future(self._announce())
+        elif name == "queue_next":
+            self.queued = {"media_type": command.get("media_type"), "media_id": command["media_id"]}
+        elif name == "queue_clear":
+            self.queued = None
+        return True
+
+    def finish_media(self) -> None:
+        """End the current media: start the queued item, or go idle."""
+        queued, self.queued = self.queued, None
+        if queued is None:
+            self.update(state="idle", media_position=0)
+            return
+        self._new_media()
+        self.update(
+            state="playing",
+            media_position=0,
+            media_content_type=queued["media_type"],
+            media_content_id=queued["media_id"],
+        )
+
+    async def _tick(self) -> None:
+        """Publish the advancing position while playing."""
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(1 / self.event_rate)
+            now = time.monotonic()
+            if self.status["state"] == "playing":
+                self.update(media_position=round(self.status["media_position"] + now - last, 3))
+            last = now
+
+    async def _fade(self, target: float, duration: float, curve: str) -> None:
+        """Ramp the volume, publishing it every ``fade_step`` seconds."""
+        start_level = self.status["volume_level"]
+        started = time.monotonic()
+        while (elapsed := time.monotonic() - started) < duration:
+            progress = CURVES[curve](elapsed / duration)
+            self.update(volume_level=round(start_level + (target - start_level) * progress, 4))
+            await asyncio.sleep(self.fade_step)
+        self.update(volume_level=target)
+
+    def _cancel_fade(self) -> None:
+        """Stop a running fade where it is."""
+        if self._fade_task is not None:
+            self._fade_task.cancel()
+            self._fade_task = None
+
+    async def _announce(self) -> None:
+        """Play an announcement over the current media, which resumes afterwards."""
+        await asyncio.sleep(self.announce_first_audio)
+        self.update(announcing=True)
+        await asyncio.sleep(self.announce_duration)
+        self.update(announcing=False)
+
+    def _new_media(self) -> None:
+        """Drop the current media before starting another."""
+        self.first_audio = asyncio.Event()
+        self.first_audio_at = None
+        self.streams.clear()
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+            self._fetch_task = None
+
+    def _audio_arrived(self) -> None:
+        """Note the first audio bytes of the current media."""
+        if self.first_audio_at is None:
+            self.first_audio_at = time.monotonic()
+            self.first_audio.set()
+
+    async def _fetch(self, url: str) -> None:
+        """Download media from a URL as PipePlay does, one buffer at a time."""
+        async with ClientSession() as session:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                async for _ in response.content.iter_chunked(64 * 1024):
+                    self._audio_arrived()
+
+    async def _handle_stream(self, request: web.Request) -> web.Response:
+        """Receive a chunk of a pushed stream and say which offset comes next."""
+        stream_id = request.match_info["stream_id"]
+        spec, _, size = request.headers["Content-Range"].removeprefix("bytes ").partition("/")
+
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            if not spec.startswith("0-"):
+                return web.json_response({"error": "unknown stream"}, status=404)
+            # The first chunk starts playback
+            self._new_media()
+            stream = self.streams[stream_id] = {"received": 0, "size": int(size), "seek": None}
+            self.update(
+                state="playing",
+                media_position=0,
+                media_content_type=request.headers.get("X-PipePlay-Media-Type"),
+                media_content_id=request.headers.get("X-PipePlay-Media-Id"),
+            )
+
+        next_offset = None
+        if spec != "*":
+            body = await request.read()
+            stream["received"] += len(body)
+            self._audio_arrived()
+            next_offset = int(spec.partition("-")[2]) + 1
+
+        if stream["seek"] is not None:
+            next_offset, stream["seek"] = stream["seek"], None
+        if next_offset is None or next_offset >= stream["size"]:
+            # Everything is buffered; keep the stream for seeks back
+            return web.json_response({"next": None, "retry_after": 5})
+        return web.json_response({"next": next_offset})
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Apply the configured latency, failures and authentication."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.path in ("/health", "/api/auth/info"):
+            return await handler(request)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.requests["failed"] += 1
+            return web.json_response({"error": "injected failure"}, status=503)
+        if self.api_key and request.headers.get("Authorization") != f"Bearer {self.api_key}":
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return await handler(request)
+
+    async def _handle_auth_info(self, request: web.Request) -> web.Response:
+        return web.json_response({"auth_required": self.api_key is not None})
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        self.requests["health"] += 1
+        return web.json_response({"status": "ok"})
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        self.requests["status"] += 1
+        # Server time lets the integration measure its clock offset
+        return web.json_response({**self.status, "time": time.time()})
+
+    async def _handle_command(self, request: web.Request) -> web.Response:
+        self.requests["command"] += 1
+        if not await self._apply_command(await request.json()):
+            return web.json_response({"success": False, "error": "unknown command"}, status=400)
+        return web.json_response({"success": True})
+
+    async def _handle_events(self, request: web.Request) -> web.StreamResponse:
+        self.requests["events"] += 1
+        wants_delta = request.headers.get(EVENTS_HEADER) == "delta"
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        # Replay what the client missed since the last event it saw
+        last_event_id = request.headers.get("Last-Event-ID", "")
+        if last_event_id.isdigit():
+            for event_id, full, delta in self._history:
+                if event_id > int(last_event_id):
+                    await response.write(delta if wants_delta else full)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._sse_queues[queue] = wants_delta
+        try:
+            while True:
+                if not queue.empty():
+                    chunk = queue.get_nowait()
+                else:
+                    try:
+                        async with asyncio.timeout(self.keepalive or None):
+                            chunk = await queue.get()
+                    except TimeoutError:
+                        chunk = b": keepalive\n\n"
+                if chunk is None:
+                    break
+                await response.write(chunk)
+        finally:
+            self._sse_queues.pop(queue, None)
+        return response
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        self.requests["ws"] += 1
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        self._websockets[ws] = request.headers.get(EVENTS_HEADER) == "delta"
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                if message.get("type") != "command":
+                    continue
+                if await self._apply_command(message):
+                    await ws.send_json({"type": "ack", "id": message["id"], "ok": True})
+                else:
+                    await ws.send_json({"type": "ack", "id": message["id"], "ok": False, "error": "unknown command"})
+        finally:
+            self._websockets.pop(ws, None)
+        return ws
+
+
+async def _serve(port: int, count: int, **options: Any) -> None:
+    standins = [PipePlayStandin(**options) for _ in range(count)]
+    for index, standin in enumerate(standins):
+        await standin.start(host="0.0.0.0", port=port + index if port else 0)
+        print(f"PipePlay stand-in listening on port {standin.port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for standin in standins:
+            await standin.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080, help="port of the first stand-in; 0 picks free ports")
+    parser.add_argument("--count", type=int, default=1, help="stand-ins to run, on consecutive ports")
+    parser.add_argument("--no-websocket", action="store_true", help="serve SSE + POST only")
+    parser.add_argument("--latency", type=float, default=0.0, help="ms added to every request")
+    parser.add_argument("--event-rate", type=float, default=0.0, help="position events per second while playing")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--keepalive", type=float, default=15.0, help="seconds of SSE silence before a keepalive comment; 0 disables")
+    parser.add_argument("--api-key", help="require this bearer token")
+    args = parser.parse_args()
+    asyncio.run(
+        _serve(
+            args.port,
+            args.count,
+            websocket=not args.no_websocket,
+            latency=args.latency / 1000,
+            event_rate=args.event_rate,
+            failure_rate=args.failure_rate,
+            keepalive=args.keepalive,
+            api_key=args.api_key,
+        )
+    )
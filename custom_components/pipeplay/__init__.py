@@ -1,22 +1,60 @@
 """PipePlay PipeWire Media Player integration."""
 import logging
-from homeassistant.core import HomeAssistant
+import time
+from typing import List, Optional
+
+from homeassistant.core import CoreState, HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_HOST, CONF_PORT, Platform
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
+
+from .artwork import PipePlayArtworkCache
+from .breaker import CircuitBreaker
+from .browse import PipePlayBrowseCache
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_PUSH_MEDIA,
+    CONF_TRANSPORT,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_PUSH_MEDIA,
+    DEFAULT_TRANSPORT,
+    DOMAIN,
+)
+from .coordinator import PipePlayUpdateCoordinator
+from .push import PipePlayMediaStreamer
+from .resolver import PipePlayMediaResolver
+from .scheduler import PipePlayPollScheduler
+from .services import async_setup_services
+from .tracing import PipePlayTracer
 
 _LOGGER = logging.getLogger(__name__)
 
-DOMAIN = "pipeplay"
-PLATFORMS = [Platform.MEDIA_PLAYER]
+PLATFORMS = [Platform.MEDIA_PLAYER, Platform.SENSOR]
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the PipePlay component."""
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN]["media_resolver"] = PipePlayMediaResolver(hass)
+    hass.data[DOMAIN]["browse_cache"] = PipePlayBrowseCache(hass)
+    hass.data[DOMAIN]["artwork"] = PipePlayArtworkCache(hass)
+    hass.data[DOMAIN]["scheduler"] = PipePlayPollScheduler(hass)
+    # Recent play requests, returned by pipeplay.dump_traces
+    hass.data[DOMAIN]["tracer"] = PipePlayTracer()
+    # Local media pushed to players in push mode, within one memory budget
+    hass.data[DOMAIN]["streamer"] = PipePlayMediaStreamer(hass)
+    # Media players by entity id, used to resolve group members
+    hass.data[DOMAIN]["players"] = {}
+    # Setup timing across all entries, exposed through diagnostics
+    hass.data[DOMAIN]["startup"] = {"first_started": None, "total_setup": None}
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up PipePlay from a config entry."""
+    started = time.monotonic()
     hass.data.setdefault(DOMAIN, {})
     
     # Store the entry data
@@ -26,11 +64,103 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "name": entry.data.get("name", "PipePlay Player"),
         "api_key": entry.data.get("api_key"),
     }
-    
+
+    # One coordinator per host: a single event stream serves every sink
+    # Breakers are shared per server; servers on other ports of the same
+    # host fail independently
+    breakers = hass.data[DOMAIN].setdefault("breakers", {})
+    coordinator = PipePlayUpdateCoordinator(
+        hass,
+        entry.data[CONF_HOST],
+        entry.data[CONF_PORT],
+        entry.data.get("api_key"),
+        coalesce_window=entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW) / 1000,
+        transport=entry.options.get(CONF_TRANSPORT, DEFAULT_TRANSPORT),
+        breaker=breakers.setdefault((entry.data[CONF_HOST], entry.data[CONF_PORT]), CircuitBreaker()),
+        entry_id=entry.entry_id,
+        scheduler=hass.data[DOMAIN]["scheduler"],
+        push_media=entry.options.get(CONF_PUSH_MEDIA, DEFAULT_PUSH_MEDIA),
+    )
+    hass.data[DOMAIN][entry.entry_id]["coordinator"] = coordinator
+    timing = hass.data[DOMAIN][entry.entry_id]["timing"] = {"setup": None, "first_data": None}
+
+    known_sinks = _registered_sinks(hass, entry, coordinator)
+    if known_sinks:
+        # Entities restore their last state; the host is contacted in the
+        # background so a slow or unreachable player does not hold up startup
+        coordinator.sinks.extend(known_sinks)
+        entry.async_create_background_task(
+            hass,
+            _async_first_refresh(coordinator, timing, started),
+            f"pipeplay first refresh {coordinator.host}",
+        )
+    else:
+        # First setup: the sinks are only known once the host has answered
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await coordinator.async_shutdown()
+            hass.data[DOMAIN].pop(entry.entry_id)
+            raise
+        timing["first_data"] = round(time.monotonic() - started, 3)
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    _record_setup_time(hass, timing, started)
+    _LOGGER.debug("PipePlay %s set up in %.3f s", coordinator.host, timing["setup"])
     return True
 
 
+def _registered_sinks(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: PipePlayUpdateCoordinator
+) -> List[Optional[str]]:
+    """Return the sinks that already have a media player from an earlier run."""
+    prefix = f"pipeplay_{coordinator.host}_{coordinator.port}"
+    sinks: List[Optional[str]] = []
+    for registry_entry in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id):
+        if registry_entry.domain != Platform.MEDIA_PLAYER:
+            continue
+        if registry_entry.unique_id == prefix:
+            sinks.append(None)
+        elif registry_entry.unique_id.startswith(f"{prefix}_"):
+            sinks.append(registry_entry.unique_id[len(prefix) + 1:])
+    return sinks
+
+
+async def _async_first_refresh(
+    coordinator: PipePlayUpdateCoordinator, timing: dict, started: float
+) -> None:
+    """Fetch the first status after setup and record how long it took."""
+    await coordinator.async_refresh()
+    timing["first_data"] = round(time.monotonic() - started, 3)
+    _LOGGER.debug(
+        "First PipePlay status from %s after %.3f s (%s)",
+        coordinator.host,
+        timing["first_data"],
+        "ok" if coordinator.last_update_success else "failed",
+    )
+
+
+def _record_setup_time(hass: HomeAssistant, timing: dict, started: float) -> None:
+    """Record the setup time of one entry and, during startup, of all entries."""
+    finished = time.monotonic()
+    timing["setup"] = round(finished - started, 3)
+    if hass.state is CoreState.running:
+        # Reloads after startup do not count towards the startup total
+        return
+
+    startup = hass.data[DOMAIN]["startup"]
+    if startup["first_started"] is None or started < startup["first_started"]:
+        startup["first_started"] = started
+    startup["total_setup"] = round(finished - startup["first_started"], 3)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -0,0 +1,285 @@
+"""On-disk album art cache for PipePlay players."""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .cache import TTLCache
+from .const import DOMAIN
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Longest side of the artwork served through the media player proxy
+ARTWORK_SIZE = 512
+# Total size of the thumbnails kept on disk
+ARTWORK_CACHE_BYTES = 50 * 1024 * 1024
+# Seconds a source URL is trusted before it is revalidated with its ETag
+ARTWORK_REVALIDATE_AFTER = 600
+ARTWORK_FETCH_TIMEOUT = 10
+# Source URLs remembered for revalidation
+ARTWORK_SOURCES = 256
+# Thumbnails also kept in memory, for dashboards open side by side
+ARTWORK_MEMORY_ITEMS = 16
+
+JPEG_QUALITY = 85
+
+Artwork = Tuple[Optional[bytes], Optional[str]]
+
+
+class _Source(NamedTuple):
+    """What a source URL served when it was last fetched."""
+
+    digest: str
+    etag: Optional[str]
+    checked_at: float
+
+
+def _downscale(content: bytes, size: int) -> Optional[bytes]:
+    """Return ``content`` scaled to fit ``size`` as JPEG, or None to keep it as is."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if max(image.size) <= size:
+                return None
+            image.thumbnail((size, size))
+            output = io.BytesIO()
+            image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY)
+            return output.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as err:
+        _LOGGER.debug("Could not downscale artwork: %s", err)
+        return None
+
+
+class PipePlayArtworkCache:
+    """Fetch album art once and serve downscaled copies from disk.
+
+    Thumbnails are stored under their content hash and size, so the same
+    cover reached through different URLs (or players) is scaled and stored
+    once. Source URLs are revalidated with ``If-None-Match`` after a while
+    instead of being downloaded again, and the directory is kept under a
+    byte limit by dropping the least recently used thumbnails. Without
+    Pillow, covers are cached at their original size.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_bytes: int = ARTWORK_CACHE_BYTES) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.directory = hass.config.path(STORAGE_DIR, DOMAIN, "artwork")
+        self.max_bytes = max_bytes
+        self._sources: "OrderedDict[str, _Source]" = OrderedDict()
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._memory: TTLCache[Tuple[bytes, str]] = TTLCache(
+            ARTWORK_MEMORY_ITEMS, ARTWORK_REVALIDATE_AFTER
+        )
+        self._in_flight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._loaded = False
+
+        self.hits = 0
+        self.shared = 0
+        self.fetches = 0
+        self.revalidated = 0
+        self.scaled = 0
+
+    def _scan(self) -> None:
+        """Index thumbnails left on disk by a previous run, oldest first."""
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total_bytes += size
+
+    def _read(self, name: str) -> Optional[bytes]:
+        """Read a thumbnail, or None if it was removed."""
+        try:
+            with open(os.path.join(self.directory, name), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name: str, content: bytes, evict: list) -> None:
+        """Store a thumbnail and delete evicted ones."""
+        with open(os.path.join(self.directory, name), "wb") as file:
+            file.write(content)
+        for evicted in evict:
+            try:
+                os.remove(os.path.join(self.directory, evicted))
+            except FileNotFoundError:
+                pass
+
+    def _name(self, digest: str, size: int) -> Optional[str]:
+        """Return the file name of a stored thumbnail of ``digest``, if any."""
+        for name in (f"{digest}_{size}.jpg", f"{digest}_{size}.orig"):
+            if name in self._files:
+                return name
+        return None
+
+    async def _async_read(self, digest: str, size: int) -> Artwork:
+        """Return a stored thumbnail, from memory when possible."""
+        key = (digest, size)
+        if (cached := self._memory.get(key)) is not None:
+            return cached
+
+        if (name := self._name(digest, size)) is None:
+            return None, None
+        content = await self.hass.async_add_executor_job(self._read, name)
+        if content is None:
+            self._total_bytes -= self._files.pop(name)
+            return None, None
+
+        self._files.move_to_end(name)
+        content_type = _content_type(name, content)
+        self._memory.set(key, (content, content_type))
+        return content, content_type
+
+    async def async_get_image(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        size: int = ARTWORK_SIZE,
+    ) -> Artwork:
+        """Return the artwork at ``url`` scaled to fit ``size`` pixels."""
+        if not self._loaded:
+            await self.hass.async_add_executor_job(self._scan)
+            self._loaded = True
+
+        # Concurrent views of the same cover share one download
+        key = (url, size)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            future = self.hass.async_create_task(self._async_get_image(url, headers, size))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded so one view going away does not cancel the others
+        return await asyncio.shield(future)
+
+    async def _async_get_image(self, url: str, headers: Optional[Dict[str, str]], size: int) -> Artwork:
+        """Serve from the cache, revalidating or fetching the source when needed."""
+        source = self._sources.get(url)
+        if source is not None and self._name(source.digest, size) is None:
+            # Known source, but never stored at this size (or evicted)
+            source = None
+
+        if source is not None and time.monotonic() - source.checked_at < ARTWORK_REVALIDATE_AFTER:
+            content, content_type = await self._async_read(source.digest, size)
+            if content is not None:
+                self.hits += 1
+                return content, content_type
+
+        request_headers = dict(headers or {})
+        if source is not None and source.etag:
+            request_headers["If-None-Match"] = source.etag
+
+        session = async_get_clientsession(self.hass)
+        try:
+            async with asyncio.timeout(ARTWORK_FETCH_TIMEOUT):
+                async with session.get(url, headers=request_headers) as response:
+                    if response.status == 304 and source is not None:
+                        self.revalidated += 1
+                        self._remember(url, source._replace(checked_at=time.monotonic()))
+                        return await self._async_read(source.digest, size)
+                    if response.status != 200:
+                        _LOGGER.debug("Artwork request for %s returned %s", url, response.status)
+                        return None, None
+                    content = await response.read()
+                    etag = response.headers.get("ETag")
+        except (aiohttp.ClientError, TimeoutError) as err:
+            _LOGGER.debug("Error fetching artwork %s: %s", url, err)
+            return None, None
+
+        self.fetches += 1
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self._remember(url, _Source(digest, etag, time.monotonic()))
+
+        cached = await self._async_read(digest, size)
+        if cached[0] is not None:
+            # Same cover under another URL
+            self.hits += 1
+            return cached
+
+        return await self._async_store(digest, size, content)
+
+    async def _async_store(self, digest: str, size: int, content: bytes) -> Artwork:
+        """Downscale a fetched cover once and store it."""
+        thumbnail = await self.hass.async_add_executor_job(_downscale, content, size)
+        if thumbnail is not None:
+            self.scaled += 1
+            name = f"{digest}_{size}.jpg"
+        else:
+            thumbnail = content
+            name = f"{digest}_{size}.orig"
+
+        self._files[name] = len(thumbnail)
+        self._total_bytes += len(thumbnail)
+        evict = []
+        while self._total_bytes > self.max_bytes and len(self._files) > 1:
+            evicted, evicted_size = self._files.popitem(last=False)
+            self._total_bytes -= evicted_size
+            evict.append(evicted)
+
+        try:
+            await self.hass.async_add_executor_job(self._write, name, thumbnail, evict)
+        except OSError as err:
+            _LOGGER.warning("Could not store artwork in %s: %s", self.directory, err)
+            self._total_bytes -= self._files.pop(name)
+
+        content_type = _content_type(name, thumbnail)
+        self._memory.set((digest, size), (thumbnail, content_type))
+        return thumbnail, content_type
+
+    def _remember(self, url: str, source: _Source) -> None:
+        """Record what a source URL served."""
+        self._sources[url] = source
+        self._sources.move_to_end(url)
+        while len(self._sources) > ARTWORK_SOURCES:
+            self._sources.popitem(last=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "files": len(self._files),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "shared": self.shared,
+            "fetches": self.fetches,
+            "revalidated": self.revalidated,
+            "scaled": self.scaled,
+            "downscaling": Image is not None,
+        }
+
+
+def _content_type(name: str, content: bytes) -> str:
+    """Return the MIME type of a stored thumbnail."""
+    if name.endswith(".jpg"):
+        return "image/jpeg"
+    # Originals are stored as fetched; sniff the common formats
+    if content.startswith(b"\x89PNG"):
+        return "image/png"
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return "image/webp"
+    if content[:3] == b"GIF":
+        return "image/gif"
+    return "image/jpeg"
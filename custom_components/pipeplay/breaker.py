@@ -0,0 +1,110 @@
+"""Per-server circuit breaker for PipePlay connections."""
+import asyncio
+import time
+from typing import Any, Dict
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Consecutive failures before the breaker opens
+DEFAULT_FAILURE_THRESHOLD = 3
+# First wait before probing an open breaker; doubles after each failed probe
+DEFAULT_RESET_TIMEOUT = 5.0
+DEFAULT_MAX_RESET_TIMEOUT = 300.0
+
+
+class CircuitBreaker:
+    """Stop talking to a host that keeps failing until a probe succeeds.
+
+    The breaker is shared by everything that talks to one PipePlay server,
+    i.e. one host and port (status polling, the event stream and
+    commands). After ``failure_threshold`` consecutive failures it opens:
+    requests are refused without touching the network. Once the reset
+    timeout has passed, a single caller is let through as a probe (half
+    open); its outcome closes the breaker again or reopens it with a
+    doubled timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._retry_at = 0.0
+        self._closed = asyncio.Event()
+        self._closed.set()
+
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until the next probe is allowed."""
+        if self.state == STATE_CLOSED:
+            return 0.0
+        return max(self._retry_at - time.monotonic(), 0.0)
+
+    def allow_request(self) -> bool:
+        """Return True if a request may go out; may turn the caller into the probe."""
+        if self.state == STATE_CLOSED:
+            return True
+
+        now = time.monotonic()
+        if now >= self._retry_at:
+            # Let one probe through; another only if it never reports back
+            self.state = STATE_HALF_OPEN
+            self._retry_at = now + self._reset_timeout
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        self.failures = 0
+        self._reset_timeout = self._base_reset_timeout
+        if self.state != STATE_CLOSED:
+            self.state = STATE_CLOSED
+            self._closed.set()
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the breaker when needed."""
+        self.failures += 1
+
+        if self.state == STATE_HALF_OPEN:
+            # Probe failed: wait longer before the next one
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= self._failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        """Refuse requests until the reset timeout has passed."""
+        if self.state == STATE_CLOSED:
+            self.opened += 1
+        self.state = STATE_OPEN
+        self._retry_at = time.monotonic() + self._reset_timeout
+        self._closed.clear()
+
+    async def async_wait_closed(self) -> None:
+        """Wait until the breaker closes again."""
+        await self._closed.wait()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "rejected_requests": self.rejected,
+            "retry_in": round(self.retry_in, 1),
+        }
@@ -0,0 +1,100 @@
+"""Cached media browsing for PipePlay players."""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from homeassistant.components import media_source
+from homeassistant.components.media_player import BrowseMedia, MediaType
+from homeassistant.core import HomeAssistant
+
+from .cache import TTLCache
+
+_LOGGER = logging.getLogger(__name__)
+
+BROWSE_CACHE_SIZE = 128
+BROWSE_CACHE_TTL = 300
+# Expandable children of the level being shown that are loaded in the background
+BROWSE_PREFETCH_LIMIT = 10
+BROWSE_PREFETCH_CONCURRENCY = 2
+
+# Non-MIME content types PipePlay can play
+PLAYABLE_MEDIA_TYPES = {
+    MediaType.MUSIC,
+    MediaType.PLAYLIST,
+    MediaType.PODCAST,
+    MediaType.TRACK,
+    MediaType.URL,
+}
+
+
+def _is_playable(item: BrowseMedia) -> bool:
+    """Return True for media items PipePlay can play (audio only)."""
+    content_type = (item.media_content_type or "").lower()
+    return content_type.startswith("audio/") or content_type in PLAYABLE_MEDIA_TYPES
+
+
+class PipePlayBrowseCache:
+    """Browse Home Assistant media sources, caching each level by content id.
+
+    Levels are kept in a bounded LRU cache with a time to live and can be
+    invalidated explicitly. When a level is shown, its expandable children
+    are fetched in the background so the next click is served from the cache.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the browse cache."""
+        self.hass = hass
+        self.cache: TTLCache[BrowseMedia] = TTLCache(BROWSE_CACHE_SIZE, BROWSE_CACHE_TTL)
+        self._prefetch_semaphore = asyncio.Semaphore(BROWSE_PREFETCH_CONCURRENCY)
+        self._prefetching: Set[str] = set()
+        self.prefetched = 0
+
+    async def async_browse(self, media_content_id: Optional[str]) -> BrowseMedia:
+        """Return a browse level, from the cache when possible."""
+        key = media_content_id or ""
+
+        item = self.cache.get(key)
+        if item is None:
+            item = await self._async_fetch(key)
+
+        self._schedule_prefetch(item)
+        return item
+
+    def invalidate(self, media_content_id: Optional[str] = None) -> None:
+        """Forget one level, or the whole cache when no id is given."""
+        self.cache.invalidate(media_content_id)
+
+    async def _async_fetch(self, key: str) -> BrowseMedia:
+        """Browse one level and cache it."""
+        item = await media_source.async_browse_media(
+            self.hass, key or None, content_filter=_is_playable
+        )
+        self.cache.set(key, item)
+        return item
+
+    def _schedule_prefetch(self, item: BrowseMedia) -> None:
+        """Start loading the expandable children of a level in the background."""
+        for child in (item.children or [])[:BROWSE_PREFETCH_LIMIT]:
+            key = child.media_content_id
+            if not child.can_expand or key in self._prefetching or key in self.cache:
+                continue
+            self._prefetching.add(key)
+            self.hass.async_create_background_task(
+                self._async_prefetch(key), f"pipeplay browse prefetch {key}"
+            )
+
+    async def _async_prefetch(self, key: str) -> None:
+        """Fetch one level ahead of the user navigating to it."""
+        try:
+            async with self._prefetch_semaphore:
+                if key not in self.cache:
+                    await self._async_fetch(key)
+                    self.prefetched += 1
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Prefetching %s failed: %s", key, err)
+        finally:
+            self._prefetching.discard(key)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {**self.cache.as_dict(), "prefetched": self.prefetched}
@@ -0,0 +1,125 @@
+"""Ordered command queue for PipePlay players."""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Commands where only the newest pending value matters (slider drags)
+COALESCED_COMMANDS = {"volume", "seek"}
+
+# Minimum spacing between two sends of the same coalesced command
+COMMAND_DEBOUNCE = 0.1
+
+
+class _QueuedCommand:
+    """A command waiting to be sent, with everyone awaiting its result."""
+
+    __slots__ = ("command", "data", "waiters")
+
+    def __init__(self, command: str, data: Optional[Dict[str, Any]], waiter: asyncio.Future) -> None:
+        """Initialize the queued command."""
+        self.command = command
+        self.data = data
+        self.waiters: List[asyncio.Future] = [waiter]
+
+
+class PipePlayCommandQueue:
+    """Send commands to a player one at a time, in the order they were issued.
+
+    Discrete commands (play, pause, ...) are always sent. Volume and seek
+    commands still waiting at the end of the queue are replaced by newer
+    ones of the same kind, so a slider drag results in a handful of
+    requests carrying the latest value instead of one request per step.
+    A value never overtakes commands queued before it.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, Optional[Dict[str, Any]]], Awaitable[bool]],
+    ) -> None:
+        """Initialize the queue."""
+        self._send = send
+        self._queue: Deque[_QueuedCommand] = deque()
+        self._pending: Dict[str, _QueuedCommand] = {}
+        self._last_sent: Dict[str, float] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Optional[_QueuedCommand] = None
+
+        self.enqueued = 0
+        self.sent = 0
+
+    async def async_send(self, command: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a command and wait until it (or a newer value) has been sent."""
+        waiter = asyncio.get_running_loop().create_future()
+        self.enqueued += 1
+
+        queued = self._pending.get(command)
+        if queued is not None and self._queue[-1] is queued:
+            # Latest wins: replace the value that has not been sent yet; only
+            # while nothing was queued after it, or it would overtake that
+            queued.data = data
+            queued.waiters.append(waiter)
+        else:
+            queued = _QueuedCommand(command, data, waiter)
+            self._queue.append(queued)
+            if command in COALESCED_COMMANDS:
+                self._pending[command] = queued
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._async_process())
+
+        return await waiter
+
+    async def _async_process(self) -> None:
+        """Send queued commands until the queue is empty."""
+        while self._queue:
+            queued = self._queue[0]
+
+            if queued.command in COALESCED_COMMANDS:
+                # Keep collecting newer values while the previous one settles
+                wait = self._last_sent.get(queued.command, 0) + COMMAND_DEBOUNCE - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if self._pending.get(queued.command) is queued:
+                    del self._pending[queued.command]
+                self._last_sent[queued.command] = time.monotonic()
+
+            self._queue.popleft()
+            self._in_flight = queued
+
+            try:
+                result = await self._send(queued.command, queued.data)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error sending command %s: %s", queued.command, err)
+                result = False
+
+            self._in_flight = None
+            self.sent += 1
+            for waiter in queued.waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+
+    async def async_shutdown(self) -> None:
+        """Stop sending and release anyone still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        abandoned = list(self._queue)
+        if self._in_flight is not None:
+            abandoned.append(self._in_flight)
+            self._in_flight = None
+        self._queue.clear()
+        self._pending.clear()
+
+        for queued in abandoned:
+            for waiter in queued.waiters:
+                if not waiter.done():
+                    waiter.set_result(False)
@@ -7,15 +7,24 @@ from typing import Any, Dict, Optional
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT, CONF_NAME
-
-CONF_API_KEY = "api_key"
-from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-_LOGGER = logging.getLogger(__name__)
+from .const import (
+    CONF_API_KEY,
+    CONF_COALESCE_WINDOW,
+    CONF_PUSH_MEDIA,
+    CONF_TRANSPORT,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_PUSH_MEDIA,
+    DEFAULT_TRANSPORT,
+    DOMAIN,
+    TRANSPORT_AUTO,
+    TRANSPORT_SSE,
+)
 
-DOMAIN = "pipeplay"
+_LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_HOST, default="localhost"): str,
@@ -34,6 +43,14 @@ class PipePlayConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self.discovery_info = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "PipePlayOptionsFlow":
+        """Get the options flow for this handler."""
+        return PipePlayOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Handle the initial step."""
         errors = {}
@@ -153,6 +170,38 @@ class PipePlayConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         raise CannotConnect
 
 
+class PipePlayOptionsFlow(config_entries.OptionsFlow):
+    """Handle PipePlay options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_COALESCE_WINDOW,
+                    default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+                vol.Optional(
+                    CONF_TRANSPORT,
+                    default=options.get(CONF_TRANSPORT, DEFAULT_TRANSPORT),
+                ): vol.In([TRANSPORT_AUTO, TRANSPORT_SSE]),
+                vol.Optional(
+                    CONF_PUSH_MEDIA,
+                    default=options.get(CONF_PUSH_MEDIA, DEFAULT_PUSH_MEDIA),
+                ): bool,
+            }),
+        )
+
+
 class CannotConnect(Exception):
     """Error to indicate we cannot connect."""
 
@@ -0,0 +1,27 @@
+"""Constants for the PipePlay integration."""
+
+DOMAIN = "pipeplay"
+
+CONF_API_KEY = "api_key"
+
+# Window (milliseconds) in which bursts of SSE events are merged into one update
+CONF_COALESCE_WINDOW = "coalesce_window"
+DEFAULT_COALESCE_WINDOW = 100
+
+# Transport for events and commands: "auto" tries the WebSocket API first
+# and falls back to SSE + HTTP POST, "sse" never tries the WebSocket
+CONF_TRANSPORT = "transport"
+TRANSPORT_AUTO = "auto"
+TRANSPORT_SSE = "sse"
+TRANSPORT_WEBSOCKET = "websocket"
+DEFAULT_TRANSPORT = TRANSPORT_AUTO
+
+# Stream local media files to PipePlay instead of handing it a URL to fetch
+CONF_PUSH_MEDIA = "push_media"
+DEFAULT_PUSH_MEDIA = False
+
+# Dispatcher signal (formatted with the entry id) sent with a list of newly seen sinks
+SIGNAL_NEW_SINK = "pipeplay_new_sink_{}"
+
+# Dispatcher signal sent by the shared poll scheduler with the load of each tick
+SIGNAL_POLL_TICK = "pipeplay_poll_tick"
@@ -0,0 +1,777 @@
+"""Coordinator for PipePlay hosts."""
+import asyncio
+import itertools
+import logging
+import random
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .breaker import STATE_CLOSED, STATE_HALF_OPEN, CircuitBreaker
+from .const import (
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_PUSH_MEDIA,
+    DEFAULT_TRANSPORT,
+    SIGNAL_NEW_SINK,
+    TRANSPORT_AUTO,
+    TRANSPORT_SSE,
+    TRANSPORT_WEBSOCKET,
+)
+from .metrics import LatencyHistogram, PipePlayMetrics
+from .scheduler import PipePlayPollScheduler
+from .sse import SSEParser
+
+try:
+    # orjson parses bytes directly and is several times faster
+    from orjson import JSONDecodeError, loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import JSONDecodeError, loads as json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=2)
+# Polling interval while polling and no sink is playing
+IDLE_SCAN_INTERVAL = timedelta(seconds=10)
+# After a command while polling, keep the short interval this long so a
+# poll confirms (or corrects) the optimistic state before it expires
+COMMAND_FAST_POLL = 10.0
+# Slow reconciliation poll used while the SSE stream is delivering updates
+HEARTBEAT_INTERVAL = timedelta(seconds=60)
+# Treat the SSE stream as stalled if nothing arrives for this many seconds;
+# only applied once the server has sent a keepalive comment, since an idle
+# player without keepalives legitimately stays silent
+SSE_STALL_TIMEOUT = 120
+# When a heartbeat poll shows changes the stream did not deliver, wait this
+# long for the event before reconnecting the stream
+STREAM_CHECK_GRACE = 2.0
+# Status fields that change without an event
+VOLATILE_FIELDS = {"media_position", "time"}
+
+# Timeout for the status request that checks whether an unreachable host is back
+PROBE_TIMEOUT = 3
+
+# Event stream reconnect backoff (seconds); the base is replaced by the
+# server's SSE retry value when it sends one
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+# A clock sample is kept when its round trip is at most this factor above
+# the best one; the best round trip is relaxed on every rejected sample so
+# the estimate follows clock drift on a slower network
+CLOCK_RTT_SLACK = 1.5
+CLOCK_RTT_AGING = 1.25
+
+# Ask the server to send only changed fields; it answers with "delta"
+# events, which are merged into the cached status of their sink
+EVENTS_HEADER = "X-PipePlay-Events"
+EVENTS_DELTA = "delta"
+FULL_EVENTS = ("message", "status")
+
+# Sink states that keep the coordinator on the short polling interval
+ACTIVE_STATES = {"playing", "buffering"}
+
+MODE_PUSH = "push"
+MODE_POLL = "poll"
+
+
+class PipePlayUpdateCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching PipePlay data.
+
+    One coordinator serves every sink (output) of a PipePlay host. Its data
+    maps sink ids to status dicts; a server exposing a single sink is stored
+    under the ``None`` sink. Status polls notify every entity, while events
+    only reach the entity of the sink they belong to.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        api_key: Optional[str] = None,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW / 1000,
+        transport: str = DEFAULT_TRANSPORT,
+        breaker: Optional[CircuitBreaker] = None,
+        entry_id: Optional[str] = None,
+        scheduler: Optional[PipePlayPollScheduler] = None,
+        push_media: bool = DEFAULT_PUSH_MEDIA,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.host = host
+        self.port = port
+        self.api_key = api_key
+        # Shared with every coordinator talking to the same host
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.base_url = f"http://{host}:{port}/api"
+        self._entry_id = entry_id
+        self.sinks: List[Optional[str]] = []
+        self._sse_task = None
+        self._sse_connected = False
+        self._sse_response: Optional[aiohttp.ClientResponse] = None
+        # Set while a connection is closed on purpose, so it is not a failure
+        self._stream_restart = False
+        self._reconciling = False
+        self._stream_check: Optional[asyncio.TimerHandle] = None
+
+        # Optional WebSocket carrying both events and commands; None until
+        # we know whether the PipePlay server supports it
+        self._use_websocket = transport == TRANSPORT_AUTO
+        self._ws_supported: Optional[bool] = None
+        # Whether the server has its own announce command; None until tried
+        self.announce_supported: Optional[bool] = None
+        # Whether the server ramps volume and crossfades itself; None until tried
+        self.fade_supported: Optional[bool] = None
+        self.crossfade_supported: Optional[bool] = None
+        # Whether the server accepts pushed media streams; None until tried
+        self.push_supported: Optional[bool] = None
+        # Stream local media files to the server instead of sending their URL
+        self.push_media = push_media
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._ws_pending: Dict[int, asyncio.Future] = {}
+        self._command_ids = itertools.count(1)
+
+        # Reconnect state: resume point, server-requested delay and backoff
+        self._last_event_id = ""
+        self._reconnect_delay = RECONNECT_BASE_DELAY
+        self._reconnect_attempts = 0
+
+        # SSE events arriving within the coalescing window are merged
+        # (latest value wins per field) into a single listener update
+        self._coalesce_window = coalesce_window
+        self._pending_events: Dict[Optional[str], Dict[str, Any]] = {}
+        # Sinks whose pending changes are a full status rather than a delta
+        self._pending_full: Set[Optional[str]] = set()
+        # Server timestamp of the oldest event waiting per sink
+        self._pending_times: Dict[Optional[str], float] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # PipePlay's clock minus ours (seconds), estimated from status polls
+        self.clock_offset: Optional[float] = None
+        self.clock_rtt: Optional[float] = None
+
+        # Request counters, exposed through diagnostics
+        self.status_requests = 0
+        self.sse_events = 0
+        self.delta_events = 0
+        self.event_bytes = 0
+        self.sse_connects = 0
+        self.sse_updates = 0
+        self.mode_changes = 0
+
+        # Latency histograms: status polls for the host, the rest per sink
+        self.poll_latency = LatencyHistogram()
+        self.poll_failures = 0
+        self.metrics: Dict[Optional[str], PipePlayMetrics] = {}
+
+        # Monotonic time until which polling stays fast after a command
+        self._fast_poll_until = 0.0
+        
+        # With a shared scheduler, polls are timed by it instead of by
+        # the coordinator's own timer
+        self._scheduler = scheduler
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="pipeplay",
+            update_interval=None if scheduler is not None else SCAN_INTERVAL,
+        )
+        self._unsub_scheduler = scheduler.async_register(self) if scheduler is not None else None
+        
+        # Start SSE connection
+        self._start_sse_connection()
+
+    @property
+    def polling_mode(self) -> str:
+        """Return the current update mode (push while SSE is healthy, poll otherwise)."""
+        return MODE_PUSH if self._sse_connected else MODE_POLL
+
+    @property
+    def poll_interval(self) -> float:
+        """Return the seconds between status polls in the current mode."""
+        if self._sse_connected:
+            interval = HEARTBEAT_INTERVAL
+        elif (
+            self.data is None
+            or not self.last_update_success
+            or time.monotonic() < self._fast_poll_until
+            or any(status.get("state") in ACTIVE_STATES for status in self.data.values())
+        ):
+            interval = SCAN_INTERVAL
+        else:
+            interval = IDLE_SCAN_INTERVAL
+        return interval.total_seconds()
+
+    @callback
+    def _async_set_sse_connected(self, connected: bool) -> None:
+        """Switch between push mode and fast polling."""
+        if connected == self._sse_connected:
+            return
+
+        self._sse_connected = connected
+        self.mode_changes += 1
+        _LOGGER.debug("Switched to %s mode", self.polling_mode)
+
+        if self._scheduler is not None:
+            # Resume polling straight away instead of waiting out the heartbeat
+            self._scheduler.async_reschedule(self, immediate=not connected)
+            return
+
+        self.update_interval = HEARTBEAT_INTERVAL if connected else SCAN_INTERVAL
+        if not connected:
+            # Resume fast polling straight away instead of waiting out the heartbeat
+            self.hass.async_create_task(self.async_request_refresh())
+
+    def sink_status(self, sink_id: Optional[str]) -> Dict[str, Any]:
+        """Return the last known status of a sink."""
+        return (self.data or {}).get(sink_id) or {}
+
+    def sink_metrics(self, sink_id: Optional[str]) -> PipePlayMetrics:
+        """Return the latency histograms and counters of a sink."""
+        metrics = self.metrics.get(sink_id)
+        if metrics is None:
+            metrics = self.metrics[sink_id] = PipePlayMetrics()
+        return metrics
+
+    @callback
+    def _async_discover_sinks(self, sink_ids: Iterable[Optional[str]]) -> None:
+        """Announce sinks that have not been seen before."""
+        new_sinks = [sink_id for sink_id in sink_ids if sink_id not in self.sinks]
+        if not new_sinks:
+            return
+
+        self.sinks.extend(new_sinks)
+        _LOGGER.debug("Discovered PipePlay sinks on %s: %s", self.host, new_sinks)
+        if self._entry_id is not None:
+            async_dispatcher_send(self.hass, SIGNAL_NEW_SINK.format(self._entry_id), new_sinks)
+
+    @callback
+    def _async_update_sink_listeners(self, sink_id: Optional[str]) -> None:
+        """Notify only the listeners registered for one sink."""
+        for update_callback, context in list(self._listeners.values()):
+            if context == sink_id:
+                update_callback()
+
+    @callback
+    def _async_handle_event(self, data: Dict[str, Any], delta: bool = False) -> None:
+        """Queue an event, flushing immediately on state transitions.
+
+        A full event replaces the sink's status; a delta event only carries
+        the fields that changed and is merged into it.
+        """
+        self.sse_events += 1
+
+        sink_id = data.get("sink")
+        self.sink_metrics(sink_id).events += 1
+        server_time = data.pop("time", None)
+        if isinstance(server_time, (int, float)) and sink_id not in self._pending_times:
+            self._pending_times[sink_id] = server_time
+
+        pending = self._pending_events.get(sink_id)
+        current_state = self.sink_status(sink_id).get("state")
+        if pending is not None:
+            current_state = pending.get("state", current_state)
+        if delta:
+            self.delta_events += 1
+            if pending is None:
+                pending = self._pending_events[sink_id] = {}
+            pending.update(data)
+        else:
+            self._pending_events[sink_id] = dict(data)
+            self._pending_full.add(sink_id)
+
+        if self._coalesce_window <= 0 or data.get("state", current_state) != current_state:
+            self._async_flush_events()
+        elif self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                self._coalesce_window, self._async_flush_events
+            )
+
+    @callback
+    def _async_flush_events(self) -> None:
+        """Push the merged pending events to the listeners of their sinks."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending_events:
+            return
+
+        pending = self._pending_events
+        full = self._pending_full
+        times = self._pending_times
+        self._pending_events = {}
+        self._pending_full = set()
+        self._pending_times = {}
+        self.sse_updates += len(pending)
+
+        data = dict(self.data or {})
+        for sink_id, changes in pending.items():
+            if sink_id in full:
+                data[sink_id] = changes
+            else:
+                data[sink_id] = {**data.get(sink_id, {}), **changes}
+
+        if self.data is None or not self.last_update_success:
+            # Coming back from a failure: every entity needs to update
+            self.async_set_updated_data(data)
+        else:
+            self.data = data
+            for sink_id in pending:
+                self._async_update_sink_listeners(sink_id)
+
+        if times and self.clock_offset is not None:
+            # Listeners write their state synchronously, so this is the
+            # write time; measured against the oldest event in the window
+            now = time.time() + self.clock_offset
+            for sink_id, server_time in times.items():
+                self.sink_metrics(sink_id).event_lag.record(max(now - server_time, 0.0))
+
+        self._async_discover_sinks(pending)
+
+    def auth_headers(self) -> Dict[str, str]:
+        """Return the headers that authenticate a request to PipePlay."""
+        if self.api_key:
+            return {"Authorization": f"Bearer {self.api_key}"}
+        return {}
+
+    def _get_headers(self) -> Dict[str, str]:
+        """Get headers for API requests."""
+        return {"Content-Type": "application/json", **self.auth_headers()}
+
+    async def _async_update_data(self) -> Dict[Optional[str], Dict[str, Any]]:
+        """Fetch data from PipePlay API, timing the poll."""
+        started = time.monotonic()
+        try:
+            data = await self._async_fetch_status()
+        except UpdateFailed:
+            self.poll_failures += 1
+            raise
+        self.poll_latency.record(time.monotonic() - started)
+        if self._sse_connected and not self._reconciling and self._stream_missed(data):
+            self._async_check_stream()
+        return data
+
+    def _stream_missed(self, polled: Dict[Optional[str], Dict[str, Any]]) -> bool:
+        """Return True if a heartbeat poll shows state the event stream did not deliver."""
+        known = self.data or {}
+        for sink_id, status in polled.items():
+            if sink_id in self._pending_events:
+                continue
+            current = known.get(sink_id)
+            if current is None:
+                return True
+            for key, value in status.items():
+                if key not in VOLATILE_FIELDS and current.get(key) != value:
+                    return True
+        return False
+
+    @callback
+    def _async_check_stream(self) -> None:
+        """Reconnect the event stream unless it delivers something soon."""
+        if self._stream_check is not None:
+            return
+        events = self.sse_events
+
+        @callback
+        def _async_check() -> None:
+            self._stream_check = None
+            if self._sse_connected and self.sse_events == events:
+                _LOGGER.debug("Event stream from %s missed an update, reconnecting", self.host)
+                self._async_restart_stream()
+
+        self._stream_check = self.hass.loop.call_later(STREAM_CHECK_GRACE, _async_check)
+
+    @callback
+    def _async_restart_stream(self) -> None:
+        """Close the event stream so the listener reconnects."""
+        self._stream_restart = True
+        if self._sse_response is not None:
+            self._sse_response.close()
+        if self._ws is not None and not self._ws.closed:
+            self.hass.async_create_task(self._ws.close())
+
+    async def _async_fetch_status(self) -> Dict[Optional[str], Dict[str, Any]]:
+        """Fetch the status of every sink."""
+        session = async_get_clientsession(self.hass)
+        headers = self._get_headers()
+
+        if not self.breaker.allow_request():
+            raise UpdateFailed(
+                f"PipePlay at {self.host} is unreachable, retrying in {self.breaker.retry_in:.0f} seconds"
+            )
+        # The status request itself checks whether an unreachable host is back
+        probing = self.breaker.state == STATE_HALF_OPEN
+        if probing:
+            _LOGGER.debug("Probing PipePlay at %s", self.host)
+
+        self.status_requests += 1
+
+        try:
+            async with asyncio.timeout(PROBE_TIMEOUT if probing else 10):
+                sent = time.time()
+                async with session.get(f"{self.base_url}/status", headers=headers) as response:
+                    if response.status >= 500:
+                        self.breaker.record_failure()
+                        raise UpdateFailed(f"Error fetching data: {response.status}")
+                    self.breaker.record_success()
+                    if probing:
+                        _LOGGER.info("PipePlay at %s is reachable again", self.host)
+
+                    if response.status == 200:
+                        payload = json_loads(await response.read())
+                        server_time = payload.pop("time", None)
+                        if isinstance(server_time, (int, float)):
+                            self._record_clock_sample(server_time, sent, time.time())
+                        # Hub servers report every sink; older ones a single status
+                        sinks = payload.get("sinks")
+                        if isinstance(sinks, dict):
+                            data = dict(sinks)
+                        else:
+                            data = {None: payload}
+                        self._async_discover_sinks(data)
+                        return data
+                    elif response.status == 401:
+                        raise UpdateFailed("Authentication failed - check API key")
+                    else:
+                        raise UpdateFailed(f"Error fetching data: {response.status}")
+        except (aiohttp.ClientError, TimeoutError) as err:
+            self.breaker.record_failure()
+            if probing:
+                raise UpdateFailed(
+                    f"PipePlay at {self.host} is unreachable, retrying in {self.breaker.retry_in:.0f} seconds"
+                ) from err
+            raise UpdateFailed(f"Error communicating with PipePlay: {err}") from err
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            raise UpdateFailed(f"Error communicating with PipePlay: {err}") from err
+
+    def _record_clock_sample(self, server_time: float, sent: float, received: float) -> None:
+        """Update the clock offset from a timestamped status response."""
+        rtt = received - sent
+        if self.clock_rtt is not None and rtt > self.clock_rtt * CLOCK_RTT_SLACK:
+            self.clock_rtt *= CLOCK_RTT_AGING
+            return
+
+        # Assume the server stamped the response halfway through the round trip
+        self.clock_offset = server_time - (sent + received) / 2
+        self.clock_rtt = rtt
+
+    def _start_sse_connection(self):
+        """Start the event stream connection in background."""
+        if self._sse_task is None or self._sse_task.done():
+            self._sse_task = asyncio.create_task(
+                self._sse_listener(), name=f"pipeplay events {self.host}"
+            )
+
+    @property
+    def transport(self) -> str:
+        """Return the transport currently used for events and commands."""
+        if self._ws is not None and not self._ws.closed:
+            return TRANSPORT_WEBSOCKET
+        return TRANSPORT_SSE
+
+    async def _sse_listener(self):
+        """Listen to PipePlay events for real-time updates, reconnecting as needed."""
+        session = async_get_clientsession(self.hass)
+
+        while True:
+            if self.breaker.state != STATE_CLOSED:
+                # Status polling probes the host; reconnect once it is back
+                await self.breaker.async_wait_closed()
+
+            try:
+                if self._use_websocket and self._ws_supported is not False:
+                    await self._async_listen_websocket(session)
+                else:
+                    await self._async_listen_sse(session)
+            except aiohttp.WSServerHandshakeError as e:
+                if e.status in (400, 404, 405, 501):
+                    # Older PipePlay versions only speak SSE + POST
+                    _LOGGER.info("PipePlay WebSocket API not available, using SSE")
+                    self._ws_supported = False
+                    continue
+                _LOGGER.debug("WebSocket connection error: %s", e)
+            except TimeoutError:
+                # Silence says nothing about the host; status polls judge that
+                _LOGGER.debug("Event stream stalled, no keepalive for %s seconds", SSE_STALL_TIMEOUT)
+            except (aiohttp.ClientError, OSError) as e:
+                _LOGGER.debug("Event stream connection error: %s", e)
+                if not self._stream_restart:
+                    self.breaker.record_failure()
+            except Exception as e:
+                _LOGGER.debug("Event stream connection error: %s", e)
+            finally:
+                self._stream_restart = False
+                self._sse_response = None
+                self._async_close_websocket()
+
+            # Deliver anything still waiting in the coalescing window
+            self._async_flush_events()
+
+            # Fall back to fast polling until the stream is back
+            self._async_set_sse_connected(False)
+
+            # Reconnect with exponential backoff and jitter so a PipePlay
+            # restart is not hit by every client at the same moment
+            delay = min(RECONNECT_MAX_DELAY, self._reconnect_delay * 2 ** self._reconnect_attempts)
+            self._reconnect_attempts += 1
+            delay = random.uniform(delay / 2, delay)
+            _LOGGER.debug("Reconnecting event stream in %.1f seconds", delay)
+            await asyncio.sleep(delay)
+
+    async def _async_stream_connected(self, transport: str) -> None:
+        """Switch to push mode once an event stream is established."""
+        self._reconnect_attempts = 0
+        self.breaker.record_success()
+        self.sse_connects += 1
+        self._async_set_sse_connected(True)
+        _LOGGER.info("Connected to PipePlay %s stream", transport)
+
+        # Reconcile anything missed while the stream was down
+        self._reconciling = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._reconciling = False
+
+    async def _async_listen_sse(self, session: aiohttp.ClientSession) -> None:
+        """Consume the SSE stream until it closes."""
+        url = f"{self.base_url}/events"
+        _LOGGER.debug("Connecting to SSE endpoint: %s", url)
+
+        headers = self._get_headers()
+        headers["Accept"] = "text/event-stream"
+        headers[EVENTS_HEADER] = EVENTS_DELTA
+        if self._last_event_id:
+            headers["Last-Event-ID"] = self._last_event_id
+
+        async with session.get(url, headers=headers) as response:
+            if response.status != 200:
+                _LOGGER.warning("SSE connection failed with status %s", response.status)
+                return
+
+            self._sse_response = response
+            await self._async_stream_connected(TRANSPORT_SSE)
+            parser = SSEParser(self._last_event_id)
+
+            try:
+                while True:
+                    async with asyncio.timeout(SSE_STALL_TIMEOUT if parser.comments else None):
+                        chunk = await response.content.readany()
+                    if not chunk:
+                        break
+                    self.event_bytes += len(chunk)
+
+                    for event in parser.feed(chunk):
+                        delta = event.event == EVENTS_DELTA
+                        if not delta and event.event not in FULL_EVENTS:
+                            continue
+                        try:
+                            data = json_loads(event.data)
+                        except JSONDecodeError as e:
+                            _LOGGER.debug("Failed to parse SSE data: %s", e)
+                            continue
+                        if not isinstance(data, dict):
+                            _LOGGER.debug("Ignoring SSE data that is not an object: %s", event.data)
+                            continue
+
+                        # Update coordinator data and notify listeners; one
+                        # bad event must not tear down the stream
+                        try:
+                            self._async_handle_event(data, delta)
+                        except Exception:  # pylint: disable=broad-except
+                            _LOGGER.exception("Error handling SSE event: %s", event.data)
+                            continue
+                        _LOGGER.debug("Received SSE update: %s", data.get("state"))
+            finally:
+                # Resume from here on the next connection
+                self._last_event_id = parser.last_event_id
+                if parser.retry is not None:
+                    # Honour the server's hint, but never reconnect in a hot loop
+                    self._reconnect_delay = max(
+                        RECONNECT_BASE_DELAY, min(RECONNECT_MAX_DELAY, parser.retry / 1000)
+                    )
+
+            _LOGGER.debug("SSE stream closed by PipePlay")
+
+    async def _async_listen_websocket(self, session: aiohttp.ClientSession) -> None:
+        """Consume the WebSocket until it closes, resolving command acknowledgements."""
+        url = f"{self.base_url}/ws"
+        _LOGGER.debug("Connecting to WebSocket endpoint: %s", url)
+
+        headers = {EVENTS_HEADER: EVENTS_DELTA, **self.auth_headers()}
+
+        async with asyncio.timeout(10):
+            self._ws = await session.ws_connect(url, headers=headers, heartbeat=30)
+        self._ws_supported = True
+
+        await self._async_stream_connected(TRANSPORT_WEBSOCKET)
+
+        while True:
+            # The connection's ping/pong heartbeat detects a dead peer
+            msg = await self._ws.receive()
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            self.event_bytes += len(msg.data)
+
+            try:
+                message = json_loads(msg.data)
+            except JSONDecodeError as e:
+                _LOGGER.debug("Failed to parse WebSocket message: %s", e)
+                continue
+            if not isinstance(message, dict):
+                _LOGGER.debug("Ignoring WebSocket message that is not an object: %s", msg.data)
+                continue
+
+            message_type = message.get("type")
+            if message_type in ("status", EVENTS_DELTA):
+                data = message.get("data")
+                if not isinstance(data, dict):
+                    _LOGGER.debug("Ignoring WebSocket event without an object: %s", msg.data)
+                    continue
+                try:
+                    self._async_handle_event(data, message_type == EVENTS_DELTA)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error handling WebSocket event: %s", msg.data)
+            elif message_type == "ack":
+                waiter = self._ws_pending.get(message.get("id"))
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(message)
+
+        _LOGGER.debug("WebSocket closed by PipePlay")
+
+    @callback
+    def _async_close_websocket(self) -> None:
+        """Drop the WebSocket and fail commands still waiting for an acknowledgement."""
+        if self._ws is not None:
+            if not self._ws.closed:
+                self.hass.async_create_task(self._ws.close())
+            self._ws = None
+
+        for waiter in self._ws_pending.values():
+            if not waiter.done():
+                waiter.set_exception(ConnectionError("WebSocket closed"))
+        self._ws_pending.clear()
+
+    async def async_send_command(
+        self,
+        command: str,
+        data: Optional[Dict[str, Any]] = None,
+        sink_id: Optional[str] = None,
+    ) -> bool:
+        """Send a single command to PipePlay and return True if it was accepted."""
+        payload = {"command": command}
+        if data:
+            payload.update(data)
+        if sink_id is not None:
+            payload["sink"] = sink_id
+
+        metrics = self.sink_metrics(sink_id)
+        if self.breaker.state != STATE_CLOSED:
+            # Fail fast instead of waiting out the timeout on a dead host
+            _LOGGER.error("Cannot send command %s: PipePlay at %s is unreachable", command, self.host)
+            metrics.command_failures += 1
+            return False
+
+        started = time.monotonic()
+        if self._ws is not None and not self._ws.closed:
+            accepted = await self._async_send_websocket_command(payload)
+        else:
+            accepted = await self._async_post_command(payload)
+
+        if accepted:
+            metrics.command.record(time.monotonic() - started)
+            if not self._sse_connected:
+                self._async_poll_after_command()
+        else:
+            metrics.command_failures += 1
+        return accepted
+
+    @callback
+    def _async_poll_after_command(self) -> None:
+        """Poll soon after a command, since no event will confirm it."""
+        self._fast_poll_until = time.monotonic() + COMMAND_FAST_POLL
+        if self._scheduler is not None:
+            self._scheduler.async_reschedule(self, immediate=True)
+
+    async def _async_post_command(self, payload: Dict[str, Any]) -> bool:
+        """POST a command and return True if PipePlay accepted it."""
+        command = payload["command"]
+        session = async_get_clientsession(self.hass)
+        url = f"{self.base_url}/command"
+        headers = self._get_headers()
+
+        _LOGGER.debug("Sending command %s to %s", command, url)
+
+        try:
+            async with asyncio.timeout(10):
+                async with session.post(url, json=payload, headers=headers) as response:
+                    self.breaker.record_success()
+                    if response.status == 401:
+                        _LOGGER.error("Authentication failed for command %s - check API key", command)
+                    elif response.status != 200:
+                        _LOGGER.error("Failed to send command %s: %s", command, response.status)
+                    else:
+                        _LOGGER.debug("Command %s sent successfully", command)
+                        return True
+        except (aiohttp.ClientError, TimeoutError) as err:
+            self.breaker.record_failure()
+            _LOGGER.error("Error sending command %s: %s", command, err)
+        except Exception as err:
+            _LOGGER.error("Error sending command %s: %s", command, err)
+
+        return False
+
+    async def _async_send_websocket_command(self, payload: Dict[str, Any]) -> bool:
+        """Send a command over the WebSocket and wait for its acknowledgement."""
+        command = payload["command"]
+        command_id = next(self._command_ids)
+        waiter = self.hass.loop.create_future()
+        self._ws_pending[command_id] = waiter
+
+        _LOGGER.debug("Sending command %s over WebSocket (id %s)", command, command_id)
+
+        try:
+            async with asyncio.timeout(10):
+                await self._ws.send_json({"type": "command", "id": command_id, **payload})
+                ack = await waiter
+        except Exception as err:
+            _LOGGER.error("Error sending command %s: %s", command, err)
+            return False
+        finally:
+            self._ws_pending.pop(command_id, None)
+
+        if not ack.get("ok", False):
+            _LOGGER.error("Failed to send command %s: %s", command, ack.get("error"))
+            return False
+
+        _LOGGER.debug("Command %s acknowledged", command)
+        return True
+
+    async def async_shutdown(self):
+        """Shutdown the coordinator."""
+        await super().async_shutdown()
+        if self._unsub_scheduler is not None:
+            self._unsub_scheduler()
+            self._unsub_scheduler = None
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._stream_check is not None:
+            self._stream_check.cancel()
+            self._stream_check = None
+
+        if self._sse_task:
+            self._sse_task.cancel()
+            try:
+                await self._sse_task
+            except asyncio.CancelledError:
+                pass
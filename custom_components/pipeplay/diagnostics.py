@@ -0,0 +1,85 @@
+"""Diagnostics support for PipePlay."""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import DOMAIN
+
+TO_REDACT = {"api_key"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data.get("coordinator")
+
+    diagnostics: Dict[str, Any] = {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+    }
+
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "mode": coordinator.polling_mode,
+            "transport": coordinator.transport,
+            "poll_interval": coordinator.poll_interval,
+            "last_update_success": coordinator.last_update_success,
+            "status_requests": coordinator.status_requests,
+            "sse_events": coordinator.sse_events,
+            "delta_events": coordinator.delta_events,
+            "event_bytes": coordinator.event_bytes,
+            "sse_updates": coordinator.sse_updates,
+            "sse_connects": coordinator.sse_connects,
+            "mode_changes": coordinator.mode_changes,
+            "clock_offset": coordinator.clock_offset,
+            "clock_rtt": coordinator.clock_rtt,
+            "poll_latency": coordinator.poll_latency.as_dict(),
+            "poll_failures": coordinator.poll_failures,
+            "announce_supported": coordinator.announce_supported,
+            "fade_supported": coordinator.fade_supported,
+            "crossfade_supported": coordinator.crossfade_supported,
+            "push_media": coordinator.push_media,
+            "push_supported": coordinator.push_supported,
+        }
+        diagnostics["circuit_breaker"] = coordinator.breaker.as_dict()
+        diagnostics["sinks"] = [sink_id or "" for sink_id in coordinator.sinks]
+        diagnostics["status"] = {
+            sink_id or "": status for sink_id, status in (coordinator.data or {}).items()
+        }
+
+    diagnostics["startup"] = {
+        **entry_data.get("timing", {}),
+        "total_setup": hass.data[DOMAIN]["startup"]["total_setup"],
+    }
+    diagnostics["poll_scheduler"] = hass.data[DOMAIN]["scheduler"].as_dict()
+    diagnostics["media_cache"] = hass.data[DOMAIN]["media_resolver"].as_dict()
+    diagnostics["browse_cache"] = hass.data[DOMAIN]["browse_cache"].as_dict()
+    diagnostics["artwork_cache"] = hass.data[DOMAIN]["artwork"].as_dict()
+    diagnostics["push_streams"] = hass.data[DOMAIN]["streamer"].as_dict()
+
+    diagnostics["entities"] = {
+        entity.unique_id: {
+            "suppressed_writes": entity.suppressed_writes,
+            "commands_enqueued": entity.command_queue.enqueued,
+            "commands_sent": entity.command_queue.sent,
+            "optimistic_confirmed": entity.optimistic_confirmed,
+            "optimistic_rollbacks": entity.optimistic_rollbacks,
+            "group_members": entity.group_members,
+            "group_sync": entity.group_sync,
+            "queue": {
+                **entity.playlist.as_dict(),
+                "preloads": entity.queue_preloads,
+                "advances": entity.queue_advances,
+            },
+            "metrics": entity.metrics.as_dict(),
+        }
+        for entity in entry_data.get("entities", [])
+    }
+    diagnostics["traces"] = hass.data[DOMAIN]["tracer"].as_list(
+        [entity.entity_id for entity in entry_data.get("entities", [])], limit=10
+    )
+
+    return diagnostics
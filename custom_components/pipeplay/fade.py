@@ -0,0 +1,46 @@
+"""Volume fades run by PipePlay and interpolated by the integration."""
+from datetime import timedelta
+import time
+from typing import Callable, Dict, Optional
+
+from homeassistant.util import dt as dt_util
+
+CURVE_LINEAR = "linear"
+CURVE_EASE_IN = "ease_in"
+CURVE_EASE_OUT = "ease_out"
+CURVE_EASE_IN_OUT = "ease_in_out"
+
+# Share of the level change reached after a share of the duration; PipePlay
+# ramps with the same functions, so the interpolated level follows it
+CURVES: Dict[str, Callable[[float], float]] = {
+    CURVE_LINEAR: lambda progress: progress,
+    CURVE_EASE_IN: lambda progress: progress * progress,
+    CURVE_EASE_OUT: lambda progress: 1 - (1 - progress) ** 2,
+    CURVE_EASE_IN_OUT: lambda progress: progress * progress * (3 - 2 * progress),
+}
+
+# Longest fade or crossfade accepted, in seconds
+MAX_FADE_DURATION = 3600
+
+
+class VolumeFade:
+    """A volume ramp in progress on PipePlay."""
+
+    __slots__ = ("start_level", "target", "duration", "curve", "start", "ends_at")
+
+    def __init__(self, start_level: float, target: float, duration: float, curve: str) -> None:
+        """Start the fade now."""
+        self.start_level = start_level
+        self.target = target
+        self.duration = duration
+        self.curve = curve
+        self.start = time.monotonic()
+        self.ends_at = dt_util.utcnow() + timedelta(seconds=duration)
+
+    def level(self, now: Optional[float] = None) -> float:
+        """Return the volume level the ramp has reached."""
+        elapsed = (time.monotonic() if now is None else now) - self.start
+        if elapsed >= self.duration:
+            return self.target
+        progress = CURVES[self.curve](max(elapsed, 0.0) / self.duration)
+        return round(self.start_level + (self.target - self.start_level) * progress, 4)
@@ -0,0 +1,87 @@
+"""Synchronized playback for groups of PipePlay players."""
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .media_player import PipePlayMediaPlayer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Commands that start playback and therefore carry a shared start time
+SYNCHRONIZED_COMMANDS = {"play", "play_media"}
+
+# Seconds between sending a synchronized start and the start itself; raised
+# to a few round trips for slow hosts so every member has it in time
+GROUP_START_LEAD = 0.3
+GROUP_START_LEAD_RTTS = 3
+
+
+def group_start_lead(players: List["PipePlayMediaPlayer"]) -> float:
+    """Return how far in the future a synchronized start should be scheduled."""
+    rtts = [player.coordinator.clock_rtt or 0.0 for player in players]
+    return max(GROUP_START_LEAD, GROUP_START_LEAD_RTTS * max(rtts, default=0.0))
+
+
+async def async_group_send(
+    players: List["PipePlayMediaPlayer"],
+    command: str,
+    data: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Send one command to every player at once and return sync statistics.
+
+    Playback starts are scheduled at a shared timestamp a little in the
+    future. Every member receives it in its own clock, corrected by the
+    offset its coordinator measured, so hosts start together even though
+    the requests arrive at slightly different times.
+    """
+    start_at = None
+    lead = 0.0
+    if command in SYNCHRONIZED_COMMANDS:
+        lead = group_start_lead(players)
+        start_at = time.time() + lead
+
+    acked: List[Optional[float]] = [None] * len(players)
+
+    async def _async_send(index: int, player: "PipePlayMediaPlayer") -> bool:
+        member_data = dict(data or {})
+        if start_at is not None:
+            member_data["start_at"] = round(start_at + (player.coordinator.clock_offset or 0.0), 3)
+        # pylint: disable-next=protected-access
+        result = await player._send_command(command, member_data or None)
+        if result:
+            acked[index] = time.time()
+        return result
+
+    results = await asyncio.gather(
+        *(_async_send(index, player) for index, player in enumerate(players)),
+        return_exceptions=True,
+    )
+
+    stats: Dict[str, Any] = {
+        "command": command,
+        "members": len(players),
+        "failed": sum(1 for result in results if result is not True),
+    }
+    if start_at is None:
+        return stats
+    stats["start_lead"] = round(lead, 3)
+
+    # A member that acknowledged after the start time began late by at
+    # most that much; on top of that each start is only as exact as the
+    # clock offset, i.e. half the round trip of its best clock sample
+    starts = []
+    uncertainty = 0.0
+    for player, acked_at in zip(players, acked):
+        if acked_at is None:
+            continue
+        starts.append(max(acked_at - start_at, 0.0))
+        if player.coordinator.clock_offset is not None:
+            uncertainty = max(uncertainty, (player.coordinator.clock_rtt or 0.0) / 2)
+        else:
+            _LOGGER.debug("No clock offset for %s yet, start may be skewed", player.entity_id)
+
+    stats["start_skew"] = round(max(starts) - min(starts) + uncertainty, 4) if starts else None
+    stats["late_members"] = sum(1 for late in starts if late > 0)
+    return stats
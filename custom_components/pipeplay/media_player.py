@@ -1,38 +1,83 @@
 """PipePlay media player platform."""
 import asyncio
+import functools
+import hashlib
+import itertools
 import logging
-from datetime import timedelta
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 import time
-import json
 
-import aiohttp
+import voluptuous as vol
 from homeassistant.components.media_player import (
+    ATTR_MEDIA_ANNOUNCE,
+    ATTR_MEDIA_CONTENT_ID,
+    ATTR_MEDIA_CONTENT_TYPE,
+    ATTR_MEDIA_ENQUEUE,
+    ATTR_MEDIA_VOLUME_LEVEL,
+    MediaPlayerEnqueue,
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
     MediaPlayerState,
     MediaType,
-    BrowseMedia,
 )
-from homeassistant.components.media_player.browse_media import (
-    async_process_play_media_url,
-)
-from homeassistant.components.media_source import async_resolve_media
-from homeassistant.components import media_source
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_PORT, CONF_NAME
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import CONF_NAME, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_platform
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .commands import PipePlayCommandQueue
+from .const import DOMAIN, SIGNAL_NEW_SINK
+from .coordinator import MODE_POLL, PipePlayUpdateCoordinator
+from .fade import CURVE_LINEAR, CURVES, MAX_FADE_DURATION, VolumeFade
+from .group import async_group_send
+from .playlist import PipePlayPlaylist, PlaylistItem
+from .status import EMPTY_STATUS, PipePlayStatus
+from .tracing import CONFIRM_TIMEOUT, PlayTrace, Span, span, use_trace
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=2)
+# Position reports within this many seconds of the extrapolated position
+# do not produce a state write; the frontend extrapolates between writes
+POSITION_DRIFT_TOLERANCE = 2.0
+
+# Seconds an optimistic change may stay unconfirmed before it is rolled back
+OPTIMISTIC_TIMEOUT = 5.0
+
+# Volume of the current stream, relative to its own, while PipePlay plays an
+# announcement over it; 0 pauses it instead
+ANNOUNCE_DUCK_LEVEL = 0.2
+# Longest announcement waited for before the previous media is resumed
+ANNOUNCE_TIMEOUT = 300
+
+# Seconds before the end of a track at which the next queued item is
+# handed to PipePlay, so it can start without a gap
+PRELOAD_LEAD = 15.0
+
+# Seconds between volume commands when PipePlay cannot fade by itself
+FADE_FALLBACK_STEP = 0.5
+# Seconds between state writes showing the interpolated volume of a fade
+FADE_WRITE_INTERVAL = 1.0
+
+SERVICE_FADE_VOLUME = "fade_volume"
+SERVICE_CROSSFADE_TO = "crossfade_to"
+
+ATTR_DURATION = "duration"
+ATTR_CURVE = "curve"
+
+FADE_SCHEMA = {
+    vol.Required(ATTR_DURATION): vol.All(
+        vol.Coerce(float), vol.Range(min=0.1, max=MAX_FADE_DURATION)
+    ),
+    vol.Optional(ATTR_CURVE, default=CURVE_LINEAR): vol.In(list(CURVES)),
+}
 
 
 async def async_setup_entry(
@@ -41,138 +86,67 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the PipePlay media player platform."""
-    host = config_entry.data[CONF_HOST]
-    port = config_entry.data[CONF_PORT]
     name = config_entry.data[CONF_NAME]
-    api_key = config_entry.data.get("api_key")
-    
-    coordinator = PipePlayUpdateCoordinator(hass, host, port, api_key)
-    
-    # Fetch initial data so we have data when entities subscribe
-    await coordinator.async_config_entry_first_refresh()
-    
-    # Create the media player entity
-    entity = PipePlayMediaPlayer(coordinator, name)
-    
-    # Add the entity
-    async_add_entities([entity], True)
-    
-    _LOGGER.info(f"PipePlay media player entity added: {entity.unique_id}")
-
-
-class PipePlayUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching PipePlay data."""
-
-    def __init__(self, hass: HomeAssistant, host: str, port: int, api_key: Optional[str] = None) -> None:
-        """Initialize the coordinator."""
-        self.host = host
-        self.port = port
-        self.api_key = api_key
-        self.base_url = f"http://{host}:{port}/api"
-        self._sse_task = None
-        self._sse_connected = False
-        
-        super().__init__(
-            hass,
-            _LOGGER,
-            name="pipeplay",
-            update_interval=SCAN_INTERVAL,  # Fallback polling interval
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator: PipePlayUpdateCoordinator = entry_data["coordinator"]
+    entities = entry_data.setdefault("entities", [])
+
+    @callback
+    def _async_add_sinks(sink_ids) -> None:
+        """Create one media player per sink."""
+        new_entities = [PipePlayMediaPlayer(coordinator, name, sink_id) for sink_id in sink_ids]
+        entities.extend(new_entities)
+        async_add_entities(new_entities)
+
+        for entity in new_entities:
+            _LOGGER.info("PipePlay media player entity added: %s", entity.unique_id)
+
+    # Sinks that appear later (hub mode) get their entity when first reported
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_SINK.format(config_entry.entry_id), _async_add_sinks
         )
-        
-        # Start SSE connection
-        self._start_sse_connection()
-
-    def _get_headers(self) -> Dict[str, str]:
-        """Get headers for API requests."""
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        return headers
-
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Fetch data from PipePlay API."""
-        session = async_get_clientsession(self.hass)
-        headers = self._get_headers()
-        
-        try:
-            async with asyncio.timeout(10):
-                async with session.get(f"{self.base_url}/status", headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # Log position updates for debugging
-                        if data.get("state") == "playing":
-                            _LOGGER.debug("Position update: %s seconds", data.get("media_position"))
-                        return data
-                    elif response.status == 401:
-                        raise UpdateFailed("Authentication failed - check API key")
-                    else:
-                        raise UpdateFailed(f"Error fetching data: {response.status}")
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with PipePlay: {err}")
-
-    def _start_sse_connection(self):
-        """Start SSE connection in background."""
-        if self._sse_task is None or self._sse_task.done():
-            self._sse_task = asyncio.create_task(self._sse_listener())
-
-    async def _sse_listener(self):
-        """Listen to SSE events for real-time updates."""
-        session = async_get_clientsession(self.hass)
-        headers = self._get_headers()
-        
-        while True:
-            try:
-                url = f"{self.base_url}/events"
-                _LOGGER.debug("Connecting to SSE endpoint: %s", url)
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        self._sse_connected = True
-                        _LOGGER.info("Connected to PipePlay SSE stream")
-                        
-                        async for line in response.content:
-                            line_str = line.decode('utf-8').strip()
-                            if line_str.startswith('data: '):
-                                try:
-                                    data_str = line_str[6:]  # Remove 'data: ' prefix
-                                    data = json.loads(data_str)
-                                    
-                                    # Update coordinator data and notify listeners
-                                    self.async_set_updated_data(data)
-                                    _LOGGER.debug("Received SSE update: %s", data.get("state"))
-                                    
-                                except json.JSONDecodeError as e:
-                                    _LOGGER.debug("Failed to parse SSE data: %s", e)
-                                except Exception as e:
-                                    _LOGGER.debug("Error processing SSE data: %s", e)
-                    else:
-                        _LOGGER.warning("SSE connection failed with status %s", response.status)
-                        
-            except Exception as e:
-                self._sse_connected = False
-                _LOGGER.debug("SSE connection error: %s", e)
-                
-            # Reconnect after delay
-            await asyncio.sleep(5)
-
-    async def async_shutdown(self):
-        """Shutdown the coordinator."""
-        if self._sse_task:
-            self._sse_task.cancel()
-            try:
-                await self._sse_task
-            except asyncio.CancelledError:
-                pass
+    )
+
+    _async_add_sinks(coordinator.sinks)
 
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_FADE_VOLUME,
+        {vol.Required(ATTR_MEDIA_VOLUME_LEVEL): cv.small_float, **FADE_SCHEMA},
+        "async_fade_volume",
+    )
+    platform.async_register_entity_service(
+        SERVICE_CROSSFADE_TO,
+        {
+            vol.Required(ATTR_MEDIA_CONTENT_ID): cv.string,
+            vol.Required(ATTR_MEDIA_CONTENT_TYPE): cv.string,
+            **FADE_SCHEMA,
+        },
+        "async_crossfade_to",
+    )
 
-class PipePlayMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
+
+class PipePlayMediaPlayer(CoordinatorEntity, MediaPlayerEntity, RestoreEntity):
     """Representation of a PipePlay media player."""
 
-    def __init__(self, coordinator: PipePlayUpdateCoordinator, name: str) -> None:
+    def __init__(
+        self,
+        coordinator: PipePlayUpdateCoordinator,
+        name: str,
+        sink_id: Optional[str] = None,
+    ) -> None:
         """Initialize the media player."""
-        super().__init__(coordinator)
+        # The sink id is the listener context, so events for other sinks
+        # of the same host never reach this entity
+        super().__init__(coordinator, context=sink_id)
+        self._sink_id = sink_id
         self._name = name
         self._attr_unique_id = f"pipeplay_{coordinator.host}_{coordinator.port}"
+        if sink_id is not None:
+            sink_name = coordinator.sink_status(sink_id).get("name") or sink_id
+            self._name = f"{name} {sink_name}"
+            self._attr_unique_id += f"_{sink_id}"
         self._attr_device_class = "speaker"
         self._attr_should_poll = False  # We use coordinator for updates
         
@@ -197,7 +171,299 @@ class PipePlayMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
             | MediaPlayerEntityFeature.TURN_OFF
             | MediaPlayerEntityFeature.VOLUME_STEP
             | MediaPlayerEntityFeature.BROWSE_MEDIA
+            | MediaPlayerEntityFeature.GROUPING
+            | MediaPlayerEntityFeature.MEDIA_ENQUEUE
+            | MediaPlayerEntityFeature.NEXT_TRACK
+            | MediaPlayerEntityFeature.PREVIOUS_TRACK
+            | MediaPlayerEntityFeature.CLEAR_PLAYLIST
+            | MediaPlayerEntityFeature.MEDIA_ANNOUNCE
+        )
+
+        # Position anchor used by the frontend to extrapolate playback progress
+        self._position: Optional[float] = None
+        self._position_updated_at: Optional[datetime] = None
+        self._position_playing = False
+
+        # Parsed status (with optimistic changes applied) that properties
+        # read from; an update that only moves the position skips the write
+        self._snapshot: PipePlayStatus = EMPTY_STATUS
+        self._last_available: Optional[bool] = None
+        # True while showing the state restored from the last run, until
+        # the first status (or failure) arrives from PipePlay
+        self._restored = False
+
+        # Commands are sent in order; their effect is applied optimistically
+        # and confirmed by the next SSE event or status poll
+        self.command_queue = PipePlayCommandQueue(
+            functools.partial(coordinator.async_send_command, sink_id=sink_id)
+        )
+        # Expected value, deadline and the token of the command that set it
+        self._optimistic: Dict[str, Tuple[Any, float, int]] = {}
+        self._optimistic_tokens = itertools.count(1)
+        self._unsub_optimistic = None
+        self.optimistic_confirmed = 0
+        self.optimistic_rollbacks = 0
+
+        # Grouping: the leader forwards play/pause/stop and media to its
+        # followers; a follower only points back at its leader
+        self._group_leader: Optional["PipePlayMediaPlayer"] = None
+        self._group_followers: List["PipePlayMediaPlayer"] = []
+        self.group_sync: Optional[Dict[str, Any]] = None
+
+        # Play queue: the item after the current one is resolved and handed
+        # to PipePlay (queue_next) shortly before the current one ends
+        self.playlist = PipePlayPlaylist()
+        self._preload_index: Optional[int] = None
+        self._preloaded_url: Optional[str] = None
+        self._preload_duration: Optional[float] = None
+        self._unsub_preload = None
+        self._reported_state: Optional[MediaPlayerState] = None
+        self._advance_on_idle = False
+        self.queue_preloads = 0
+        self.queue_advances = 0
+
+        # Play request waiting for PipePlay to report that it started
+        self._play_trace: Optional[PlayTrace] = None
+        self._play_confirm: Optional[Span] = None
+        self._play_url: Optional[str] = None
+        self._play_announce = False
+        self._unsub_play_trace = None
+
+        # Announcement played without PipePlay's announce command: resolved
+        # once PipePlay is idle again, so the previous media can be restored
+        self._announce_end: Optional[asyncio.Future] = None
+
+        # Volume ramp run by PipePlay; the volume is interpolated along it
+        # locally and written every FADE_WRITE_INTERVAL, so a fade costs one
+        # command and no state writes for the volume events along the ramp
+        self._fade: Optional[VolumeFade] = None
+        self._unsub_fade = None
+        # Volume steps sent for servers without the fade_volume command
+        self._fade_task: Optional[asyncio.Task] = None
+
+        # Latencies and counters, shared with the diagnostic sensors
+        self.metrics = coordinator.sink_metrics(sink_id)
+        self.suppressed_writes = 0
+
+        self._track_status()
+
+    @property
+    def state_writes(self) -> int:
+        """Return how often this entity wrote its state."""
+        return self.metrics.writes
+
+    def _status(self) -> Dict[str, Any]:
+        """Return the reported status with pending optimistic changes applied."""
+        data = self.coordinator.sink_status(self._sink_id)
+        if not self._optimistic:
+            return data
+        return {**data, **{key: value for key, (value, _, _) in self._optimistic.items()}}
+
+    def _confirm_optimistic(self, data: Dict[str, Any]) -> None:
+        """Drop optimistic values the player has now reported."""
+        for key, (expected, _, _) in list(self._optimistic.items()):
+            reported = data.get(key)
+            if key == "media_position":
+                # A seek is confirmed once reports line up with the new anchor
+                confirmed = reported is not None and abs(
+                    reported - self._extrapolated_position()
+                ) <= POSITION_DRIFT_TOLERANCE
+            elif isinstance(expected, float) and isinstance(reported, (int, float)):
+                confirmed = abs(reported - expected) < 0.01
+            else:
+                confirmed = reported == expected
+            if confirmed:
+                del self._optimistic[key]
+                self.optimistic_confirmed += 1
+
+    def _track_status(self) -> bool:
+        """Record the latest status and return True if it needs a state write."""
+        if self._optimistic:
+            self._confirm_optimistic(self.coordinator.sink_status(self._sink_id))
+        snapshot = PipePlayStatus.from_dict(self._status())
+        available = self.available
+
+        previous = self._snapshot
+        if self._fade is not None:
+            # Volume reports along the ramp are what the interpolation shows
+            previous = previous._replace(volume_level=snapshot.volume_level)
+        changed = (
+            not snapshot.same_except_position(previous)
+            or available != self._last_available
         )
+        self._snapshot = snapshot
+        self._last_available = available
+
+        return self._track_position(snapshot) or changed
+
+    def _extrapolated_position(self) -> float:
+        """Return where playback should be now according to the anchor."""
+        if self._position is None or self._position_updated_at is None:
+            return 0.0
+        if not self._position_playing:
+            return self._position
+        return self._position + (dt_util.utcnow() - self._position_updated_at).total_seconds()
+
+    def _track_position(self, snapshot: PipePlayStatus) -> bool:
+        """Update the position anchor and return True if it moved noticeably."""
+        if "media_position" in self._optimistic:
+            # Keep the seek target until PipePlay reports the new position
+            return False
+
+        position = snapshot.media_position
+        playing = snapshot.state == MediaPlayerState.PLAYING
+        now = dt_util.utcnow()
+
+        if position is None:
+            if self._position is None:
+                return False
+            self._position = None
+            self._position_updated_at = None
+            return True
+
+        if (
+            self._position is not None
+            and playing == self._position_playing
+            and abs(position - self._extrapolated_position()) <= POSITION_DRIFT_TOLERANCE
+        ):
+            return False
+
+        # First report, rate change (play/pause) or seek/drift: re-anchor
+        self._position = position
+        self._position_updated_at = now
+        self._position_playing = playing
+        return True
+
+    @callback
+    def _async_apply_optimistic(self, expected: Dict[str, Any]) -> int:
+        """Show the expected result of a command before PipePlay confirms it.
+
+        Returns a token that identifies these values in a later rollback.
+        """
+        now = dt_util.utcnow()
+        timeout = OPTIMISTIC_TIMEOUT
+        if self.coordinator.polling_mode == MODE_POLL:
+            # Only a poll can confirm the change; never give up before it
+            timeout = max(timeout, 2 * self.coordinator.poll_interval)
+        deadline = time.monotonic() + timeout
+
+        if "media_position" in expected:
+            # Seeks move the position anchor straight away
+            self._position = expected["media_position"]
+            self._position_updated_at = now
+        elif "state" in expected and self._position is not None:
+            self._position = self._extrapolated_position()
+            self._position_updated_at = now
+            self._position_playing = expected["state"] == "playing"
+
+        token = next(self._optimistic_tokens)
+        for key, value in expected.items():
+            self._optimistic[key] = (value, deadline, token)
+        self._snapshot = PipePlayStatus.from_dict(self._status())
+
+        if self._unsub_optimistic is None:
+            self._unsub_optimistic = async_call_later(
+                self.hass, timeout, self._async_expire_optimistic
+            )
+
+        self.metrics.writes += 1
+        self.async_write_ha_state()
+        return token
+
+    @callback
+    def _async_rollback_optimistic(self, keys, token: Optional[int] = None) -> None:
+        """Revert optimistic values and show what PipePlay last reported.
+
+        With a token, only values set by that command are reverted; a newer
+        command's value for the same field is kept.
+        """
+        rolled_back = False
+        for key in keys:
+            entry = self._optimistic.get(key)
+            if entry is None or (token is not None and entry[2] != token):
+                continue
+            del self._optimistic[key]
+            self.optimistic_rollbacks += 1
+            rolled_back = True
+        if not rolled_back:
+            return
+
+        # Re-anchor the position on the reported value
+        self._position = None
+        self._track_status()
+        self.metrics.writes += 1
+        self.async_write_ha_state()
+
+    @callback
+    def _async_expire_optimistic(self, _now: datetime) -> None:
+        """Roll back optimistic values that were never confirmed."""
+        self._unsub_optimistic = None
+        now = time.monotonic()
+
+        expired = [key for key, (_, deadline, _) in self._optimistic.items() if deadline <= now]
+        if expired:
+            _LOGGER.debug("Command result not confirmed in time, rolling back %s", expired)
+            self._async_rollback_optimistic(expired)
+
+        if self._optimistic:
+            next_deadline = min(deadline for _, deadline, _ in self._optimistic.values())
+            self._unsub_optimistic = async_call_later(
+                self.hass, max(next_deadline - now, 0), self._async_expire_optimistic
+            )
+
+    async def async_added_to_hass(self) -> None:
+        """Register the player and restore its last state until PipePlay answers."""
+        await super().async_added_to_hass()
+        self.hass.data[DOMAIN]["players"][self.entity_id] = self
+
+        if self.coordinator.data is not None or not self.coordinator.last_update_success:
+            # PipePlay already answered, or the first refresh already failed:
+            # a failure repeating later would never clear the restored state
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            self._snapshot = PipePlayStatus.from_state(last_state)
+            self._restored = True
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop sending commands when the entity is removed."""
+        self.hass.data[DOMAIN]["players"].pop(self.entity_id, None)
+        for player in self._async_leave_group():
+            if player is not self:
+                player.metrics.writes += 1
+                player.async_write_ha_state()
+        if self._unsub_optimistic is not None:
+            self._unsub_optimistic()
+            self._unsub_optimistic = None
+        self._async_cancel_fade()
+        self._async_reset_preload()
+        self._async_finish_play_trace("removed")
+        await self.hass.data[DOMAIN]["streamer"].async_stop(self.unique_id)
+        await self.command_queue.async_shutdown()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when something other than expected progress changed."""
+        was_restored, self._restored = self._restored, False
+        if self._play_trace is not None:
+            self._async_confirm_play()
+        if self._announce_end is not None:
+            self._async_track_announcement()
+        elif self.playlist.items and not self.coordinator.sink_status(self._sink_id).get("announcing"):
+            # PipePlay's announcements are not queue items
+            self._async_track_playlist()
+
+        changed = self._track_status()
+        if self.playlist.items:
+            self._async_schedule_preload()
+
+        if not changed and not was_restored:
+            self.suppressed_writes += 1
+            return
+
+        self.metrics.writes += 1
+        self.async_write_ha_state()
 
     @property
     def name(self) -> str:
@@ -207,146 +473,644 @@ class PipePlayMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return self.coordinator.last_update_success
+        if self._restored:
+            return self.coordinator.last_update_success
+        return self.coordinator.last_update_success and self._sink_id in (self.coordinator.data or {})
 
     @property
     def state(self) -> str:
         """Return the current state of the media player."""
         if not self.coordinator.last_update_success:
-            return MediaPlayerState.UNAVAILABLE
-            
-        state = self.coordinator.data.get("state", "idle")
-        
-        state_mapping = {
-            "idle": MediaPlayerState.IDLE,
-            "playing": MediaPlayerState.PLAYING,
-            "paused": MediaPlayerState.PAUSED,
-            "buffering": MediaPlayerState.BUFFERING,
-        }
-        
-        return state_mapping.get(state, MediaPlayerState.IDLE)
+            return None
+        return self._snapshot.state
 
     @property
     def icon(self) -> str:
         """Return the icon for the media player."""
-        if self.state == MediaPlayerState.PLAYING:
-            return "mdi:speaker-play"
-        elif self.state == MediaPlayerState.PAUSED:
-            return "mdi:speaker-pause"
-        else:
-            return "mdi:speaker"
+        return self._snapshot.icon
 
     @property
     def volume_level(self) -> Optional[float]:
         """Return the volume level of the media player (0..1)."""
-        return self.coordinator.data.get("volume_level")
+        if self._fade is not None:
+            return self._fade.level()
+        return self._snapshot.volume_level
 
     @property
     def is_volume_muted(self) -> Optional[bool]:
         """Return boolean if volume is currently muted."""
-        return self.coordinator.data.get("is_muted")
+        return self._snapshot.is_muted
+
+    @property
+    def media_content_id(self) -> Optional[str]:
+        """Return the content id of current playing media."""
+        return self._snapshot.media_content_id
 
     @property
     def media_content_type(self) -> Optional[str]:
         """Return the media content type."""
-        return self.coordinator.data.get("media_content_type")
+        return self._snapshot.media_content_type
 
     @property
     def media_title(self) -> Optional[str]:
         """Return the title of current playing media."""
-        return self.coordinator.data.get("media_title")
+        return self._snapshot.media_title
 
     @property
     def media_artist(self) -> Optional[str]:
         """Return the artist of current playing media."""
-        return self.coordinator.data.get("media_artist")
+        return self._snapshot.media_artist
 
     @property
     def media_album_name(self) -> Optional[str]:
         """Return the album name of current playing media."""
-        return self.coordinator.data.get("media_album")
+        return self._snapshot.media_album
 
     @property
     def media_duration(self) -> Optional[int]:
         """Return the duration of current playing media in seconds."""
-        duration = self.coordinator.data.get("media_duration")
-        return int(duration) if duration and duration > 0 else None
+        return self._snapshot.media_duration
+
+    @property
+    def media_image_url(self) -> Optional[str]:
+        """Return the artwork URL of current playing media."""
+        url = self._snapshot.media_image_url
+        if url is not None and url.startswith("/"):
+            # Artwork served by PipePlay itself, e.g. extracted from tags
+            url = f"http://{self.coordinator.host}:{self.coordinator.port}{url}"
+        return url
+
+    @property
+    def media_image_hash(self) -> Optional[str]:
+        """Return a hash that changes with the artwork, for browser caching."""
+        if (url := self.media_image_url) is None:
+            return None
+        # PipePlay may serve every cover from the same URL; the track tells them apart
+        key = f"{url}|{self._snapshot.media_content_id or self._snapshot.media_title or ''}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    async def async_get_media_image(self) -> Tuple[Optional[bytes], Optional[str]]:
+        """Return the current artwork, downscaled and cached on disk."""
+        if (url := self.media_image_url) is None:
+            return None, None
+
+        headers = None
+        if url.startswith(f"http://{self.coordinator.host}:{self.coordinator.port}/"):
+            headers = self.coordinator.auth_headers()
+        return await self.hass.data[DOMAIN]["artwork"].async_get_image(url, headers)
 
     @property
     def media_position(self) -> Optional[int]:
         """Return the position of current playing media in seconds."""
-        position = self.coordinator.data.get("media_position")
-        return int(position) if position else None
+        return int(self._position) if self._position is not None else None
 
     @property
-    def media_position_updated_at(self):
-        """Return when the position was last updated."""
-        # Use the last coordinator update time as position update time
-        return getattr(self.coordinator, 'last_update_success', None)
+    def media_position_updated_at(self) -> Optional[datetime]:
+        """Return when the position was last observed."""
+        return self._position_updated_at
 
-    async def async_play_media(self, media_type: str, media_id: str, **kwargs) -> None:
-        """Play media from a URL or file path."""
-        original_media_id = media_id
-        
-        # Resolve media-source URLs to actual playable URLs
+    @callback
+    def _async_track_playlist(self) -> None:
+        """Follow PipePlay to the next queued item, or start it when PipePlay stops."""
+        status = PipePlayStatus.from_dict(self.coordinator.sink_status(self._sink_id))
+        state = status.state
+        previous_state, self._reported_state = self._reported_state, state
+
+        if self._preloaded_url is not None and self._preload_index == self.playlist.index + 1:
+            content_id = status.media_content_id
+            if content_id is not None:
+                advanced = content_id == self._preloaded_url
+            else:
+                # Without a content id, a position that jumps back to the
+                # start near the end of the track means the next one began
+                position = status.media_position
+                expected = self._extrapolated_position()
+                advanced = (
+                    state == MediaPlayerState.PLAYING
+                    and position is not None
+                    and self._position is not None
+                    and position + POSITION_DRIFT_TOLERANCE < expected
+                    and expected >= (self._preload_duration or 0) - PRELOAD_LEAD
+                )
+            if advanced:
+                self.playlist.advance()
+                self._preload_index = None
+                self._preloaded_url = None
+                self.queue_advances += 1
+
+        if (
+            state == MediaPlayerState.IDLE
+            and previous_state == MediaPlayerState.PLAYING
+            and self._advance_on_idle
+            and self.playlist.next_item is not None
+        ):
+            # PipePlay did not take (or could not play) the next item
+            self.hass.async_create_task(self.async_media_next_track())
+
+    @callback
+    def _async_schedule_preload(self) -> None:
+        """Arrange for the next queued item to reach PipePlay before the current one ends."""
+        next_index = self.playlist.index + 1
+        item = self.playlist.next_item
+        if item is None or self._unsub_preload is not None or self._preload_index == next_index:
+            return
+
+        if self._snapshot.state != MediaPlayerState.PLAYING:
+            return
+
+        delay = 0.0
+        duration = self._snapshot.media_duration
+        if duration and self._position is not None:
+            delay = max(duration - self._extrapolated_position() - PRELOAD_LEAD, 0.0)
+
+        if item.media_id.startswith("media-source://"):
+            # Resolve now so the hand-over is a cache hit
+            self.hass.async_create_background_task(
+                self._async_resolve_media(item.media_id), f"pipeplay resolve {item.media_id}"
+            )
+        self._unsub_preload = async_call_later(self.hass, delay, self._async_preload_next)
+
+    @callback
+    def _async_preload_next(self, _now: datetime) -> None:
+        """Hand the next queued item to PipePlay."""
+        self._unsub_preload = None
+        self.hass.async_create_task(self._async_send_next_item())
+
+    async def _async_send_next_item(self) -> None:
+        """Resolve the next queued item and send it as PipePlay's next track."""
+        index = self.playlist.index + 1
+        item = self.playlist.next_item
+        if item is None:
+            return
+        self._preload_index = index
+
+        url = await self._async_resolve_media(item.media_id)
+        if self._preload_index != index or self.playlist.next_item != item:
+            # The queue changed while resolving
+            return
+
+        if await self._async_send_to_group(
+            "queue_next", {"media_type": item.media_type, "media_id": url}
+        ):
+            self._preloaded_url = url
+            self._preload_duration = self._snapshot.media_duration
+            self.queue_preloads += 1
+        else:
+            # Leave it to the idle fallback to start the next item
+            _LOGGER.debug("PipePlay did not accept the next queued item for %s", self.entity_id)
+
+    @callback
+    def _async_reset_preload(self) -> None:
+        """Forget the handed-over next item, e.g. after the queue changed."""
+        if self._unsub_preload is not None:
+            self._unsub_preload()
+            self._unsub_preload = None
+        self._preload_index = None
+        self._preloaded_url = None
+
+    async def _async_drop_preload(self) -> None:
+        """Forget the next item, taking it back from PipePlay if it was handed over."""
+        handed_over = self._preloaded_url is not None
+        self._async_reset_preload()
+        if handed_over:
+            # New media does not clear PipePlay's queue
+            await self._async_send_to_group("queue_clear")
+
+    async def _async_resolve_media(self, media_id: str) -> str:
+        """Resolve media-source ids to a URL PipePlay can play."""
         if media_id and media_id.startswith("media-source://"):
-            try:
-                # Use coordinator's hass instance if entity's hass is not available yet
-                hass_instance = self.hass if self.hass is not None else self.coordinator.hass
-                
-                _LOGGER.info("Attempting to resolve media-source URL: %s", media_id)
-                
-                if hass_instance is not None:
-                    # Use the same pattern as MPD integration
-                    try:
-                        # Step 1: Resolve the media source to get a play item
-                        play_item = await async_resolve_media(hass_instance, media_id, self.entity_id)
-                        _LOGGER.info("Resolved media item: %s", play_item)
-                        
-                        if play_item and hasattr(play_item, 'url'):
-                            # Step 2: Process the play item URL to make it accessible
-                            media_id = async_process_play_media_url(hass_instance, play_item.url)
-                            _LOGGER.info("Successfully resolved media-source URL from %s to: %s", original_media_id, media_id)
-                        else:
-                            _LOGGER.warning("Failed to resolve media-source URL: %s", media_id)
-                    except Exception as resolve_e:
-                        _LOGGER.error("Error in two-step resolution for %s: %s", media_id, resolve_e)
-                        # Fallback to direct resolution
-                        try:
-                            resolved_url = async_process_play_media_url(hass_instance, media_id)
-                            if resolved_url and resolved_url != media_id:
-                                media_id = resolved_url
-                                _LOGGER.info("Fallback resolution succeeded: %s", media_id)
-                            else:
-                                _LOGGER.warning("All resolution methods failed for: %s", media_id)
-                        except Exception as fallback_e:
-                            _LOGGER.error("Fallback resolution also failed: %s", fallback_e)
+            resolver = self.hass.data[DOMAIN]["media_resolver"]
+            started = time.monotonic()
+            url = await resolver.async_resolve(media_id, self.entity_id)
+            self.metrics.resolve.record(time.monotonic() - started)
+            return url
+        return media_id
+
+    async def _async_play_item(self, item: PlaylistItem) -> None:
+        """Play a queue item right away."""
+        await self._async_send_media(item, "play_media")
+
+    async def _async_send_media(
+        self,
+        item: PlaylistItem,
+        command: str,
+        data: Optional[Dict[str, Any]] = None,
+        announce: bool = False,
+    ) -> bool:
+        """Resolve and send a media command, tracing each stage."""
+        self._async_finish_play_trace("superseded")
+        trace = self.hass.data[DOMAIN]["tracer"].start(self.entity_id, item.media_id)
+
+        try:
+            with use_trace(trace):
+                if command == "play_media" and not announce:
+                    # New media replaces a pushed stream; announcements and
+                    # crossfades play over it until PipePlay drops it
+                    await self.hass.data[DOMAIN]["streamer"].async_stop(self.unique_id)
+                if command == "play_media" and not announce and await self._async_push_media(item):
+                    await self._async_drop_preload()
+                    self._advance_on_idle = True
+                    # PipePlay reports the pushed stream under its media-source id
+                    media_id, accepted = item.media_id, True
                 else:
-                    _LOGGER.error("No hass instance available to resolve media-source URL")
-            except Exception as e:
-                _LOGGER.error("Error resolving media-source URL %s: %s", media_id, e)
-                import traceback
-                _LOGGER.error("Traceback: %s", traceback.format_exc())
-        
-        await self._send_command("play_media", {
-            "media_type": media_type,
-            "media_id": media_id
-        })
+                    # Resolve media-source URLs to actual playable URLs, once for the group
+                    with trace.span("resolve", media_source=item.media_id.startswith("media-source://")):
+                        media_id = await self._async_resolve_media(item.media_id)
+                    if not announce:
+                        await self._async_drop_preload()
+                        self._advance_on_idle = True
+                    with trace.span("command", command=command, members=len(self._group_followers) + 1):
+                        accepted = await self._async_send_to_group(command, {
+                            "media_type": item.media_type,
+                            "media_id": media_id,
+                            **(data or {}),
+                        })
+        except BaseException:
+            trace.finish("error")
+            raise
+
+        if not accepted:
+            trace.finish("failed")
+            return False
+
+        # The trace ends once PipePlay reports playing the new media; a
+        # concurrent play request may have started waiting meanwhile
+        self._async_finish_play_trace("superseded")
+        self._play_trace = trace
+        self._play_confirm = trace.begin("first_audio" if announce else "confirm")
+        self._play_url = media_id
+        self._play_announce = announce and command == "announce"
+        self._unsub_play_trace = async_call_later(
+            self.hass, CONFIRM_TIMEOUT, self._async_play_unconfirmed
+        )
+        # An event may have arrived before the acknowledgement; without a
+        # content id only a later update can tell the new media from the old
+        self._async_confirm_play(require_content_id=True)
+        return True
+
+    async def _async_push_media(self, item: PlaylistItem) -> bool:
+        """Start streaming a local media file to PipePlay, if push mode applies."""
+        coordinator = self.coordinator
+        if not coordinator.push_media or coordinator.push_supported is False or self._group_followers:
+            # Group members each fetch the media themselves
+            return False
+
+        streamer = self.hass.data[DOMAIN]["streamer"]
+        with span("local_media"):
+            media = await streamer.async_local_media(item.media_id)
+        if media is None:
+            return False
+        with span("push_first_chunk", bytes=media.size):
+            return await streamer.async_start(
+                coordinator, self.unique_id, media, item.media_type, item.media_id, self._sink_id
+            )
+
+    @callback
+    def _async_confirm_play(self, require_content_id: bool = False) -> None:
+        """Close the pending play trace if PipePlay reports the new media playing."""
+        status = self.coordinator.sink_status(self._sink_id)
+        if self._play_announce:
+            # PipePlay flags the announcement once its first audio is out
+            if status.get("announcing") is not True:
+                return
+        else:
+            if status.get("state") != "playing":
+                return
+            content_id = status.get("media_content_id")
+            if content_id != self._play_url and (content_id is not None or require_content_id):
+                # Still the previous media
+                return
+
+        now = time.monotonic()
+        self._play_confirm.end = now
+        if self._play_confirm.name == "first_audio":
+            self.metrics.announce.record(now - self._play_trace.start)
+        self._async_finish_play_trace("playing")
+
+    @callback
+    def _async_play_unconfirmed(self, _now: datetime) -> None:
+        """Give up waiting for PipePlay to report the new media playing."""
+        self._unsub_play_trace = None
+        self._async_finish_play_trace("unconfirmed")
+
+    @callback
+    def _async_finish_play_trace(self, outcome: str) -> None:
+        """Close the pending play trace, if any."""
+        if self._unsub_play_trace is not None:
+            self._unsub_play_trace()
+            self._unsub_play_trace = None
+        if self._play_trace is not None:
+            self._play_trace.finish(outcome)
+        self._play_trace = None
+        self._play_confirm = None
+        self._play_url = None
+        self._play_announce = False
+
+    async def _async_announce(self, item: PlaylistItem) -> None:
+        """Play an announcement over the current media, then resume it.
+
+        PipePlay's announce command ducks (or pauses) the current stream,
+        starts the announcement as soon as its first audio arrives, and
+        restores the stream and position by itself. Servers without it get
+        the announcement as regular media, after which the previous media is
+        restarted at its position, pushed again if it was streamed from a
+        local file.
+        """
+        previous = self._snapshot
+        position = self._extrapolated_position() if self._position is not None else None
+
+        coordinator = self.coordinator
+        if coordinator.announce_supported is not False:
+            if await self._async_send_media(item, "announce", {"duck": ANNOUNCE_DUCK_LEVEL}, announce=True):
+                coordinator.announce_supported = True
+                return
+
+        self._announce_end = self.hass.loop.create_future()
+        try:
+            if not await self._async_send_media(item, "play_media", announce=True):
+                return
+            if coordinator.announce_supported is None:
+                # Reachable, but the announce command was refused
+                _LOGGER.info(
+                    "PipePlay at %s has no announce command, announcements interrupt the media",
+                    coordinator.host,
+                )
+                coordinator.announce_supported = False
+            try:
+                async with asyncio.timeout(ANNOUNCE_TIMEOUT):
+                    await self._announce_end
+            except TimeoutError:
+                _LOGGER.debug("Announcement on %s did not finish in time", self.entity_id)
+        finally:
+            self._announce_end = None
+
+        if previous.state not in (MediaPlayerState.PLAYING, MediaPlayerState.PAUSED):
+            return
+        if previous.media_content_id is None:
+            _LOGGER.debug("Cannot resume %s after the announcement: media unknown", self.entity_id)
+            return
+
+        # Pushed media is reported under its media-source id, so resume it
+        # the way it was started: resolved, or pushed again
+        resumed = PlaylistItem(previous.media_content_type or MediaType.MUSIC, previous.media_content_id)
+        if not await self._async_send_media(resumed, "play_media"):
+            return
+        if position:
+            await self.async_media_seek(position)
+        if previous.state == MediaPlayerState.PAUSED:
+            await self._async_send_to_group("pause")
+
+    @callback
+    def _async_track_announcement(self) -> None:
+        """Notice the end of an announcement played as regular media."""
+        if self._play_trace is not None or self._announce_end.done():
+            # Not started yet
+            return
+        if self.coordinator.sink_status(self._sink_id).get("state") == "idle":
+            self._announce_end.set_result(None)
+
+    async def async_fade_volume(self, volume_level: float, duration: float, curve: str = CURVE_LINEAR) -> None:
+        """Ramp the volume to ``volume_level`` over ``duration`` seconds.
+
+        PipePlay runs the ramp after a single fade_volume command, and the
+        entity interpolates the volume along the same curve meanwhile,
+        writing it every ``FADE_WRITE_INTERVAL`` seconds. Servers without the command get a volume command every
+        ``FADE_FALLBACK_STEP`` seconds instead.
+        """
+        start_level = self.volume_level
+        self._async_cancel_fade()
+        fade = VolumeFade(volume_level if start_level is None else start_level, volume_level, duration, curve)
+
+        coordinator = self.coordinator
+        if coordinator.fade_supported is not False:
+            self._fade = fade
+            self._async_write_fade()
+            if await self.command_queue.async_send(
+                "fade_volume", {"level": volume_level, "duration": duration, "curve": curve}
+            ):
+                coordinator.fade_supported = True
+                return
+            if self._fade is fade:
+                self._async_end_fade()
+            if coordinator.fade_supported:
+                return
+
+        self._fade_task = self.hass.async_create_background_task(
+            self._async_step_fade(fade), f"pipeplay fade {self.entity_id}"
+        )
+
+    async def _async_step_fade(self, fade: VolumeFade) -> None:
+        """Follow a fade with volume commands, for servers that cannot fade."""
+        coordinator = self.coordinator
+        while True:
+            level = fade.level()
+            if not await self._send_command("volume", {"level": level}):
+                return
+            if coordinator.fade_supported is None:
+                # Reachable, but the fade_volume command was refused
+                _LOGGER.info(
+                    "PipePlay at %s has no fade_volume command, fades are sent step by step",
+                    coordinator.host,
+                )
+                coordinator.fade_supported = False
+            if level == fade.target:
+                return
+            await asyncio.sleep(FADE_FALLBACK_STEP)
+
+    @callback
+    def _async_write_fade(self, _now: Optional[datetime] = None) -> None:
+        """Write the interpolated volume, and again until the ramp is over."""
+        fade = self._fade
+        remaining = fade.duration - (time.monotonic() - fade.start)
+        if remaining <= 0:
+            self._async_end_fade()
+            return
+        self._unsub_fade = async_call_later(
+            self.hass, min(FADE_WRITE_INTERVAL, remaining), self._async_write_fade
+        )
+        self.metrics.writes += 1
+        self.async_write_ha_state()
+
+    @callback
+    def _async_end_fade(self, _now: Optional[datetime] = None) -> None:
+        """Show the reported volume again once the ramp is over."""
+        self._async_cancel_fade()
+        self._track_status()
+        self.metrics.writes += 1
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_fade(self) -> None:
+        """Forget the running fade; PipePlay stops it on the next volume command."""
+        if self._unsub_fade is not None:
+            self._unsub_fade()
+            self._unsub_fade = None
+        if self._fade_task is not None:
+            self._fade_task.cancel()
+            self._fade_task = None
+        self._fade = None
+
+    async def async_crossfade_to(
+        self, media_content_id: str, media_content_type: str, duration: float, curve: str = CURVE_LINEAR
+    ) -> None:
+        """Fade from the current media to another over ``duration`` seconds.
+
+        PipePlay starts the new media and mixes the two itself. Servers
+        without the crossfade command switch to the new media directly.
+        """
+        item = PlaylistItem(media_content_type, media_content_id)
+        self.playlist.replace(item)
+
+        coordinator = self.coordinator
+        if coordinator.crossfade_supported is not False:
+            if await self._async_send_media(item, "crossfade", {"duration": duration, "curve": curve}):
+                coordinator.crossfade_supported = True
+                return
+            if coordinator.crossfade_supported:
+                return
+
+        if await self._async_send_media(item, "play_media") and coordinator.crossfade_supported is None:
+            _LOGGER.info(
+                "PipePlay at %s has no crossfade command, crossfades switch media directly",
+                coordinator.host,
+            )
+            coordinator.crossfade_supported = False
+
+    @property
+    def group_members(self) -> List[str]:
+        """Return the players grouped with this one, leader first."""
+        leader = self._group_leader or self
+        return [leader.entity_id] + [player.entity_id for player in leader._group_followers]
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return whether the state is restored, a running fade and the last group start skew."""
+        attributes = {}
+        if self._restored:
+            attributes["stale"] = True
+        if self._fade is not None:
+            attributes["volume_fade"] = {
+                "target": self._fade.target,
+                "curve": self._fade.curve,
+                "ends_at": self._fade.ends_at.isoformat(),
+            }
+        if self.group_sync is not None and self.group_sync.get("start_skew") is not None:
+            attributes["group_start_skew"] = self.group_sync["start_skew"]
+        return attributes or None
+
+    async def async_join_players(self, group_members: List[str]) -> None:
+        """Join other PipePlay players to this player's group."""
+        players = self.hass.data[DOMAIN]["players"]
+        members = []
+        for entity_id in group_members:
+            if entity_id == self.entity_id:
+                continue
+            player = players.get(entity_id)
+            if player is None:
+                raise HomeAssistantError(f"{entity_id} is not a PipePlay player")
+            members.append(player)
+
+        if self._group_leader is not None:
+            self._async_leave_group()
+
+        changed = {self}
+        for player in members:
+            if player._group_leader is self:
+                continue
+            changed.update(player._async_leave_group())
+            player._group_leader = self
+            self._group_followers.append(player)
+            changed.add(player)
+
+        for player in changed:
+            player.metrics.writes += 1
+            player.async_write_ha_state()
+
+    async def async_unjoin_player(self) -> None:
+        """Remove this player from its group."""
+        for player in self._async_leave_group():
+            player.metrics.writes += 1
+            player.async_write_ha_state()
+
+    @callback
+    def _async_leave_group(self) -> List["PipePlayMediaPlayer"]:
+        """Leave the current group and return the players whose group changed."""
+        changed = []
+        if self._group_leader is not None:
+            leader = self._group_leader
+            leader._group_followers.remove(self)
+            self._group_leader = None
+            changed = [self, leader, *leader._group_followers]
+        elif self._group_followers:
+            # The first follower takes over as leader of the rest
+            followers = self._group_followers
+            self._group_followers = []
+            new_leader, *rest = followers
+            new_leader._group_leader = None
+            new_leader._group_followers = rest
+            for player in rest:
+                player._group_leader = new_leader
+            changed = [self, *followers]
+        return [player for player in changed if player.hass is not None]
+
+    async def _async_send_to_group(self, command: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Send a command to this player and, when it leads a group, to every member."""
+        if not self._group_followers:
+            return await self._send_command(command, data)
+
+        stats = await async_group_send([self, *self._group_followers], command, data)
+        _LOGGER.debug("Group %s of %s: %s", command, self.entity_id, stats)
+        if "start_skew" in stats:
+            self.group_sync = stats
+            self.metrics.writes += 1
+            self.async_write_ha_state()
+        return stats["failed"] == 0
+
+    async def async_play_media(self, media_type: str, media_id: str, **kwargs) -> None:
+        """Play media from a URL or file path, or add it to the queue."""
+        item = PlaylistItem(media_type, media_id)
+        enqueue = kwargs.get(ATTR_MEDIA_ENQUEUE)
+
+        if kwargs.get(ATTR_MEDIA_ANNOUNCE):
+            await self._async_announce(item)
+            return
+
+        if enqueue in (MediaPlayerEnqueue.ADD, MediaPlayerEnqueue.NEXT):
+            next_item = self.playlist.next_item
+            if enqueue == MediaPlayerEnqueue.ADD:
+                self.playlist.add(item)
+            else:
+                self.playlist.insert_next(item)
+            if self.playlist.next_item != next_item:
+                # PipePlay holds the old next item; hand over the new one
+                self._async_reset_preload()
+            self._async_schedule_preload()
+            return
+
+        if enqueue == MediaPlayerEnqueue.PLAY:
+            self.playlist.insert_next(item)
+            self.playlist.advance()
+        else:
+            self.playlist.replace(item)
+        await self._async_play_item(item)
 
     async def async_media_play(self) -> None:
         """Send play command."""
-        await self._send_command("play")
+        await self._async_send_to_group("play")
 
     async def async_media_pause(self) -> None:
         """Send pause command."""
-        await self._send_command("pause")
+        await self._async_send_to_group("pause")
 
     async def async_media_stop(self) -> None:
         """Send stop command."""
-        await self._send_command("stop")
+        self._advance_on_idle = False
+        await self._async_send_to_group("stop")
+        await self.hass.data[DOMAIN]["streamer"].async_stop(self.unique_id)
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1."""
+        self._async_cancel_fade()
         await self._send_command("volume", {"level": volume})
 
     async def async_mute_volume(self, mute: bool) -> None:
@@ -356,7 +1120,25 @@ class PipePlayMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
     async def async_media_seek(self, position: float) -> None:
         """Send seek command."""
         await self._send_command("seek", {"position": position})
+        # A pushed stream may need another part of the file now
+        self.hass.data[DOMAIN]["streamer"].async_wake(self.unique_id)
+
+    async def async_media_next_track(self) -> None:
+        """Play the next item in the queue."""
+        item = self.playlist.advance(1)
+        if item is not None:
+            await self._async_play_item(item)
 
+    async def async_media_previous_track(self) -> None:
+        """Play the previous item in the queue."""
+        item = self.playlist.advance(-1)
+        if item is not None:
+            await self._async_play_item(item)
+
+    async def async_clear_playlist(self) -> None:
+        """Clear the queue; the current item keeps playing."""
+        self.playlist.clear()
+        await self._async_drop_preload()
 
     async def async_turn_on(self) -> None:
         """Turn the media player on."""
@@ -368,55 +1150,44 @@ class PipePlayMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
 
     async def async_volume_up(self) -> None:
         """Volume up the media player."""
+        self._async_cancel_fade()
         await self._send_command("volume_up")
 
     async def async_volume_down(self) -> None:
         """Volume down the media player."""
+        self._async_cancel_fade()
         await self._send_command("volume_down")
 
-
-
     async def async_browse_media(self, media_content_type: str = None, media_content_id: str = None):
         """Implement the websocket media browsing helper."""
-        # Use coordinator's hass instance if entity's hass is not available yet
-        hass_instance = self.hass if self.hass is not None else self.coordinator.hass
-        
-        # Browse Home Assistant's media sources
-        return await media_source.async_browse_media(
-            hass_instance, media_content_id, content_filter=lambda item: True
-        )
+        # Browse Home Assistant's media sources, limited to what PipePlay can play
+        return await self.hass.data[DOMAIN]["browse_cache"].async_browse(media_content_id)
 
+    async def _send_command(self, command: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Send command to PipePlay service through the player's command queue."""
+        expected = _expected_status(command, data)
+        token = self._async_apply_optimistic(dict(expected)) if expected else None
 
+        result = await self.command_queue.async_send(command, data)
 
-    async def _send_command(self, command: str, data: Optional[Dict[str, Any]] = None) -> None:
-        """Send command to PipePlay service."""
-        try:
-            # Use coordinator's hass instance if entity's hass is not available yet
-            hass_instance = self.hass if self.hass is not None else self.coordinator.hass
-            
-            if hass_instance is None:
-                _LOGGER.error("No hass instance available for command %s", command)
-                return
-                
-            session = async_get_clientsession(hass_instance)
-            url = f"{self.coordinator.base_url}/command"
-            headers = self.coordinator._get_headers()
-            
-            payload = {"command": command}
-            if data:
-                payload.update(data)
-            
-            _LOGGER.debug("Sending command %s to %s", command, url)
-            
-            async with asyncio.timeout(10):
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 401:
-                        _LOGGER.error("Authentication failed for command %s - check API key", command)
-                    elif response.status != 200:
-                        _LOGGER.error("Failed to send command %s: %s", command, response.status)
-                    else:
-                        _LOGGER.debug("Command %s sent successfully", command)
-                        # Trigger immediate update
-                        await self.coordinator.async_request_refresh()
-        except Exception as err:
-            _LOGGER.error("Error sending command %s: %s", command, err)
\ No newline at end of file
+        if not result and expected:
+            self._async_rollback_optimistic(expected, token)
+
+        return result
+
+
+def _expected_status(command: str, data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the status fields a successful command is expected to change."""
+    if command == "play":
+        return {"state": "playing"}
+    if command == "pause":
+        return {"state": "paused"}
+    if command == "stop":
+        return {"state": "idle"}
+    if command == "volume" and data:
+        return {"volume_level": float(data["level"])}
+    if command == "mute" and data:
+        return {"is_muted": data["muted"]}
+    if command == "seek" and data:
+        return {"media_position": float(data["position"])}
+    return {}
@@ -0,0 +1,97 @@
+"""Low-overhead latency histograms and counters for PipePlay."""
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+# Upper bucket bounds in seconds; the last bucket takes everything slower
+BUCKET_BOUNDS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram.
+
+    Buckets are allocated once; recording a sample is a binary search and
+    a few integer updates, so it can stay enabled on every event.
+    Percentiles are reported as the upper bound of the bucket they fall in.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts: List[int] = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one sample."""
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Return the bucket bound at or below which ``fraction`` of samples fall."""
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= threshold:
+                # Never report more than the slowest sample actually seen
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a summary in milliseconds, plus the raw buckets."""
+
+        def _ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+            "max_ms": _ms(self.max) if self.count else None,
+            "buckets_ms": {
+                f"le_{_ms(bound)}": count
+                for bound, count in zip(BUCKET_BOUNDS, self.counts)
+            } | {"inf": self.counts[-1]},
+        }
+
+
+class PipePlayMetrics:
+    """Latencies and counters of one PipePlay player (sink)."""
+
+    HISTOGRAMS = ("command", "resolve", "event_lag", "announce")
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        # Command sent until PipePlay accepted it (HTTP response or WebSocket ack)
+        self.command = LatencyHistogram()
+        # media-source:// id to playable URL
+        self.resolve = LatencyHistogram()
+        # Server timestamp of an event until the state write it caused
+        self.event_lag = LatencyHistogram()
+        # Announcement requested until PipePlay reported its first audio
+        self.announce = LatencyHistogram()
+
+        self.events = 0
+        self.writes = 0
+        self.command_failures = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        return {
+            **{name: getattr(self, name).as_dict() for name in self.HISTOGRAMS},
+            "events": self.events,
+            "writes": self.writes,
+            "command_failures": self.command_failures,
+        }
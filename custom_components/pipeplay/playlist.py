@@ -0,0 +1,70 @@
+"""Play queue for PipePlay players."""
+from typing import List, NamedTuple, Optional
+
+
+class PlaylistItem(NamedTuple):
+    """A queued media item, as passed to play_media."""
+
+    media_type: str
+    media_id: str
+
+
+class PipePlayPlaylist:
+    """Items queued on a player and the index of the one playing.
+
+    Media ids are stored unresolved; media-source items are only resolved
+    shortly before PipePlay needs them, so signed URLs stay valid.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty playlist."""
+        self.items: List[PlaylistItem] = []
+        self.index = -1
+
+    def __len__(self) -> int:
+        """Return the number of queued items."""
+        return len(self.items)
+
+    @property
+    def current(self) -> Optional[PlaylistItem]:
+        """Return the item playing now."""
+        if 0 <= self.index < len(self.items):
+            return self.items[self.index]
+        return None
+
+    @property
+    def next_item(self) -> Optional[PlaylistItem]:
+        """Return the item that follows the current one."""
+        if self.index + 1 < len(self.items):
+            return self.items[self.index + 1]
+        return None
+
+    def replace(self, item: PlaylistItem) -> None:
+        """Drop the queue and make ``item`` the only entry."""
+        self.items = [item]
+        self.index = 0
+
+    def add(self, item: PlaylistItem) -> None:
+        """Append ``item`` to the end of the queue."""
+        self.items.append(item)
+
+    def insert_next(self, item: PlaylistItem) -> None:
+        """Queue ``item`` right after the current one."""
+        self.items.insert(self.index + 1, item)
+
+    def advance(self, step: int = 1) -> Optional[PlaylistItem]:
+        """Move ``step`` items forward (or back) and return the new current item."""
+        index = self.index + step
+        if not 0 <= index < len(self.items):
+            return None
+        self.index = index
+        return self.items[index]
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self.items = []
+        self.index = -1
+
+    def as_dict(self) -> dict:
+        """Return the queue position for diagnostics."""
+        return {"length": len(self.items), "index": self.index}
@@ -0,0 +1,342 @@
+"""Stream local media files to PipePlay."""
+import asyncio
+from email.utils import parsedate_to_datetime
+import logging
+import mimetypes
+import os
+import uuid
+from typing import TYPE_CHECKING, IO, Any, Dict, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util, raise_if_invalid_path
+
+from .breaker import STATE_CLOSED
+
+if TYPE_CHECKING:
+    from .coordinator import PipePlayUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bytes sent per request; each active stream holds one buffer of this size
+PUSH_CHUNK_SIZE = 256 * 1024
+# Memory all streams together may hold; players beyond it use the URL path
+PUSH_MEMORY_BUDGET = 4 * 1024 * 1024
+PUSH_CHUNK_TIMEOUT = 10
+# Upper bound on the pause PipePlay may ask for while its buffer is full
+PUSH_MAX_RETRY_AFTER = 30.0
+# Pause used when a busy answer carries no usable Retry-After
+PUSH_DEFAULT_RETRY_AFTER = 1.0
+
+LOCAL_MEDIA_PREFIX = "media-source://media_source/"
+
+
+class LocalMedia(NamedTuple):
+    """A local media file that can be streamed."""
+
+    path: str
+    size: int
+    mime_type: str
+
+
+def _read_chunk(file: IO[bytes], buffer: memoryview, offset: int) -> int:
+    """Read the chunk at ``offset`` into ``buffer`` and return its length."""
+    file.seek(offset)
+    return file.readinto(buffer)
+
+
+def _retry_after(value: Optional[str]) -> float:
+    """Return the seconds to wait from a Retry-After header (seconds or HTTP date)."""
+    if not value:
+        return PUSH_DEFAULT_RETRY_AFTER
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - dt_util.utcnow()).total_seconds()
+        except (TypeError, ValueError):
+            return PUSH_DEFAULT_RETRY_AFTER
+    if seconds != seconds:  # NaN
+        return PUSH_DEFAULT_RETRY_AFTER
+    return min(max(seconds, 0.0), PUSH_MAX_RETRY_AFTER)
+
+
+class PipePlayMediaStreamer:
+    """Push local media files to PipePlay in ranged chunks.
+
+    PipePlay starts playback with the first chunk and answers every chunk
+    with the offset it wants next: the following chunk, another offset
+    after a seek, or none with a ``retry_after`` while its buffer is full or
+    the whole file has been received (it may still seek back later).
+    Chunks are read into one buffer per stream that is reused for the whole
+    transfer and returned to a pool afterwards, so memory stays within
+    ``memory_budget`` however long the files are.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        memory_budget: int = PUSH_MEMORY_BUDGET,
+        chunk_size: int = PUSH_CHUNK_SIZE,
+    ) -> None:
+        """Initialize the streamer."""
+        self.hass = hass
+        self.chunk_size = chunk_size
+        self.max_streams = max(memory_budget // chunk_size, 1)
+        self._buffers: List[bytearray] = []
+        self._allocated = 0
+        # Latest read into each buffer, by buffer id; a read in the executor
+        # runs on after its stream is cancelled
+        self._reads: Dict[int, asyncio.Future] = {}
+        self._streams: Dict[str, asyncio.Task] = {}
+        # File and buffer of each stream task until they are released
+        self._open: Dict[asyncio.Task, Tuple[IO[bytes], bytearray]] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+
+        self.started = 0
+        self.over_budget = 0
+        self.chunks = 0
+        self.bytes_sent = 0
+        self.seeks = 0
+
+    def _acquire_buffer(self) -> Optional[bytearray]:
+        """Take a chunk buffer from the pool, or None if the budget is used up."""
+        if self._buffers:
+            return self._buffers.pop()
+        if self._allocated >= self.max_streams:
+            return None
+        self._allocated += 1
+        return bytearray(self.chunk_size)
+
+    async def async_local_media(self, media_id: str) -> Optional[LocalMedia]:
+        """Return the file behind a local media-source id, if it is one."""
+        if not media_id.startswith(LOCAL_MEDIA_PREFIX):
+            return None
+        source_dir_id, _, location = media_id[len(LOCAL_MEDIA_PREFIX):].partition("/")
+        media_dir = self.hass.config.media_dirs.get(source_dir_id)
+        if media_dir is None or not location:
+            return None
+        try:
+            raise_if_invalid_path(location)
+        except ValueError:
+            return None
+
+        def _stat() -> Optional[LocalMedia]:
+            path = os.path.realpath(os.path.join(media_dir, location))
+            if os.path.commonpath([path, os.path.realpath(media_dir)]) != os.path.realpath(media_dir):
+                return None
+            if not os.path.isfile(path):
+                return None
+            mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            return LocalMedia(path, os.path.getsize(path), mime_type)
+
+        return await self.hass.async_add_executor_job(_stat)
+
+    async def async_start(
+        self,
+        coordinator: "PipePlayUpdateCoordinator",
+        key: str,
+        media: LocalMedia,
+        media_type: str,
+        media_id: str,
+        sink_id: Optional[str] = None,
+    ) -> bool:
+        """Start playing ``media`` on PipePlay by pushing its first chunk.
+
+        The rest is sent in the background. Returns False when the stream
+        could not be started; the caller then falls back to a URL.
+        """
+        await self.async_stop(key)
+        if coordinator.breaker.state != STATE_CLOSED:
+            return False
+
+        buffer = self._acquire_buffer()
+        if buffer is None:
+            self.over_budget += 1
+            _LOGGER.debug("Push memory budget used up, %s fetches %s itself", key, media_id)
+            return False
+
+        url = f"{coordinator.base_url}/stream/{uuid.uuid4().hex}"
+        headers = {
+            **coordinator.auth_headers(),
+            "Content-Type": media.mime_type,
+            "X-PipePlay-Media-Type": media_type,
+            # Reported back as the media_content_id of the stream
+            "X-PipePlay-Media-Id": media_id,
+        }
+        if sink_id is not None:
+            headers["X-PipePlay-Sink"] = sink_id
+
+        file = None
+        try:
+            file = await self.hass.async_add_executor_job(open, media.path, "rb")
+            next_offset, retry_after = await self._async_send_chunk(
+                coordinator, url, headers, file, buffer, 0, media.size, first=True
+            )
+        except aiohttp.ClientResponseError as err:
+            if err.status in (404, 405, 501):
+                _LOGGER.info("PipePlay at %s cannot receive streams, it fetches media itself", coordinator.host)
+                coordinator.push_supported = False
+            await self._async_close(file, buffer)
+            return False
+        except (aiohttp.ClientError, TimeoutError, OSError) as err:
+            _LOGGER.debug("Could not start streaming %s: %s", media.path, err)
+            await self._async_close(file, buffer)
+            return False
+        except asyncio.CancelledError:
+            await self._async_close(file, buffer)
+            raise
+
+        coordinator.push_supported = True
+
+        self.started += 1
+        self._wake[key] = asyncio.Event()
+        task = self._streams[key] = self.hass.async_create_background_task(
+            self._async_stream(coordinator, key, url, headers, file, buffer, media.size, next_offset, retry_after),
+            f"pipeplay push {key}",
+        )
+        # Released when the task ends, even if it is cancelled before it
+        # ever ran and its own cleanup never starts
+        self._open[task] = (file, buffer)
+        task.add_done_callback(self._stream_done)
+        return True
+
+    async def _async_stream(
+        self,
+        coordinator: "PipePlayUpdateCoordinator",
+        key: str,
+        url: str,
+        headers: Dict[str, str],
+        file: IO[bytes],
+        buffer: bytearray,
+        size: int,
+        next_offset: Optional[int],
+        retry_after: Optional[float],
+    ) -> None:
+        """Send chunks until PipePlay needs no more of the file."""
+        try:
+            while next_offset is not None or retry_after is not None:
+                if next_offset is None:
+                    # PipePlay holds what it needs for now; a seek wakes us early
+                    wake = self._wake[key]
+                    wake.clear()
+                    try:
+                        async with asyncio.timeout(min(retry_after, PUSH_MAX_RETRY_AFTER)):
+                            await wake.wait()
+                    except TimeoutError:
+                        pass
+                next_offset, retry_after = await self._async_send_chunk(
+                    coordinator, url, headers, file, buffer, next_offset, size
+                )
+        except (aiohttp.ClientError, TimeoutError, OSError) as err:
+            _LOGGER.debug("Streaming to %s stopped: %s", url, err)
+        finally:
+            self._streams.pop(key, None)
+            self._wake.pop(key, None)
+
+    def _stream_done(self, task: asyncio.Task) -> None:
+        """Release the file and buffer of a stream task that has ended."""
+        if task in self._open:
+            self.hass.async_create_task(self._async_release(task))
+
+    async def _async_release(self, task: asyncio.Task) -> None:
+        """Close a stream task's file and pool its buffer, once."""
+        resources = self._open.pop(task, None)
+        if resources is not None:
+            await self._async_close(*resources)
+
+    async def _async_send_chunk(
+        self,
+        coordinator: "PipePlayUpdateCoordinator",
+        url: str,
+        headers: Dict[str, str],
+        file: IO[bytes],
+        buffer: bytearray,
+        offset: Optional[int],
+        size: int,
+        first: bool = False,
+    ) -> Tuple[Optional[int], Optional[float]]:
+        """Send one chunk (or, without an offset, ask what PipePlay needs next)."""
+        if offset is None or offset >= size:
+            body: Any = b""
+            content_range = f"bytes */{size}"
+        else:
+            view = memoryview(buffer)
+            read = self._reads[id(buffer)] = self.hass.async_add_executor_job(_read_chunk, file, view, offset)
+            # Cancelling must not abandon the read; closing waits for it
+            length = await asyncio.shield(read)
+            body = view[:length]
+            content_range = f"bytes {offset}-{offset + length - 1}/{size}"
+
+        session = async_get_clientsession(self.hass)
+        busy: Optional[float] = None
+        async with asyncio.timeout(PUSH_CHUNK_TIMEOUT):
+            async with session.put(
+                url, data=body, headers={**headers, "Content-Range": content_range}
+            ) as response:
+                if response.status in (404, 410) and not first:
+                    # Stopped, or replaced by other media
+                    return None, None
+                if response.status in (429, 503):
+                    busy = _retry_after(response.headers.get("Retry-After"))
+                else:
+                    response.raise_for_status()
+                    reply = await response.json()
+
+        if busy is not None:
+            # Wait outside the request, so the pause is not bound by its timeout
+            await asyncio.sleep(busy)
+            return offset, None
+
+        next_offset = reply.get("next")
+        if not isinstance(next_offset, int):
+            next_offset = None
+        retry_after = reply.get("retry_after")
+        if offset is not None and offset < size:
+            self.chunks += 1
+            self.bytes_sent += len(body)
+            if next_offset is not None and next_offset != offset + len(body):
+                self.seeks += 1
+        return next_offset, float(retry_after) if isinstance(retry_after, (int, float)) else None
+
+    async def _async_close(self, file: Optional[IO[bytes]], buffer: bytearray) -> None:
+        """Close a stream's file and return its buffer to the pool."""
+        read = self._reads.pop(id(buffer), None)
+        if read is not None and not read.done():
+            # The executor may still be filling the buffer from the file
+            await asyncio.wait((read,))
+        self._buffers.append(buffer)
+        if file is not None:
+            await self.hass.async_add_executor_job(file.close)
+
+    def async_wake(self, key: str) -> None:
+        """Ask PipePlay what it needs now, after a seek."""
+        if (wake := self._wake.get(key)) is not None:
+            wake.set()
+
+    async def async_stop(self, key: str) -> None:
+        """Stop pushing to a player."""
+        task = self._streams.pop(key, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            self._wake.pop(key, None)
+            # Release right away, so a new stream can reuse the buffer
+            await self._async_release(task)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return streaming statistics for diagnostics."""
+        return {
+            "active": len(self._streams),
+            "max_streams": self.max_streams,
+            "buffers": self._allocated,
+            "started": self.started,
+            "over_budget": self.over_budget,
+            "chunks": self.chunks,
+            "bytes_sent": self.bytes_sent,
+            "seeks": self.seeks,
+        }
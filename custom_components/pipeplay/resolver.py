@@ -0,0 +1,119 @@
+"""Resolve media-source ids to URLs PipePlay can play."""
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import yarl
+from homeassistant.components.media_player.browse_media import (
+    async_process_play_media_url,
+)
+from homeassistant.components.media_source import async_resolve_media
+from homeassistant.core import HomeAssistant
+
+from .cache import TTLCache
+from .tracing import span
+
+_LOGGER = logging.getLogger(__name__)
+
+MEDIA_CACHE_SIZE = 256
+# Lifetime of a resolved URL that carries no signature
+MEDIA_CACHE_TTL = 3600
+# Stop using a signed URL this many seconds before its signature expires
+SIGNATURE_MARGIN = 60
+
+SIGN_QUERY_PARAM = "authSig"
+
+# Text-to-speech ids resolve to unsigned /api/tts_proxy URLs that stop
+# working once Home Assistant drops the speech from memory (after 5 minutes)
+TTS_MEDIA_PREFIX = "media-source://tts"
+
+
+def _signature_ttl(url: str) -> Optional[float]:
+    """Return the seconds left on a signed Home Assistant URL, if it is signed."""
+    token = yarl.URL(url).query.get(SIGN_QUERY_PARAM)
+    if not token:
+        return None
+
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"]) - time.time() - SIGNATURE_MARGIN
+    except (IndexError, KeyError, TypeError, ValueError):
+        # Unknown format: do not cache it
+        return 0.0
+
+
+class PipePlayMediaResolver:
+    """Resolve media-source ids, sharing results between repeated plays.
+
+    Resolved URLs are cached per media-source id and entity. Entries for
+    signed URLs expire before their signature does; text-to-speech is not
+    cached. Concurrent requests for the same id share one lookup.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the resolver."""
+        self.hass = hass
+        self.cache: TTLCache[str] = TTLCache(MEDIA_CACHE_SIZE, MEDIA_CACHE_TTL)
+        self._in_flight: Dict[Tuple[str, Optional[str]], asyncio.Future] = {}
+        self.shared_lookups = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return cache statistics for diagnostics."""
+        return {**self.cache.as_dict(), "shared_lookups": self.shared_lookups}
+
+    async def async_resolve(self, media_id: str, entity_id: Optional[str]) -> str:
+        """Return a playable URL for a media-source id."""
+        key = (media_id, entity_id)
+
+        url = self.cache.get(key)
+        if url is not None:
+            return url
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared_lookups += 1
+        else:
+            future = self.hass.async_create_task(self._async_resolve(media_id, entity_id))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded so one caller giving up does not cancel the others
+        return await asyncio.shield(future)
+
+    async def _async_resolve(self, media_id: str, entity_id: Optional[str]) -> str:
+        """Resolve a media-source id and cache the result."""
+        try:
+            # Step 1: Resolve the media source to get a play item
+            with span("async_resolve_media"):
+                play_item = await async_resolve_media(self.hass, media_id, entity_id)
+            # Step 2: Process the play item URL to make it accessible
+            with span("async_process_play_media_url"):
+                url = async_process_play_media_url(self.hass, play_item.url)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Could not resolve %s: %s", media_id, err)
+            # Fallback to direct resolution
+            try:
+                with span("fallback_resolution"):
+                    url = async_process_play_media_url(self.hass, media_id)
+            except Exception as fallback_err:  # pylint: disable=broad-except
+                _LOGGER.warning("Fallback resolution failed for %s: %s", media_id, fallback_err)
+                return media_id
+            if url == media_id:
+                return media_id
+
+        if media_id.startswith(TTS_MEDIA_PREFIX):
+            _LOGGER.debug("Resolved %s to %s (not cached)", media_id, url)
+            return url
+
+        ttl = self.cache.ttl
+        signature_ttl = _signature_ttl(url)
+        if signature_ttl is not None:
+            ttl = min(ttl, signature_ttl)
+
+        self.cache.set((media_id, entity_id), url, ttl)
+        _LOGGER.debug("Resolved %s to %s (cached for %.0f seconds)", media_id, url, max(ttl, 0))
+        return url
@@ -0,0 +1,179 @@
+"""Shared status polling for all PipePlay coordinators."""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import SIGNAL_POLL_TICK
+
+if TYPE_CHECKING:
+    from .coordinator import PipePlayUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Status requests allowed in flight at once across all hosts
+DEFAULT_MAX_CONCURRENT = 4
+
+# Fractional part of the golden ratio: successive multiples spread phases
+# evenly over the interval however many coordinators register
+PHASE_STEP = 0.6180339887
+
+
+class _ScheduledCoordinator:
+    """Polling state of one coordinator."""
+
+    __slots__ = ("coordinator", "next_due", "last_started", "running", "repoll")
+
+    def __init__(self, coordinator: "PipePlayUpdateCoordinator", next_due: float) -> None:
+        """Initialize the entry."""
+        self.coordinator = coordinator
+        self.next_due = next_due
+        self.last_started = next_due
+        self.running = False
+        # Set when an immediate poll is asked for while one is running
+        self.repoll = False
+
+
+class PipePlayPollScheduler:
+    """Run the status polls of every PipePlay coordinator from one timer.
+
+    Each coordinator gets its own phase within its interval, so polls of
+    many players are spread out instead of firing together. At most
+    ``max_concurrent`` polls run at the same time; polls that are due while
+    the limit is reached wait for the next free slot, most overdue first.
+    The interval itself comes from the coordinator (shorter while playing,
+    longer while idle or while the event stream is connected).
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = DEFAULT_MAX_CONCURRENT) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.max_concurrent = max_concurrent
+        self._entries: Dict[int, _ScheduledCoordinator] = {}
+        self._registered = 0
+        self._running = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.ticks = 0
+        self.polls = 0
+        self.deferred = 0
+        self.max_running = 0
+        self.last_tick: Dict[str, Any] = {}
+
+    @callback
+    def async_register(self, coordinator: "PipePlayUpdateCoordinator") -> Callable[[], None]:
+        """Start polling a coordinator; returns a callback that stops it."""
+        phase = (self._registered * PHASE_STEP) % 1.0
+        self._registered += 1
+        now = self.hass.loop.time()
+        self._entries[id(coordinator)] = _ScheduledCoordinator(
+            coordinator, now + phase * coordinator.poll_interval
+        )
+        self._async_schedule()
+
+        @callback
+        def _async_unregister() -> None:
+            self._entries.pop(id(coordinator), None)
+            if not self._entries and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        return _async_unregister
+
+    @callback
+    def async_reschedule(self, coordinator: "PipePlayUpdateCoordinator", immediate: bool = False) -> None:
+        """Apply a changed interval, or poll a coordinator as soon as possible."""
+        entry = self._entries.get(id(coordinator))
+        if entry is None:
+            return
+
+        if immediate and entry.running:
+            # The running poll may predate whatever prompted this request;
+            # poll again once it finishes
+            entry.repoll = True
+            return
+
+        next_due = entry.last_started + coordinator.poll_interval
+        if immediate:
+            next_due = self.hass.loop.time()
+        if next_due < entry.next_due:
+            entry.next_due = next_due
+            self._async_schedule()
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Arm the timer for the next due poll."""
+        waiting = [entry.next_due for entry in self._entries.values() if not entry.running]
+        if not waiting or self._running >= self.max_concurrent:
+            # A finishing poll schedules the next tick
+            return
+
+        when = max(min(waiting), self.hass.loop.time())
+        if self._timer is not None:
+            if self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer = self.hass.loop.call_at(when, self._async_tick)
+
+    @callback
+    def _async_tick(self) -> None:
+        """Start the polls that are due, up to the concurrency limit."""
+        self._timer = None
+        now = self.hass.loop.time()
+
+        due = sorted(
+            (entry for entry in self._entries.values() if not entry.running and entry.next_due <= now),
+            key=lambda entry: entry.next_due,
+        )
+        started = due[: max(self.max_concurrent - self._running, 0)]
+        for entry in started:
+            entry.running = True
+            entry.last_started = now
+            self._running += 1
+            self.hass.async_create_background_task(
+                self._async_poll(entry), f"pipeplay poll {entry.coordinator.host}"
+            )
+
+        self.ticks += 1
+        self.polls += len(started)
+        self.deferred += len(due) - len(started)
+        self.max_running = max(self.max_running, self._running)
+        self.last_tick = {
+            "players": len(self._entries),
+            "due": len(due),
+            "started": len(started),
+            "deferred": len(due) - len(started),
+            "running": self._running,
+            "lag": round(now - due[0].next_due, 3) if due else 0.0,
+        }
+        async_dispatcher_send(self.hass, SIGNAL_POLL_TICK, self.last_tick)
+
+        self._async_schedule()
+
+    async def _async_poll(self, entry: _ScheduledCoordinator) -> None:
+        """Refresh one coordinator and plan its next poll."""
+        try:
+            await entry.coordinator.async_refresh()
+        finally:
+            entry.running = False
+            self._running -= 1
+            if entry.repoll:
+                entry.repoll = False
+                entry.next_due = self.hass.loop.time()
+            else:
+                entry.next_due = entry.last_started + entry.coordinator.poll_interval
+            self._async_schedule()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return scheduler load for diagnostics."""
+        return {
+            "players": len(self._entries),
+            "max_concurrent": self.max_concurrent,
+            "ticks": self.ticks,
+            "polls": self.polls,
+            "deferred": self.deferred,
+            "max_running": self.max_running,
+            "last_tick": self.last_tick,
+        }
@@ -0,0 +1,176 @@
+"""Diagnostic sensors for PipePlay latencies and counters."""
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_NAME, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, SIGNAL_NEW_SINK
+from .coordinator import PipePlayUpdateCoordinator
+from .metrics import LatencyHistogram, PipePlayMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Values are read from the in-memory metrics; nothing is requested from PipePlay
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+@dataclass
+class PipePlaySensorEntityDescriptionMixin:
+    """Where a PipePlay sensor reads its value."""
+
+    value_fn: Callable[[PipePlayUpdateCoordinator, PipePlayMetrics], Any]
+
+
+@dataclass
+class PipePlaySensorEntityDescription(SensorEntityDescription, PipePlaySensorEntityDescriptionMixin):
+    """Describes a PipePlay diagnostic sensor."""
+
+    histogram_fn: Optional[Callable[[PipePlayUpdateCoordinator, PipePlayMetrics], LatencyHistogram]] = None
+
+
+def _p95(histogram: LatencyHistogram) -> Optional[float]:
+    """Return the 95th percentile of a histogram in milliseconds."""
+    value = histogram.percentile(0.95)
+    return None if value is None else round(value * 1000, 2)
+
+
+def _latency(
+    key: str,
+    name: str,
+    histogram_fn: Callable[[PipePlayUpdateCoordinator, PipePlayMetrics], LatencyHistogram],
+) -> PipePlaySensorEntityDescription:
+    """Describe a sensor showing the 95th percentile of a latency histogram."""
+    return PipePlaySensorEntityDescription(
+        key=key,
+        name=name,
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator, metrics: _p95(histogram_fn(coordinator, metrics)),
+        histogram_fn=histogram_fn,
+    )
+
+
+def _counter(
+    key: str,
+    name: str,
+    value_fn: Callable[[PipePlayUpdateCoordinator, PipePlayMetrics], int],
+) -> PipePlaySensorEntityDescription:
+    """Describe a sensor showing an ever-increasing counter."""
+    return PipePlaySensorEntityDescription(
+        key=key,
+        name=name,
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=value_fn,
+    )
+
+
+SENSORS = (
+    _latency("command_latency", "Command latency", lambda _, metrics: metrics.command),
+    _latency("poll_latency", "Status poll latency", lambda coordinator, _: coordinator.poll_latency),
+    _latency("resolve_latency", "Media resolve latency", lambda _, metrics: metrics.resolve),
+    _latency("event_lag", "Event lag", lambda _, metrics: metrics.event_lag),
+    _latency("announce_latency", "Announcement time to first audio", lambda _, metrics: metrics.announce),
+    _counter("events", "Events", lambda _, metrics: metrics.events),
+    _counter("state_writes", "State writes", lambda _, metrics: metrics.writes),
+    _counter(
+        "reconnects",
+        "Reconnects",
+        lambda coordinator, _: max(coordinator.sse_connects - 1, 0),
+    ),
+    _counter(
+        "failures",
+        "Failures",
+        lambda coordinator, metrics: coordinator.poll_failures + metrics.command_failures,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the PipePlay diagnostic sensors."""
+    name = config_entry.data[CONF_NAME]
+    coordinator: PipePlayUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
+
+    @callback
+    def _async_add_sinks(sink_ids) -> None:
+        """Create the diagnostic sensors of each sink."""
+        async_add_entities(
+            PipePlayMetricSensor(coordinator, name, sink_id, description)
+            for sink_id in sink_ids
+            for description in SENSORS
+        )
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_SINK.format(config_entry.entry_id), _async_add_sinks
+        )
+    )
+
+    _async_add_sinks(coordinator.sinks)
+
+
+class PipePlayMetricSensor(SensorEntity):
+    """A latency or counter of one PipePlay player.
+
+    Disabled by default. Enabled sensors read the in-memory metrics on the
+    platform's scan interval, so events and commands never trigger a write.
+    """
+
+    entity_description: PipePlaySensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: PipePlayUpdateCoordinator,
+        name: str,
+        sink_id: Optional[str],
+        description: PipePlaySensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._coordinator = coordinator
+        self._metrics = coordinator.sink_metrics(sink_id)
+
+        unique_id = f"pipeplay_{coordinator.host}_{coordinator.port}"
+        if sink_id is not None:
+            sink_name = coordinator.sink_status(sink_id).get("name") or sink_id
+            name = f"{name} {sink_name}"
+            unique_id += f"_{sink_id}"
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"{unique_id}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {("pipeplay", f"{coordinator.host}_{coordinator.port}")},
+        }
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current value."""
+        return self.entity_description.value_fn(self._coordinator, self._metrics)
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return the rest of the histogram for latency sensors."""
+        if self.entity_description.histogram_fn is None:
+            return None
+        summary = self.entity_description.histogram_fn(self._coordinator, self._metrics).as_dict()
+        summary.pop("buckets_ms")
+        return summary
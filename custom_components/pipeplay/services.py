@@ -0,0 +1,113 @@
+"""Diagnostic services for PipePlay."""
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+from typing import Any, Dict, List
+
+import voluptuous as vol
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_DUMP_TRACES = "dump_traces"
+SERVICE_PROFILE = "profile"
+
+ATTR_LIMIT = "limit"
+ATTR_DURATION = "duration"
+
+MAX_PROFILE_DURATION = 60
+
+DUMP_TRACES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=10): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+        vol.Optional(ATTR_LIMIT, default=30): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+# Only functions of this integration are reported by pipeplay.profile
+PACKAGE_DIR = os.path.dirname(__file__)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the PipePlay diagnostic services."""
+    profiling = asyncio.Lock()
+
+    async def _async_dump_traces(call: ServiceCall) -> ServiceResponse:
+        """Return the most recent play traces."""
+        tracer = hass.data[DOMAIN]["tracer"]
+        return {"traces": tracer.as_list(call.data.get(ATTR_ENTITY_ID), call.data.get(ATTR_LIMIT))}
+
+    async def _async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the event loop for a while and report this integration's functions."""
+        if profiling.locked():
+            raise HomeAssistantError("A PipePlay profile is already running")
+
+        async with profiling:
+            duration = call.data[ATTR_DURATION]
+            _LOGGER.info("Profiling PipePlay for %.0f seconds", duration)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                profiler.disable()
+
+        functions = await hass.async_add_executor_job(
+            _summarize_profile, profiler, call.data[ATTR_LIMIT]
+        )
+        tasks = sorted(
+            task.get_name()
+            for task in asyncio.all_tasks()
+            if task.get_name().startswith(DOMAIN)
+        )
+        return {"duration": duration, "functions": functions, "tasks": tasks}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_TRACES,
+        _async_dump_traces,
+        schema=DUMP_TRACES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _summarize_profile(profiler: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+    """Return this integration's functions from a profile, most expensive first."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        if not filename.startswith(PACKAGE_DIR):
+            continue
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({function})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
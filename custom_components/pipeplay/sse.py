@@ -0,0 +1,152 @@
+"""Incremental Server-Sent Events parser for the PipePlay event stream."""
+from typing import List, NamedTuple, Optional
+
+# Upper bound for a single line or the data of a single event
+DEFAULT_MAX_BUFFER = 256 * 1024
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class SSEEvent(NamedTuple):
+    """A dispatched server-sent event."""
+
+    event: str
+    data: bytes
+    id: str
+
+
+class SSEBufferOverflow(ValueError):
+    """Error to indicate an event or line exceeded the buffer limit."""
+
+
+class SSEParser:
+    """Parse a text/event-stream byte stream as described by the HTML spec.
+
+    Bytes are fed in arbitrary chunks; complete events are returned as they
+    are dispatched. Lines may end in CRLF, LF or CR, ``data`` fields spanning
+    several lines are joined with newlines, comments are only counted (servers
+    send them as keepalives), and the last event id and ``retry`` value are
+    kept so a reconnect can resume.
+    Event data is returned as UTF-8 bytes so JSON decoders can parse it
+    without an intermediate string.
+    """
+
+    def __init__(self, last_event_id: str = "", max_buffer: int = DEFAULT_MAX_BUFFER) -> None:
+        """Initialize the parser."""
+        self.last_event_id = last_event_id
+        self.retry: Optional[int] = None
+        self.comments = 0
+        self._max_buffer = max_buffer
+        self._buffer = bytearray()
+        self._data: List[bytes] = []
+        self._data_size = 0
+        self._event = ""
+        self._skip_lf = False
+        self._first_line = True
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Consume a chunk of the stream and return the events it completed."""
+        events: List[SSEEvent] = []
+        buffer = self._buffer
+        buffer += chunk
+
+        start = 0
+        if self._skip_lf and buffer[:1] == b"\n":
+            # Second half of a CRLF split across chunks
+            start = 1
+        self._skip_lf = False
+
+        if buffer.find(b"\r", start) == -1:
+            # Common case: LF line endings only, split all complete lines at once
+            end = buffer.rfind(b"\n")
+            if end >= start:
+                for line in bytes(buffer[start:end]).split(b"\n"):
+                    event = self._process_line(line)
+                    if event is not None:
+                        events.append(event)
+                start = end + 1
+            return self._consume(start, events)
+
+        length = len(buffer)
+        while start < length:
+            lf = buffer.find(b"\n", start)
+            cr = buffer.find(b"\r", start, lf if lf != -1 else length)
+            if cr != -1:
+                end = cr
+                if cr + 1 < length:
+                    next_start = cr + 2 if buffer[cr + 1] == 0x0A else cr + 1
+                else:
+                    next_start = cr + 1
+                    self._skip_lf = True
+            elif lf != -1:
+                end = lf
+                next_start = lf + 1
+            else:
+                break
+
+            event = self._process_line(bytes(buffer[start:end]))
+            if event is not None:
+                events.append(event)
+            start = next_start
+
+        return self._consume(start, events)
+
+    def _consume(self, start: int, events: List[SSEEvent]) -> List[SSEEvent]:
+        """Drop the processed bytes and enforce the buffer limit."""
+        buffer = self._buffer
+        del buffer[:start]
+        if len(buffer) > self._max_buffer:
+            buffer.clear()
+            raise SSEBufferOverflow(f"SSE line exceeds {self._max_buffer} bytes")
+
+        return events
+
+    def _process_line(self, line: bytes) -> Optional[SSEEvent]:
+        """Handle one line, returning an event when a blank line dispatches one."""
+        if self._first_line:
+            self._first_line = False
+            if line.startswith(UTF8_BOM):
+                line = line[len(UTF8_BOM):]
+
+        if not line:
+            return self._dispatch()
+        if line[0] == 0x3A:  # ":" starts a comment
+            self.comments += 1
+            return None
+
+        field, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+
+        if field == b"data":
+            self._data_size += len(value) + 1
+            if self._data_size > self._max_buffer:
+                self._reset()
+                raise SSEBufferOverflow(f"SSE event exceeds {self._max_buffer} bytes")
+            self._data.append(value)
+        elif field == b"event":
+            self._event = value.decode("utf-8", errors="replace")
+        elif field == b"id":
+            if b"\0" not in value:
+                self.last_event_id = value.decode("utf-8", errors="replace")
+        elif field == b"retry":
+            if value.isdigit():
+                self.retry = int(value)
+
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        """Dispatch the buffered event, if it has any data."""
+        if not self._data:
+            self._event = ""
+            return None
+
+        event = SSEEvent(self._event or "message", b"\n".join(self._data), self.last_event_id)
+        self._reset()
+        return event
+
+    def _reset(self) -> None:
+        """Clear the per-event buffers."""
+        self._data = []
+        self._data_size = 0
+        self._event = ""
@@ -0,0 +1,104 @@
+"""Parsed PipePlay player status."""
+from typing import Any, Dict, NamedTuple, Optional
+
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.core import State
+
+STATE_MAPPING = {
+    "idle": MediaPlayerState.IDLE,
+    "playing": MediaPlayerState.PLAYING,
+    "paused": MediaPlayerState.PAUSED,
+    "buffering": MediaPlayerState.BUFFERING,
+}
+
+STATE_ICONS = {
+    MediaPlayerState.PLAYING: "mdi:speaker-play",
+    MediaPlayerState.PAUSED: "mdi:speaker-pause",
+}
+DEFAULT_ICON = "mdi:speaker"
+
+
+def _number(value: Any) -> Optional[float]:
+    """Return ``value`` as a float, or None if it is not a number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _text(value: Any) -> Optional[str]:
+    """Return ``value`` if it is a non-empty string."""
+    return value if isinstance(value, str) and value else None
+
+
+class PipePlayStatus(NamedTuple):
+    """Immutable, validated status of one PipePlay sink.
+
+    Built once per status poll or event; entity properties read its fields
+    directly. ``media_position`` is the last field so that two snapshots can
+    be compared without it (see ``same_except_position``).
+    """
+
+    state: MediaPlayerState
+    icon: str
+    volume_level: Optional[float]
+    is_muted: Optional[bool]
+    media_content_id: Optional[str]
+    media_content_type: Optional[str]
+    media_title: Optional[str]
+    media_artist: Optional[str]
+    media_album: Optional[str]
+    media_duration: Optional[int]
+    media_image_url: Optional[str]
+    media_position: Optional[float]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PipePlayStatus":
+        """Parse a status payload, dropping values of the wrong type."""
+        state = STATE_MAPPING.get(data.get("state"), MediaPlayerState.IDLE)
+
+        volume = _number(data.get("volume_level"))
+        if volume is not None:
+            volume = min(max(volume, 0.0), 1.0)
+
+        muted = data.get("is_muted")
+        duration = _number(data.get("media_duration"))
+
+        return cls(
+            state=state,
+            icon=STATE_ICONS.get(state, DEFAULT_ICON),
+            volume_level=volume,
+            is_muted=muted if isinstance(muted, bool) else None,
+            media_content_id=_text(data.get("media_content_id")),
+            media_content_type=_text(data.get("media_content_type")),
+            media_title=_text(data.get("media_title")),
+            media_artist=_text(data.get("media_artist")),
+            media_album=_text(data.get("media_album")),
+            media_duration=int(duration) if duration and duration > 0 else None,
+            media_image_url=_text(data.get("media_image_url")),
+            media_position=_number(data.get("media_position")),
+        )
+
+    @classmethod
+    def from_state(cls, state: State) -> "PipePlayStatus":
+        """Rebuild a status from a restored Home Assistant state."""
+        attributes = state.attributes
+        return cls.from_dict(
+            {
+                "state": state.state,
+                "volume_level": attributes.get("volume_level"),
+                "is_muted": attributes.get("is_volume_muted"),
+                "media_content_id": attributes.get("media_content_id"),
+                "media_content_type": attributes.get("media_content_type"),
+                "media_title": attributes.get("media_title"),
+                "media_artist": attributes.get("media_artist"),
+                "media_album": attributes.get("media_album_name"),
+                "media_duration": attributes.get("media_duration"),
+            }
+        )
+
+    def same_except_position(self, other: Optional["PipePlayStatus"]) -> bool:
+        """Return True if ``other`` differs from this status at most in position."""
+        return other is not None and self[:-1] == other[:-1]
+
+
+EMPTY_STATUS = PipePlayStatus.from_dict({})
@@ -0,0 +1,147 @@
+"""Span tracing of PipePlay play requests."""
+import contextlib
+import contextvars
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from homeassistant.util import dt as dt_util
+
+# Play traces kept for pipeplay.dump_traces
+TRACE_BUFFER_SIZE = 50
+# A trace still waiting for PipePlay to report playback is closed after this
+CONFIRM_TIMEOUT = 30.0
+
+# The trace of the play request being handled; tasks started while it is
+# set (such as a shared media-source lookup) record their spans into it
+_current_trace: contextvars.ContextVar[Optional["PlayTrace"]] = contextvars.ContextVar(
+    "pipeplay_trace", default=None
+)
+
+
+class Span:
+    """One timed stage of a play request."""
+
+    __slots__ = ("name", "start", "end", "attributes")
+
+    def __init__(self, name: str, start: float) -> None:
+        """Initialize the span."""
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = {}
+
+
+class PlayTrace:
+    """The stages of one play request, from the service call to playback."""
+
+    def __init__(self, trace_id: int, entity_id: Optional[str], media_id: str) -> None:
+        """Initialize the trace."""
+        self.trace_id = trace_id
+        self.entity_id = entity_id
+        self.media_id = media_id
+        self.started_at = dt_util.utcnow()
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        self.outcome: Optional[str] = None
+
+    def begin(self, name: str, **attributes: Any) -> Span:
+        """Open a span; the caller closes it by setting its ``end``."""
+        span = Span(name, time.monotonic())
+        span.attributes.update(attributes)
+        self.spans.append(span)
+        return span
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a span; errors are recorded on it."""
+        span = self.begin(name, **attributes)
+        try:
+            yield span
+        except BaseException as err:
+            span.attributes["error"] = type(err).__name__
+            raise
+        finally:
+            span.end = time.monotonic()
+
+    def finish(self, outcome: str) -> None:
+        """Close the trace and any span still open."""
+        if self.end is not None:
+            return
+        self.end = time.monotonic()
+        self.outcome = outcome
+        for span in self.spans:
+            if span.end is None:
+                span.end = self.end
+                span.attributes["unfinished"] = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the trace with times in milliseconds from its start."""
+
+        def _ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round((value - self.start) * 1000, 2)
+
+        return {
+            "id": self.trace_id,
+            "entity_id": self.entity_id,
+            "media_id": self.media_id,
+            "started_at": self.started_at.isoformat(),
+            "outcome": self.outcome,
+            "total_ms": _ms(self.end),
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_ms": _ms(span.start),
+                    "duration_ms": None if span.end is None else round((span.end - span.start) * 1000, 2),
+                    **span.attributes,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+class PipePlayTracer:
+    """Keep the most recent play traces in a ring buffer."""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize the tracer."""
+        self._traces: Deque[PlayTrace] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+
+    def start(self, entity_id: Optional[str], media_id: str) -> PlayTrace:
+        """Start a trace; it is current inside ``use_trace``."""
+        trace = PlayTrace(next(self._ids), entity_id, media_id)
+        self._traces.append(trace)
+        return trace
+
+    def as_list(self, entity_ids: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the stored traces, newest first."""
+        traces = [
+            trace.as_dict()
+            for trace in reversed(self._traces)
+            if entity_ids is None or trace.entity_id in entity_ids
+        ]
+        return traces[:limit] if limit is not None else traces
+
+
+@contextlib.contextmanager
+def use_trace(trace: PlayTrace) -> Iterator[PlayTrace]:
+    """Make ``trace`` current for the enclosed block and tasks started in it."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a block in the current trace; does nothing outside a traced request."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attributes) as current:
+        yield current
@@ -0,0 +1,210 @@
+"""Fixtures for the PipePlay benchmark suite.
+
+Every benchmark records its results with the ``benchmark`` fixture, which
+compares them against ``benchmark_baseline.json`` and fails the test on a
+regression. Run ``pytest --update-baseline`` to store the measured results
+as the new baseline; timings depend on the machine, so the baseline is
+best recorded where the suite usually runs. Elsewhere, ``--no-timing-gate``
+still reports timings but only fails on counts and ratios.
+"""
+import asyncio
+import json
+from pathlib import Path
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.standin import PipePlayStandin
+from custom_components.pipeplay.const import DOMAIN
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+
+# Results of this run, by metric name
+RESULTS: Dict[str, float] = {}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the option that rewrites the baseline."""
+    parser.addoption(
+        "--update-baseline",
+        action="store_true",
+        default=False,
+        help="store the measured benchmark results as the new baseline",
+    )
+    parser.addoption(
+        "--tolerance-factor",
+        type=float,
+        default=1.0,
+        help="widen (or narrow) every benchmark tolerance by this factor, for slower machines",
+    )
+    parser.addoption(
+        "--no-timing-gate",
+        action="store_true",
+        default=False,
+        help="report timing results without comparing them, for machines other than the baseline's",
+    )
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    """Print the results next to the baseline, and store them if asked to."""
+    if not RESULTS:
+        return
+    baseline = _load_baseline()
+    terminalreporter.section("PipePlay benchmarks")
+    for name, value in sorted(RESULTS.items()):
+        stored = baseline.get(name)
+        terminalreporter.write_line(
+            f"{name:<32} {value:>12.3f}   baseline {'-' if stored is None else f'{stored:.3f}':>12}"
+        )
+    if config.getoption("--update-baseline"):
+        results = {name: round(value, 3) for name, value in RESULTS.items()}
+        BASELINE_PATH.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        terminalreporter.write_line(f"Baseline written to {BASELINE_PATH}")
+
+
+def _load_baseline() -> Dict[str, float]:
+    """Return the stored baseline, or nothing if there is none yet."""
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+class BenchmarkRecorder:
+    """Record benchmark results and check them against the baseline."""
+
+    def __init__(
+        self, baseline: Dict[str, float], update: bool, tolerance_factor: float, timing_gate: bool = True
+    ) -> None:
+        """Initialize the recorder."""
+        self._baseline = baseline
+        self._update = update
+        self._tolerance_factor = tolerance_factor
+        self._timing_gate = timing_gate
+
+    def record(
+        self,
+        name: str,
+        value: float,
+        higher_is_better: bool = False,
+        tolerance: float = 0.5,
+        slack: float = 0.0,
+        timing: bool = False,
+    ) -> None:
+        """Record a result; fail if it is worse than the baseline allows.
+
+        ``tolerance`` is the share by which the result may be worse than
+        the baseline: up to ``1 + tolerance`` times the baseline, or down to
+        the baseline divided by that for results where higher is better, so
+        a widened tolerance never drops the limit to zero. ``slack`` is an
+        absolute allowance on top, for results whose baseline is close to
+        zero. ``timing`` marks results that depend on the machine's speed;
+        they are only reported when the timing gate is off.
+        """
+        RESULTS[name] = value
+        if self._update or (timing and not self._timing_gate):
+            return
+        baseline = self._baseline.get(name)
+        if baseline is None:
+            pytest.fail(f"No baseline for {name}; run pytest --update-baseline")
+        tolerance *= self._tolerance_factor
+        slack *= self._tolerance_factor
+        if higher_is_better:
+            limit = baseline / (1 + tolerance) - slack
+            regressed = value < limit
+        else:
+            limit = baseline * (1 + tolerance) + slack
+            regressed = value > limit
+        if regressed:
+            pytest.fail(f"{name} regressed: {value:.3f} against baseline {baseline:.3f} (limit {limit:.3f})")
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> BenchmarkRecorder:
+    """Return the recorder that compares results with the baseline."""
+    return BenchmarkRecorder(
+        _load_baseline(),
+        request.config.getoption("--update-baseline"),
+        request.config.getoption("--tolerance-factor"),
+        not request.config.getoption("--no-timing-gate"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+async def standins(socket_enabled: None) -> Callable[..., Any]:
+    """Return a factory of running stand-in servers, stopped after the test."""
+    started: List[PipePlayStandin] = []
+
+    async def _start(count: int = 1, **options: Any) -> List[PipePlayStandin]:
+        new = [PipePlayStandin(**options) for _ in range(count)]
+        for standin in new:
+            await standin.start()
+        started.extend(new)
+        return new
+
+    yield _start
+
+    for standin in started:
+        await standin.stop()
+
+
+@pytest.fixture
+async def standin_process(socket_enabled: None) -> Callable[..., Any]:
+    """Return a factory of stand-in servers in a child process.
+
+    Used where the stand-ins must not share the measured process, such as
+    for memory measurements. The factory returns their ports.
+    """
+    processes: List[asyncio.subprocess.Process] = []
+
+    async def _start(count: int = 1) -> List[int]:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.standin", "--port", "0", "--count", str(count),
+            cwd=Path(__file__).parent.parent,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        processes.append(process)
+        ports = []
+        async with asyncio.timeout(60):
+            while len(ports) < count:
+                line = await process.stdout.readline()
+                if not line:
+                    raise RuntimeError("Stand-in process exited")
+                ports.append(int(line.rsplit(maxsplit=1)[-1]))
+        return ports
+
+    yield _start
+
+    for process in processes:
+        process.terminate()
+        await process.wait()
+
+
+def add_entries(
+    hass: HomeAssistant,
+    ports: List[int],
+    options: Optional[Dict[str, Any]] = None,
+) -> List[MockConfigEntry]:
+    """Add a config entry for each stand-in port, without setting it up."""
+    # Discovery is not part of what is measured
+    hass.config.components.add("zeroconf")
+    entries = []
+    for index, port in enumerate(ports):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Bench {index}",
+            data={"host": "127.0.0.1", "port": port, "name": f"Bench {index}"},
+            options=options or {},
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+    return entries
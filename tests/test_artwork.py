@@ -0,0 +1,51 @@
+"""Tests for the album art cache."""
+import asyncio
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay.artwork import PipePlayArtworkCache
+
+COVER = b"\x89PNG\r\n\x1a\n" + b"\0" * 256
+
+
+async def test_concurrent_views_share_one_download(hass: HomeAssistant, socket_enabled, tmp_path) -> None:
+    """Views of the same cover wait for one download; later views read the cache."""
+    hass.config.config_dir = str(tmp_path)
+    requests = 0
+    release = asyncio.Event()
+
+    async def _cover(request: web.Request) -> web.Response:
+        nonlocal requests
+        requests += 1
+        await release.wait()
+        return web.Response(body=COVER, content_type="image/png")
+
+    app = web.Application()
+    app.router.add_get("/cover.png", _cover)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/cover.png"
+
+    cache = PipePlayArtworkCache(hass)
+    try:
+        views = [asyncio.create_task(cache.async_get_image(url)) for _ in range(4)]
+        async with asyncio.timeout(5):
+            while not requests:
+                await asyncio.sleep(0.01)
+        # A view that goes away does not cancel the download for the others
+        views.pop().cancel()
+        release.set()
+        results = await asyncio.gather(*views)
+        later = await cache.async_get_image(url)
+    finally:
+        await runner.cleanup()
+
+    assert results == [(COVER, "image/png")] * 3
+    assert later == (COVER, "image/png")
+    assert requests == 1
+    assert cache.fetches == 1
+    assert cache.shared == 3
+    assert cache.hits == 1
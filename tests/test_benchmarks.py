@@ -0,0 +1,175 @@
+"""End-to-end benchmarks of the integration against stand-in servers.
+
+Each test sets PipePlay entries up in a real Home Assistant instance, with
+the coordinator and media players talking HTTP, SSE or WebSocket to
+``benchmarks.standin`` servers, and records its results with the
+``benchmark`` fixture. Timing tolerances are wide because CI machines
+vary; counts and memory are checked more tightly.
+"""
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.pipeplay.const import CONF_TRANSPORT, DOMAIN, TRANSPORT_SSE, TRANSPORT_WEBSOCKET
+
+from .conftest import add_entries
+
+EVENTS = 2000
+COMMANDS = 200
+TICK_RATE = 20
+TICK_SECONDS = 3
+
+
+async def _wait_for(condition, timeout: float = 30.0) -> None:
+    """Wait until ``condition()`` holds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def _setup(hass: HomeAssistant) -> None:
+    """Set up the integration with all entries added so far."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+
+async def _unload(hass: HomeAssistant) -> None:
+    """Unload all entries so no connection or timer outlives the test."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def _player(hass: HomeAssistant, entry_id: str):
+    """Return the media player entity of an entry."""
+    return hass.data[DOMAIN][entry_id]["entities"][0]
+
+
+async def test_events_per_second(hass: HomeAssistant, standins, benchmark) -> None:
+    """Events the integration takes in per second over SSE."""
+    (standin,) = await standins(websocket=False)
+    (entry,) = add_entries(hass, [standin.port])
+    await _setup(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    player = _player(hass, entry.entry_id)
+    await _wait_for(lambda: standin._sse_queues)
+
+    standin.update(state="playing")
+    await _wait_for(lambda: player.metrics.events >= 1)
+    received = player.metrics.events
+    started = time.monotonic()
+    for position in range(EVENTS):
+        standin.update(media_position=position)
+        if position % 100 == 0:
+            # Let the stream drain as a real server would
+            await asyncio.sleep(0)
+    await _wait_for(lambda: player.metrics.events >= received + EVENTS)
+    elapsed = time.monotonic() - started
+
+    assert coordinator.polling_mode == "push"
+    benchmark.record("events_per_second", EVENTS / elapsed, higher_is_better=True, tolerance=1.0, timing=True)
+    await _unload(hass)
+
+
+@pytest.mark.parametrize("transport", [TRANSPORT_SSE, TRANSPORT_WEBSOCKET])
+async def test_command_round_trip(hass: HomeAssistant, standins, benchmark, transport: str) -> None:
+    """Service call until PipePlay accepted the command."""
+    (standin,) = await standins(websocket=transport == TRANSPORT_WEBSOCKET)
+    (entry,) = add_entries(hass, [standin.port], {CONF_TRANSPORT: transport})
+    await _setup(hass)
+    player = _player(hass, entry.entry_id)
+    await _wait_for(lambda: standin._sse_queues or standin._websockets)
+
+    samples: List[float] = []
+    for index in range(COMMANDS):
+        started = time.monotonic()
+        await hass.services.async_call(
+            "media_player",
+            "media_pause" if index % 2 else "media_play",
+            {"entity_id": player.entity_id},
+            blocking=True,
+        )
+        samples.append(time.monotonic() - started)
+
+    assert len(standin.commands) == COMMANDS
+    samples.sort()
+    benchmark.record(f"command_rtt_{transport}_p50_ms", statistics.median(samples) * 1000, tolerance=1.0, timing=True)
+    benchmark.record(f"command_rtt_{transport}_p95_ms", samples[int(COMMANDS * 0.95)] * 1000, tolerance=1.0, timing=True)
+    await _unload(hass)
+
+
+async def test_state_writes_per_event(hass: HomeAssistant, standins, benchmark) -> None:
+    """State writes caused by position events during steady playback."""
+    (standin,) = await standins(websocket=False, event_rate=TICK_RATE)
+    (entry,) = add_entries(hass, [standin.port])
+    await _setup(hass)
+    player = _player(hass, entry.entry_id)
+    await _wait_for(lambda: standin._sse_queues)
+
+    standin.update(state="playing")
+    await _wait_for(lambda: player.state == "playing")
+    events, writes = player.metrics.events, player.metrics.writes
+    await asyncio.sleep(TICK_SECONDS)
+    events = player.metrics.events - events
+    writes = player.metrics.writes - writes
+
+    assert events >= TICK_RATE * TICK_SECONDS / 2
+    benchmark.record("writes_per_event", writes / events, tolerance=0.0, slack=0.05)
+    await _unload(hass)
+
+
+async def test_memory_per_player(hass: HomeAssistant, standin_process, benchmark) -> None:
+    """Memory each further player takes once set up and connected."""
+    count = 20
+    ports = await standin_process(count + 1)
+    # The first player loads the platforms and fills shared caches
+    add_entries(hass, ports[:1])
+    await _setup(hass)
+    entries = add_entries(hass, ports[1:])
+
+    def _connected() -> bool:
+        return all(
+            hass.data[DOMAIN][entry.entry_id]["coordinator"].polling_mode == "push"
+            for entry in entries
+        )
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for entry in entries:
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        await _wait_for(_connected)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert len(hass.states.async_entity_ids("media_player")) == count + 1
+    benchmark.record("memory_per_player_kib", grown / count / 1024, tolerance=0.25)
+    await _unload(hass)
+
+
+@pytest.mark.parametrize("count", [1, 10, 100])
+async def test_setup_time(hass: HomeAssistant, standins, benchmark, count: int) -> None:
+    """Setup of ``count`` new entries until every player has its first status."""
+    servers = await standins(count)
+    add_entries(hass, [server.port for server in servers])
+
+    started = time.monotonic()
+    await _setup(hass)
+    elapsed = time.monotonic() - started
+
+    assert len(hass.states.async_entity_ids("media_player")) == count
+    assert all(server.requests["status"] for server in servers)
+    benchmark.record(f"setup_seconds_{count}", elapsed, tolerance=1.0, slack=0.05, timing=True)
+    await _unload(hass)
@@ -0,0 +1,77 @@
+"""Tests for the per-host circuit breaker."""
+from custom_components.pipeplay import breaker as breaker_module
+from custom_components.pipeplay.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+class _Clock:
+    """Monotonic clock the test moves by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_opens_after_threshold_and_probes(monkeypatch) -> None:
+    """Consecutive failures open the breaker; a probe after the timeout closes it."""
+    clock = _Clock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5)
+
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+    assert breaker.retry_in == 5
+
+    clock.now += 5
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+    assert breaker.retry_in == 0
+
+
+def test_failed_probe_doubles_timeout(monkeypatch) -> None:
+    """A failed probe reopens the breaker with a longer timeout, up to the maximum."""
+    clock = _Clock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, max_reset_timeout=15)
+
+    breaker.record_failure()
+    for timeout in (10, 15, 15):
+        clock.now += breaker.retry_in
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        assert breaker.retry_in == timeout
+    assert breaker.opened == 1
+
+    # Success resets the timeout
+    clock.now += breaker.retry_in
+    assert breaker.allow_request()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.retry_in == 5
+
+
+async def test_wait_closed() -> None:
+    """Waiters are released once the breaker closes."""
+    breaker = CircuitBreaker(failure_threshold=1)
+    await breaker.async_wait_closed()
+
+    breaker.record_failure()
+    waiter = breaker.async_wait_closed()
+    breaker.record_success()
+    await waiter
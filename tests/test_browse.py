@@ -0,0 +1,62 @@
+"""Tests for cached media browsing."""
+from types import SimpleNamespace
+
+from homeassistant.components.media_player import BrowseMedia, MediaClass, MediaType
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay import browse
+from custom_components.pipeplay.browse import PipePlayBrowseCache
+
+
+def _level(content_id: str, can_expand: bool, children=None) -> BrowseMedia:
+    """Return a browse level as media sources return it."""
+    return BrowseMedia(
+        media_class=MediaClass.DIRECTORY if can_expand else MediaClass.MUSIC,
+        media_content_id=content_id,
+        media_content_type=MediaType.MUSIC if can_expand else "audio/mpeg",
+        title=content_id,
+        can_play=not can_expand,
+        can_expand=can_expand,
+        children=children,
+    )
+
+
+async def test_levels_are_cached_and_prefetched(hass: HomeAssistant, monkeypatch) -> None:
+    """A level is fetched once; its expandable children are loaded ahead."""
+    browsed = []
+    levels = {
+        None: _level("", True, [_level("albums", True), _level("artists", True), _level("song.mp3", False)]),
+        "albums": _level("albums", True, []),
+        "artists": _level("artists", True, []),
+    }
+
+    async def _browse(hass, media_content_id, content_filter=None):
+        browsed.append(media_content_id)
+        return levels[media_content_id]
+
+    monkeypatch.setattr(browse, "media_source", SimpleNamespace(async_browse_media=_browse))
+    cache = PipePlayBrowseCache(hass)
+
+    assert await cache.async_browse(None) is levels[None]
+    await hass.async_block_till_done()
+    assert browsed[0] is None
+    assert sorted(browsed[1:]) == ["albums", "artists"]
+    assert cache.prefetched == 2
+
+    assert await cache.async_browse("albums") is levels["albums"]
+    assert await cache.async_browse(None) is levels[None]
+    assert len(browsed) == 3
+
+    cache.invalidate("albums")
+    await cache.async_browse("albums")
+    assert browsed[-1] == "albums"
+    assert len(browsed) == 4
+
+
+def test_only_audio_is_offered() -> None:
+    """Audio files and music types are playable; video is not."""
+    assert browse._is_playable(_level("song.mp3", False))
+    assert browse._is_playable(_level("albums", True))
+    video = _level("clip.mp4", False)
+    video.media_content_type = "video/mp4"
+    assert not browse._is_playable(video)
@@ -0,0 +1,52 @@
+"""Tests for the bounded TTL cache."""
+from custom_components.pipeplay import cache as cache_module
+from custom_components.pipeplay.cache import TTLCache
+
+
+class _Clock:
+    """Monotonic clock the test moves by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_entries_expire(monkeypatch) -> None:
+    """Entries live for the cache ttl, or their own."""
+    clock = _Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    cache: TTLCache[str] = TTLCache(maxsize=4, ttl=10)
+
+    cache.set("a", "1")
+    cache.set("b", "2", ttl=30)
+    cache.set("c", "3", ttl=0)
+    assert "c" not in cache
+    assert cache.get("a") == "1"
+
+    clock.now += 10
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.get("b") == "2"
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_is_evicted() -> None:
+    """A full cache drops the entry used longest ago."""
+    cache: TTLCache[int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+    cache.invalidate("a")
+    assert "a" not in cache
+    cache.invalidate()
+    assert len(cache) == 0
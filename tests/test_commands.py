@@ -0,0 +1,91 @@
+"""Tests for the ordered command queue."""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from custom_components.pipeplay.commands import PipePlayCommandQueue
+
+
+class _Sender:
+    """Record sent commands; each send waits until released."""
+
+    def __init__(self) -> None:
+        self.sent: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, command: str, data: Optional[Dict[str, Any]]) -> bool:
+        self.sent.append((command, data))
+        await self.release.wait()
+        return command != "refused"
+
+
+async def test_latest_volume_wins() -> None:
+    """Volume values waiting behind a command collapse into the newest one."""
+    sender = _Sender()
+    queue = PipePlayCommandQueue(sender)
+
+    play = asyncio.create_task(queue.async_send("play"))
+    await asyncio.sleep(0)
+    volumes = [asyncio.create_task(queue.async_send("volume", {"level": level / 10})) for level in range(5)]
+    pause = asyncio.create_task(queue.async_send("pause"))
+    await asyncio.sleep(0)
+    sender.release.set()
+
+    assert await asyncio.gather(play, *volumes, pause) == [True] * 7
+    assert sender.sent == [("play", None), ("volume", {"level": 0.4}), ("pause", None)]
+    assert queue.enqueued == 7
+    assert queue.sent == 3
+
+
+async def test_coalesced_value_does_not_overtake_later_commands() -> None:
+    """A seek issued after new media is sent after it, not merged into an earlier seek."""
+    sender = _Sender()
+    queue = PipePlayCommandQueue(sender)
+
+    play = asyncio.create_task(queue.async_send("play"))
+    await asyncio.sleep(0)
+    sends = [
+        queue.async_send("seek", {"position": 10}),
+        queue.async_send("play_media", {"media_id": "new"}),
+        queue.async_send("seek", {"position": 20}),
+        queue.async_send("seek", {"position": 30}),
+    ]
+    tasks = [asyncio.create_task(send) for send in sends]
+    await asyncio.sleep(0)
+    sender.release.set()
+
+    assert await asyncio.gather(play, *tasks) == [True] * 5
+    assert sender.sent == [
+        ("play", None),
+        ("seek", {"position": 10}),
+        ("play_media", {"media_id": "new"}),
+        ("seek", {"position": 30}),
+    ]
+
+
+async def test_discrete_commands_keep_order_and_results() -> None:
+    """Discrete commands are all sent in order, each with its own result."""
+    sender = _Sender()
+    sender.release.set()
+    queue = PipePlayCommandQueue(sender)
+
+    results = await asyncio.gather(
+        queue.async_send("play"), queue.async_send("refused"), queue.async_send("play")
+    )
+    assert results == [True, False, True]
+    assert [command for command, _ in sender.sent] == ["play", "refused", "play"]
+
+
+async def test_shutdown_releases_waiters() -> None:
+    """Shutting down answers everyone still waiting with False."""
+    sender = _Sender()
+    queue = PipePlayCommandQueue(sender)
+
+    first = asyncio.create_task(queue.async_send("play"))
+    second = asyncio.create_task(queue.async_send("pause"))
+    while not sender.sent:
+        await asyncio.sleep(0)
+    await queue.async_shutdown()
+
+    assert await first is False
+    assert await second is False
+    assert sender.sent == [("play", None)]
@@ -0,0 +1,43 @@
+"""Tests for synchronized group playback."""
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.pipeplay import group
+from custom_components.pipeplay.const import DOMAIN
+
+from .conftest import add_entries
+
+
+async def test_group_start_is_shared_and_corrected(hass: HomeAssistant, standins) -> None:
+    """Members get one start time, each in its own clock, and the skew is reported."""
+    leader_standin, member_standin = await standins(count=2)
+    entries = add_entries(hass, [leader_standin.port, member_standin.port])
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    leader, member = (hass.data[DOMAIN][entry.entry_id]["entities"][0] for entry in entries)
+
+    await hass.services.async_call(
+        "media_player", "join", {"entity_id": leader.entity_id, "group_members": [member.entity_id]}, blocking=True
+    )
+    assert hass.states.get(leader.entity_id).attributes["group_members"] == [leader.entity_id, member.entity_id]
+
+    # The member's clock runs 5 seconds ahead of ours
+    leader.coordinator.clock_offset = 0.0
+    member.coordinator.clock_offset = 5.0
+    sent = time.time()
+    await hass.services.async_call("media_player", "media_play", {"entity_id": leader.entity_id}, blocking=True)
+
+    leader_start = leader_standin.commands[-1]["start_at"]
+    member_start = member_standin.commands[-1]["start_at"]
+    assert leader_standin.commands[-1]["command"] == member_standin.commands[-1]["command"] == "play"
+    assert leader_start - sent >= group.GROUP_START_LEAD - 0.01
+    assert abs(member_start - leader_start - 5.0) < 0.01
+    assert leader.group_sync["members"] == 2
+    assert leader.group_sync["failed"] == 0
+    assert hass.states.get(leader.entity_id).attributes["group_start_skew"] is not None
+
+    for entry in entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
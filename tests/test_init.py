@@ -0,0 +1,27 @@
+"""Tests for setting up PipePlay entries."""
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.pipeplay.const import DOMAIN
+
+from .conftest import add_entries
+
+
+async def test_servers_on_one_host_get_their_own_breaker(hass: HomeAssistant, standins) -> None:
+    """Servers on different ports of one host do not share a circuit breaker."""
+    first, second = await standins(count=2)
+    entries = add_entries(hass, [first.port, second.port])
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    first_breaker, second_breaker = (
+        hass.data[DOMAIN][entry.entry_id]["coordinator"].breaker for entry in entries
+    )
+    assert first_breaker is not second_breaker
+
+    first_breaker.record_failure()
+    assert second_breaker.failures == 0
+
+    for entry in entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
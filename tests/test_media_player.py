@@ -0,0 +1,343 @@
+"""Tests for the PipePlay media player against the stand-in server."""
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import mock_restore_cache
+
+from custom_components.pipeplay import breaker as breaker_module
+from custom_components.pipeplay.const import (
+    CONF_COALESCE_WINDOW,
+    CONF_TRANSPORT,
+    DOMAIN,
+    TRANSPORT_SSE,
+    TRANSPORT_WEBSOCKET,
+)
+
+from .conftest import add_entries
+
+
+async def _setup_player(hass: HomeAssistant, standin, options=None):
+    """Set up one entry for ``standin`` and return its media player."""
+    (entry,) = add_entries(hass, [standin.port], options)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][entry.entry_id]["entities"][0]
+
+
+async def _unload(hass: HomeAssistant) -> None:
+    """Unload all entries so no connection or timer outlives the test."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_command_confirmed_by_poll_while_idle(hass: HomeAssistant, standins) -> None:
+    """Without events, a poll right after the command confirms it."""
+    (standin,) = await standins(websocket=False, events=False)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE})
+    coordinator = player.coordinator
+    assert coordinator.polling_mode == "poll"
+    assert coordinator.poll_interval == 10
+
+    await hass.services.async_call(
+        "media_player", "media_play", {"entity_id": player.entity_id}, blocking=True
+    )
+    for _ in range(50):
+        if player.optimistic_confirmed:
+            break
+        await asyncio.sleep(0.05)
+
+    assert player.optimistic_confirmed == 1
+    assert player.optimistic_rollbacks == 0
+    assert hass.states.get(player.entity_id).state == "playing"
+    await _unload(hass)
+
+
+async def test_idle_stream_without_keepalives_is_not_stalled(hass: HomeAssistant, standins, monkeypatch) -> None:
+    """Silence from an idle player does not reconnect the stream or count as a failure."""
+    monkeypatch.setattr("custom_components.pipeplay.coordinator.SSE_STALL_TIMEOUT", 0.2)
+    (standin,) = await standins(websocket=False, keepalive=0)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE})
+    coordinator = player.coordinator
+    assert coordinator.polling_mode == "push"
+
+    await asyncio.sleep(0.6)
+    # A heartbeat poll that matches what the stream delivered changes nothing
+    await coordinator.async_refresh()
+    await asyncio.sleep(0.1)
+
+    assert coordinator.polling_mode == "push"
+    assert standin.requests["events"] == 1
+    assert coordinator.breaker.failures == 0
+    await _unload(hass)
+
+
+async def test_stream_missing_an_update_reconnects(hass: HomeAssistant, standins, monkeypatch) -> None:
+    """A heartbeat poll showing a change the stream never sent restarts the stream."""
+    monkeypatch.setattr("custom_components.pipeplay.coordinator.STREAM_CHECK_GRACE", 0.1)
+    (standin,) = await standins(websocket=False)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE})
+    coordinator = player.coordinator
+
+    # Change the status without publishing an event
+    standin.status["volume_level"] = 0.9
+    await coordinator.async_refresh()
+    for _ in range(50):
+        if standin.requests["events"] == 2 and coordinator.polling_mode == "push":
+            break
+        await asyncio.sleep(0.05)
+
+    assert standin.requests["events"] == 2
+    assert coordinator.polling_mode == "push"
+    assert coordinator.breaker.failures == 0
+    await _unload(hass)
+
+
+async def test_new_media_takes_back_the_handed_over_item(hass: HomeAssistant, standins) -> None:
+    """Replacing the media clears the next item PipePlay already holds."""
+    (standin,) = await standins()
+    player = await _setup_player(hass, standin)
+
+    async def _play(media_id: str, **extra) -> None:
+        await hass.services.async_call("media_player", "play_media", {
+            "entity_id": player.entity_id,
+            "media_content_type": "music",
+            "media_content_id": media_id,
+            **extra,
+        }, blocking=True)
+
+    async def _wait(condition) -> None:
+        for _ in range(50):
+            if condition():
+                return
+            await asyncio.sleep(0.05)
+
+    standin.status["media_duration"] = 10
+    await _play("http://media/one.mp3")
+    await _play("http://media/two.mp3", enqueue="add")
+    await _wait(lambda: standin.queued is not None)
+    assert standin.queued["media_id"] == "http://media/two.mp3"
+
+    # PipePlay starts the handed-over item by itself
+    standin.finish_media()
+    await _wait(lambda: player.queue_advances == 1)
+    assert player.queue_advances == 1
+    assert player.playlist.index == 1
+
+    await _play("http://media/three.mp3", enqueue="add")
+    await _wait(lambda: standin.queued is not None)
+    await _play("http://media/four.mp3")
+    assert standin.commands[-2]["command"] == "queue_clear"
+    assert standin.queued is None
+
+    standin.finish_media()
+    await _wait(lambda: hass.states.get(player.entity_id).state == "idle")
+    assert hass.states.get(player.entity_id).state == "idle"
+    assert standin.status["media_content_id"] == "http://media/four.mp3"
+    await _unload(hass)
+
+
+@pytest.mark.parametrize("transport", [TRANSPORT_SSE, TRANSPORT_WEBSOCKET])
+async def test_malformed_events_keep_the_stream(hass: HomeAssistant, standins, transport: str) -> None:
+    """Events that are not JSON objects are skipped without reconnecting."""
+    (standin,) = await standins(websocket=transport == TRANSPORT_WEBSOCKET)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: transport})
+    connections = dict(standin.requests)
+
+    for data in (None, [], "playing", 3, {"sink": ["not", "hashable"]}):
+        standin.send_raw(data)
+    standin.update(state="paused")
+    for _ in range(50):
+        if hass.states.get(player.entity_id).state == "paused":
+            break
+        await asyncio.sleep(0.05)
+
+    assert hass.states.get(player.entity_id).state == "paused"
+    assert player.coordinator.polling_mode == "push"
+    assert standin.requests["events"] == connections["events"]
+    assert standin.requests["ws"] == connections["ws"]
+    await _unload(hass)
+
+
+async def test_fade_shows_the_interpolated_volume(hass: HomeAssistant, standins, monkeypatch) -> None:
+    """The interpolated volume is written along the ramp without extra requests."""
+    monkeypatch.setattr("custom_components.pipeplay.media_player.FADE_WRITE_INTERVAL", 0.1)
+    # The stand-in reports no volume until the ramp is over
+    (standin,) = await standins(fade_step=10)
+    player = await _setup_player(hass, standin)
+
+    levels = []
+    hass.bus.async_listen(
+        "state_changed", lambda event: levels.append(event.data["new_state"].attributes.get("volume_level"))
+    )
+    await hass.services.async_call(
+        DOMAIN, "fade_volume", {"entity_id": player.entity_id, "volume_level": 1.0, "duration": 0.5}, blocking=True
+    )
+    await asyncio.sleep(0.7)
+
+    assert [command["command"] for command in standin.commands] == ["fade_volume"]
+    ramp = [level for level in levels if 0.5 < level < 1.0]
+    assert len(ramp) >= 3
+    assert ramp == sorted(ramp)
+    assert hass.states.get(player.entity_id).attributes.get("volume_fade") is None
+    await _unload(hass)
+
+
+async def test_restored_state_is_not_shown_while_the_host_is_down(hass: HomeAssistant, socket_enabled) -> None:
+    """A player whose host refuses connections at startup is unavailable, not stale."""
+    mock_restore_cache(hass, [State("media_player.bench_0", "playing")])
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    (entry,) = add_entries(hass, [port])
+    # Known from an earlier run, so setup does not wait for the host
+    er.async_get(hass).async_get_or_create(
+        "media_player", DOMAIN, f"pipeplay_127.0.0.1_{port}", config_entry=entry, suggested_object_id="bench_0"
+    )
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    assert hass.states.get("media_player.bench_0").state == "unavailable"
+    await _unload(hass)
+
+
+async def test_optimistic_state_confirmed_by_event(hass: HomeAssistant, standins) -> None:
+    """A command shows its result at once, and the matching event confirms it."""
+    (standin,) = await standins()
+    player = await _setup_player(hass, standin)
+
+    await hass.services.async_call(
+        "media_player", "volume_set", {"entity_id": player.entity_id, "volume_level": 0.8}, blocking=True
+    )
+    assert hass.states.get(player.entity_id).attributes["volume_level"] == 0.8
+    for _ in range(50):
+        if player.optimistic_confirmed:
+            break
+        await asyncio.sleep(0.05)
+
+    assert player.optimistic_confirmed == 1
+    assert player.optimistic_rollbacks == 0
+    await _unload(hass)
+
+
+async def test_optimistic_state_rolled_back(hass: HomeAssistant, standins, monkeypatch) -> None:
+    """Refused commands and unconfirmed values fall back to the reported state."""
+    monkeypatch.setattr("custom_components.pipeplay.media_player.OPTIMISTIC_TIMEOUT", 0.2)
+    (standin,) = await standins(websocket=False)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE})
+
+    standin.failure_rate = 1.0
+    await hass.services.async_call(
+        "media_player", "media_play", {"entity_id": player.entity_id}, blocking=True
+    )
+    standin.failure_rate = 0.0
+    assert player.optimistic_rollbacks == 1
+    assert hass.states.get(player.entity_id).state == "idle"
+
+    # Never reported: rolled back once the timeout passes
+    player._async_apply_optimistic({"is_muted": True})
+    assert hass.states.get(player.entity_id).attributes["is_volume_muted"] is True
+    await asyncio.sleep(0.4)
+    assert player.optimistic_rollbacks == 2
+    assert hass.states.get(player.entity_id).attributes["is_volume_muted"] is False
+    await _unload(hass)
+
+
+async def test_rollback_keeps_a_newer_optimistic_value(hass: HomeAssistant, standins) -> None:
+    """Rolling back an older command leaves a newer value for the same field alone."""
+    (standin,) = await standins()
+    player = await _setup_player(hass, standin)
+
+    older = player._async_apply_optimistic({"volume_level": 0.3})
+    player._async_apply_optimistic({"volume_level": 0.6})
+    player._async_rollback_optimistic({"volume_level": 0.3}, older)
+
+    assert player.optimistic_rollbacks == 0
+    assert player.volume_level == 0.6
+    await _unload(hass)
+
+
+async def test_half_open_probe_is_the_status_request(hass: HomeAssistant, standins, monkeypatch) -> None:
+    """Once an open breaker may retry, one status request is the whole probe."""
+    (standin,) = await standins(websocket=False, events=False)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE})
+    coordinator = player.coordinator
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(breaker_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    for _ in range(breaker_module.DEFAULT_FAILURE_THRESHOLD):
+        coordinator.breaker.record_failure()
+    assert coordinator.breaker.state == breaker_module.STATE_OPEN
+
+    clock.now += breaker_module.DEFAULT_RESET_TIMEOUT
+    status_requests = standin.requests["status"]
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.breaker.state == breaker_module.STATE_CLOSED
+    assert standin.requests["status"] == status_requests + 1
+    assert standin.requests["health"] == 0
+    await _unload(hass)
+
+
+async def test_event_bursts_are_merged(hass: HomeAssistant, standins) -> None:
+    """Events within the window make one update; a state transition goes out at once."""
+    (standin,) = await standins(websocket=False)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE, CONF_COALESCE_WINDOW: 300})
+    coordinator = player.coordinator
+    events, updates = coordinator.sse_events, coordinator.sse_updates
+
+    for level in (0.6, 0.7, 0.8):
+        standin.update(volume_level=level)
+    for _ in range(50):
+        if coordinator.sse_events == events + 3:
+            break
+        await asyncio.sleep(0.01)
+    assert coordinator.sse_events == events + 3
+    assert coordinator.sse_updates == updates
+
+    await asyncio.sleep(0.4)
+    assert coordinator.sse_updates == updates + 1
+    assert hass.states.get(player.entity_id).attributes["volume_level"] == 0.8
+
+    standin.update(state="playing")
+    for _ in range(20):
+        if coordinator.sse_updates == updates + 2:
+            break
+        await asyncio.sleep(0.01)
+    assert coordinator.sse_updates == updates + 2
+    assert hass.states.get(player.entity_id).state == "playing"
+    await _unload(hass)
+
+
+async def test_expected_progress_does_not_write_state(hass: HomeAssistant, standins) -> None:
+    """Position reports along the extrapolation are skipped; a seek is written."""
+    (standin,) = await standins(websocket=False)
+    player = await _setup_player(hass, standin, {CONF_TRANSPORT: TRANSPORT_SSE, CONF_COALESCE_WINDOW: 0})
+
+    async def _publish(**changes) -> None:
+        events = player.coordinator.sse_events
+        standin.update(**changes)
+        for _ in range(50):
+            if player.coordinator.sse_events > events:
+                return
+            await asyncio.sleep(0.01)
+
+    await _publish(state="playing", media_duration=300, media_position=10)
+    writes, suppressed = player.state_writes, player.suppressed_writes
+    updated_at = hass.states.get(player.entity_id).attributes["media_position_updated_at"]
+
+    await _publish(media_position=10.5)
+    assert player.state_writes == writes
+    assert player.suppressed_writes == suppressed + 1
+
+    await _publish(media_position=120)
+    assert player.state_writes == writes + 1
+    attributes = hass.states.get(player.entity_id).attributes
+    assert attributes["media_position"] == 120
+    assert attributes["media_position_updated_at"] > updated_at
+    await _unload(hass)
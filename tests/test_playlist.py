@@ -0,0 +1,49 @@
+"""Tests for the play queue."""
+from custom_components.pipeplay.playlist import PipePlayPlaylist, PlaylistItem
+
+ONE = PlaylistItem("music", "one")
+TWO = PlaylistItem("music", "two")
+THREE = PlaylistItem("music", "three")
+
+
+def test_empty_playlist() -> None:
+    """An empty queue has no current or next item and cannot advance."""
+    playlist = PipePlayPlaylist()
+    assert playlist.current is None
+    assert playlist.next_item is None
+    assert playlist.advance() is None
+    assert playlist.index == -1
+
+
+def test_add_insert_and_advance() -> None:
+    """Items are appended or put next, and advancing stops at both ends."""
+    playlist = PipePlayPlaylist()
+    playlist.replace(ONE)
+    playlist.add(THREE)
+    playlist.insert_next(TWO)
+    assert playlist.items == [ONE, TWO, THREE]
+    assert playlist.current == ONE
+    assert playlist.next_item == TWO
+
+    assert playlist.advance() == TWO
+    assert playlist.advance() == THREE
+    assert playlist.next_item is None
+    assert playlist.advance() is None
+    assert playlist.current == THREE
+    assert playlist.advance(-2) == ONE
+    assert playlist.advance(-1) is None
+    assert playlist.as_dict() == {"length": 3, "index": 0}
+
+
+def test_replace_and_clear() -> None:
+    """Replacing keeps only the new item; clearing empties the queue."""
+    playlist = PipePlayPlaylist()
+    playlist.add(ONE)
+    playlist.add(TWO)
+    playlist.replace(THREE)
+    assert playlist.items == [THREE]
+    assert playlist.current == THREE
+
+    playlist.clear()
+    assert len(playlist) == 0
+    assert playlist.current is None
@@ -0,0 +1,107 @@
+"""Tests for pushing local media to PipePlay."""
+import asyncio
+import threading
+
+from aiohttp import web
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.pipeplay import push
+from custom_components.pipeplay.const import DOMAIN
+from custom_components.pipeplay.push import LocalMedia, PipePlayMediaStreamer
+
+from .conftest import add_entries
+
+
+async def test_buffer_is_pooled_after_an_abandoned_read(hass: HomeAssistant, monkeypatch) -> None:
+    """A stream cancelled mid-read only returns its buffer once the read is done."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def _slow_read(file, buffer, offset):
+        started.set()
+        release.wait(5)
+        buffer[:4] = b"late"
+        return 4
+
+    monkeypatch.setattr(push, "_read_chunk", _slow_read)
+    streamer = PipePlayMediaStreamer(hass, memory_budget=16, chunk_size=16)
+    buffer = streamer._acquire_buffer()
+
+    send = asyncio.create_task(
+        streamer._async_send_chunk(None, "http://127.0.0.1:9/stream", {}, None, buffer, 0, 16)
+    )
+    await hass.async_add_executor_job(started.wait, 5)
+    send.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await send
+
+    close = asyncio.create_task(streamer._async_close(None, buffer))
+    await asyncio.sleep(0.05)
+    assert not close.done()
+    assert streamer._acquire_buffer() is None
+
+    release.set()
+    await close
+    assert streamer._acquire_buffer() is buffer
+
+
+@pytest.mark.parametrize(
+    ("header", "seconds"),
+    [("5", 5.0), ("120", 30.0), ("-3", 0.0), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0), ("soon", 1.0), (None, 1.0)],
+)
+def test_retry_after(header, seconds) -> None:
+    """Retry-After is read as seconds or an HTTP date, bounded, with a fallback."""
+    assert push._retry_after(header) == seconds
+
+
+async def test_busy_pause_outlasts_the_chunk_timeout(hass: HomeAssistant, socket_enabled, monkeypatch) -> None:
+    """A busy answer is waited out after the request, not inside its timeout."""
+    monkeypatch.setattr(push, "PUSH_CHUNK_TIMEOUT", 0.2)
+
+    async def _busy(request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(status=503, headers={"Retry-After": "0.4"})
+
+    app = web.Application()
+    app.router.add_put("/stream", _busy)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    streamer = PipePlayMediaStreamer(hass)
+    try:
+        result = await streamer._async_send_chunk(
+            None, f"http://127.0.0.1:{port}/stream", {}, None, bytearray(16), None, 16
+        )
+    finally:
+        await runner.cleanup()
+    assert result == (None, None)
+
+
+async def test_stream_stopped_before_it_ran_is_released(hass: HomeAssistant, standins, tmp_path) -> None:
+    """Stopping a stream whose task never started still closes its file and pools its buffer."""
+    (standin,) = await standins()
+    (entry,) = add_entries(hass, [standin.port])
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"\0" * 64 * 1024)
+    streamer = PipePlayMediaStreamer(hass, memory_budget=16 * 1024, chunk_size=16 * 1024)
+    media = LocalMedia(str(path), 64 * 1024, "audio/mpeg")
+    assert await streamer.async_start(coordinator, "player", media, "music", "media-source://media_source/local/song.mp3")
+    ((file, buffer),) = streamer._open.values()
+
+    # No await between start and stop: the stream task has not run yet
+    await streamer.async_stop("player")
+    assert file.closed
+    assert streamer._acquire_buffer() is buffer
+    assert not streamer._open
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
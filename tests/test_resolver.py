@@ -0,0 +1,27 @@
+"""Tests for media-source resolution."""
+from homeassistant.components.media_source import PlayMedia
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay import resolver
+from custom_components.pipeplay.resolver import PipePlayMediaResolver
+
+
+async def test_speech_is_resolved_every_time(hass: HomeAssistant, monkeypatch) -> None:
+    """Media is resolved once and cached, text-to-speech on every play."""
+    resolved = []
+
+    async def _resolve(hass, media_id, entity_id):
+        resolved.append(media_id)
+        return PlayMedia(f"/api/resolved/{len(resolved)}", "audio/mpeg")
+
+    monkeypatch.setattr(resolver, "async_resolve_media", _resolve)
+    monkeypatch.setattr(resolver, "async_process_play_media_url", lambda hass, url: f"http://ha{url}")
+    media_resolver = PipePlayMediaResolver(hass)
+
+    song = "media-source://media_source/local/song.mp3"
+    speech = "media-source://tts/cloud?message=Hello"
+    assert await media_resolver.async_resolve(song, "media_player.test") == "http://ha/api/resolved/1"
+    assert await media_resolver.async_resolve(song, "media_player.test") == "http://ha/api/resolved/1"
+    assert await media_resolver.async_resolve(speech, "media_player.test") == "http://ha/api/resolved/2"
+    assert await media_resolver.async_resolve(speech, "media_player.test") == "http://ha/api/resolved/3"
+    assert resolved == [song, speech, speech]
@@ -0,0 +1,70 @@
+"""Tests for the shared poll scheduler."""
+import asyncio
+from typing import List
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.pipeplay.scheduler import PipePlayPollScheduler
+
+
+class _Coordinator:
+    """Count refreshes; each one waits until released."""
+
+    def __init__(self, host: str, poll_interval: float = 10) -> None:
+        self.host = host
+        self.poll_interval = poll_interval
+        self.refreshes = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def async_refresh(self) -> None:
+        self.refreshes += 1
+        await self.release.wait()
+
+
+async def _wait_for(condition) -> None:
+    """Run the loop until ``condition`` holds."""
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def test_polls_are_spread_and_limited(hass: HomeAssistant) -> None:
+    """Coordinators get distinct phases, and no more than the limit poll at once."""
+    scheduler = PipePlayPollScheduler(hass, max_concurrent=2)
+    coordinators: List[_Coordinator] = [_Coordinator(f"host{index}", poll_interval=0.2) for index in range(4)]
+    for coordinator in coordinators:
+        coordinator.release.clear()
+    unsubs = [scheduler.async_register(coordinator) for coordinator in coordinators]
+
+    due = sorted(entry.next_due for entry in scheduler._entries.values())
+    assert len(set(due)) == 4
+
+    await _wait_for(lambda: sum(coordinator.refreshes for coordinator in coordinators) == 2)
+    # Every phase has passed; the other two wait for a free slot
+    await asyncio.sleep(0.3)
+    assert sum(coordinator.refreshes for coordinator in coordinators) == 2
+
+    for coordinator in coordinators:
+        coordinator.release.set()
+    await _wait_for(lambda: all(coordinator.refreshes for coordinator in coordinators))
+    assert scheduler.max_running == 2
+    for unsub in unsubs:
+        unsub()
+    await hass.async_block_till_done()
+
+
+async def test_immediate_poll_requested_while_polling(hass: HomeAssistant) -> None:
+    """An immediate poll asked for during a running one follows it."""
+    scheduler = PipePlayPollScheduler(hass)
+    coordinator = _Coordinator("host", poll_interval=60)
+    coordinator.release.clear()
+    unsub = scheduler.async_register(coordinator)
+    await _wait_for(lambda: coordinator.refreshes == 1)
+
+    scheduler.async_reschedule(coordinator, immediate=True)
+    coordinator.release.set()
+
+    await _wait_for(lambda: coordinator.refreshes == 2)
+    unsub()
+    await hass.async_block_till_done()
@@ -0,0 +1,66 @@
+"""Tests for the incremental SSE parser."""
+import pytest
+
+from custom_components.pipeplay.sse import SSEBufferOverflow, SSEEvent, SSEParser
+
+
+def test_events_split_across_chunks() -> None:
+    """Events are returned once their blank line arrives, however the bytes are split."""
+    parser = SSEParser()
+    assert parser.feed(b'event: status\ndata: {"state"') == []
+    assert parser.feed(b': "playing"}\n') == []
+    assert parser.feed(b"\n") == [SSEEvent("status", b'{"state": "playing"}', "")]
+
+
+def test_crlf_split_between_chunks() -> None:
+    """A CRLF split between two chunks ends one line, not two."""
+    parser = SSEParser()
+    assert parser.feed(b"data: a\r") == []
+    assert parser.feed(b"\ndata: b\r") == []
+    assert parser.feed(b"\n\r\n") == [SSEEvent("message", b"a\nb", "")]
+
+
+def test_cr_line_endings() -> None:
+    """Lone CR ends lines too."""
+    parser = SSEParser()
+    assert parser.feed(b"data: one\r\rdata: two\r\r") == [
+        SSEEvent("message", b"one", ""),
+        SSEEvent("message", b"two", ""),
+    ]
+
+
+def test_id_and_retry() -> None:
+    """The last event id is kept across events and ``retry`` only takes digits."""
+    parser = SSEParser("3")
+    events = parser.feed(b"id: 4\nretry: 2500\ndata: x\n\ndata: y\n\nretry: soon\n\n")
+    assert [event.id for event in events] == ["4", "4"]
+    assert parser.last_event_id == "4"
+    assert parser.retry == 2500
+
+    # Ids containing NUL are ignored
+    parser.feed(b"id: 5\0\ndata: z\n\n")
+    assert parser.last_event_id == "4"
+
+
+def test_comments_are_counted() -> None:
+    """Comments dispatch nothing but are counted as keepalives."""
+    parser = SSEParser()
+    assert parser.feed(b": keepalive\n\n: keepalive\n\n") == []
+    assert parser.comments == 2
+
+
+def test_bom_and_event_without_data() -> None:
+    """A leading BOM is stripped and events without data are not dispatched."""
+    parser = SSEParser()
+    assert parser.feed(b"\xef\xbb\xbfevent: ping\n\ndata: x\n\n") == [SSEEvent("message", b"x", "")]
+
+
+def test_buffer_overflow() -> None:
+    """Oversized lines and events raise instead of growing without bound."""
+    parser = SSEParser(max_buffer=16)
+    with pytest.raises(SSEBufferOverflow):
+        parser.feed(b"data: " + b"x" * 32)
+
+    parser = SSEParser(max_buffer=16)
+    with pytest.raises(SSEBufferOverflow):
+        parser.feed(b"data: 0123456789\ndata: 0123456789\n")
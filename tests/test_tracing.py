@@ -0,0 +1,78 @@
+"""Tests for play request tracing."""
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.pipeplay.const import DOMAIN
+from custom_components.pipeplay.tracing import PipePlayTracer, span, use_trace
+
+from .conftest import add_entries
+
+
+async def test_spans_follow_the_current_trace() -> None:
+    """Spans are recorded into the current trace, also from tasks started in it."""
+    tracer = PipePlayTracer()
+    trace = tracer.start("media_player.test", "song.mp3")
+
+    async def _lookup() -> None:
+        with span("lookup"):
+            await asyncio.sleep(0)
+
+    with span("untraced") as outside:
+        assert outside is None
+    with use_trace(trace):
+        await asyncio.create_task(_lookup())
+        with pytest.raises(ValueError):
+            with span("command"):
+                raise ValueError
+        trace.begin("confirm")
+    trace.finish("unconfirmed")
+    trace.finish("playing")
+
+    (result,) = tracer.as_list()
+    assert result["outcome"] == "unconfirmed"
+    assert [item["name"] for item in result["spans"]] == ["lookup", "command", "confirm"]
+    assert result["spans"][1]["error"] == "ValueError"
+    assert result["spans"][2]["unfinished"] is True
+
+
+def test_ring_buffer_keeps_the_newest() -> None:
+    """Only the last traces are kept, newest first, and can be filtered."""
+    tracer = PipePlayTracer(size=3)
+    for index in range(5):
+        tracer.start(f"media_player.player_{index % 2}", f"song{index}.mp3")
+
+    assert [trace["media_id"] for trace in tracer.as_list()] == ["song4.mp3", "song3.mp3", "song2.mp3"]
+    assert [trace["id"] for trace in tracer.as_list(["media_player.player_1"])] == [4]
+    assert len(tracer.as_list(limit=1)) == 1
+
+
+async def test_play_request_is_traced(hass: HomeAssistant, standins) -> None:
+    """A play request is traced until PipePlay reports playback."""
+    (standin,) = await standins()
+    (entry,) = add_entries(hass, [standin.port])
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    player = hass.data[DOMAIN][entry.entry_id]["entities"][0]
+
+    await hass.services.async_call(
+        "media_player",
+        "play_media",
+        {"entity_id": player.entity_id, "media_content_id": "http://example.com/song.mp3", "media_content_type": "music"},
+        blocking=True,
+    )
+    for _ in range(50):
+        response = await hass.services.async_call(
+            DOMAIN, "dump_traces", {"entity_id": player.entity_id}, blocking=True, return_response=True
+        )
+        if response["traces"][0]["outcome"] is not None:
+            break
+        await asyncio.sleep(0.05)
+
+    (trace,) = response["traces"]
+    assert trace["outcome"] == "playing"
+    assert [item["name"] for item in trace["spans"]][-2:] == ["command", "confirm"]
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()